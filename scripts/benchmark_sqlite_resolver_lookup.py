@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from src.id_resolvers.sqlite_cache_resolver import MatchingPair, SqliteCacheResolver
+from src.models.node import Node
+
+
+class SyntheticResolver(SqliteCacheResolver):
+    def __init__(self, cache_path: str, canonical_ids: int, aliases_per_id: int, **kwargs):
+        self.cache_path = cache_path
+        self.canonical_ids = canonical_ids
+        self.aliases_per_id = aliases_per_id
+        super().__init__(types=["Protein"], **kwargs)
+
+    def cache_location(self):
+        return self.cache_path
+
+    def get_version_info(self) -> str:
+        return f"synthetic\t{self.canonical_ids}\t{self.aliases_per_id}"
+
+    def matching_ids(self):
+        for i in range(self.canonical_ids):
+            canonical = f"IFXProtein:{i}"
+            yield MatchingPair(canonical, canonical, "exact")
+            for j in range(self.aliases_per_id):
+                yield MatchingPair(canonical, f"Alias{j}:{i}", f"Alias{j}")
+
+
+def time_strategy(resolver: SqliteCacheResolver, batches, repeats: int) -> dict:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for batch in batches:
+            resolver.resolve_internal(batch)
+        timings.append(time.perf_counter() - start)
+    ids = sum(len(batch) for batch in batches)
+    median = statistics.median(timings)
+    return {
+        "strategy": resolver.lookup_strategy,
+        "ids": ids,
+        "median_seconds": round(median, 4),
+        "ids_per_second": round(ids / median, 1) if median else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare SqliteCacheResolver lookup strategies on a synthetic cache.")
+    parser.add_argument("--canonical-ids", type=int, default=200000)
+    parser.add_argument("--aliases-per-id", type=int, default=4)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1000, 50000, 200000])
+    parser.add_argument("--miss-rate", type=float, default=0.2, help="fraction of requested ids not in the cache")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--cache-path", help="reuse a cache file instead of a temporary one")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache_path = args.cache_path or str(Path(tmp_dir) / "synthetic_resolver.sqlite")
+        resolvers = [
+            SyntheticResolver(cache_path, args.canonical_ids, args.aliases_per_id, lookup_strategy=strategy)
+            for strategy in SqliteCacheResolver.lookup_strategies
+        ]
+
+        rng = random.Random(0)
+        for batch_size in args.batch_sizes:
+            batch = []
+            for _ in range(batch_size):
+                i = rng.randrange(args.canonical_ids)
+                if rng.random() < args.miss_rate:
+                    batch.append(Node(id=f"Missing:{i}"))
+                else:
+                    batch.append(Node(id=f"Alias{rng.randrange(args.aliases_per_id)}:{i}"))
+            for resolver in resolvers:
+                result = time_strategy(resolver, [batch], args.repeats)
+                result["batch_size"] = batch_size
+                print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -1607,11 +1607,39 @@ class DataRegistry:
         self,
         definition: RegistryEntry,
     ) -> Tuple[Dict[str, str], Dict[str, Dict[str, Any]]]:
+        inputs = definition.get("inputs") or {}
+        snapshots: Dict[str, RegistryEntry] = {}
+        derived_inputs: List[Tuple[str, str, str]] = []
+        for input_name, logical_ref in inputs.items():
+            source, dataset = self._parse_logical_registry_ref(logical_ref)
+            try:
+                snapshots[input_name] = self._latest_source_snapshot(source, dataset)
+            except LookupError:
+                derived_inputs.append((input_name, source, dataset))
+
+        # a derived input (e.g. a prebuilt lookup index) must come from the source snapshots
+        # pinned next to it, not merely be the latest artifact of its dataset
+        pinned = {
+            tuple(snapshot["snapshot_id"].split(":", 2)[:2]): snapshot["snapshot_id"]
+            for snapshot in snapshots.values()
+        }
+        for input_name, source, dataset in derived_inputs:
+            artifact = self._latest_derived_artifact(source, dataset, pinned_snapshot_ids=pinned)
+            if artifact is None:
+                print(
+                    f"WARNING: no {source}/{dataset} artifact is derived from the pinned inputs "
+                    f"{sorted(pinned.values())}; leaving {input_name!r} out of the resolver snapshot"
+                )
+                continue
+            snapshots[input_name] = artifact
+
         resolved_inputs: Dict[str, str] = {}
         resolved_input_metadata: Dict[str, Dict[str, Any]] = {}
-        for input_name, logical_ref in (definition.get("inputs") or {}).items():
+        for input_name, logical_ref in inputs.items():
+            snapshot = snapshots.get(input_name)
+            if snapshot is None:
+                continue
             source, dataset = self._parse_logical_registry_ref(logical_ref)
-            snapshot = self._latest_source_snapshot(source, dataset)
             resolved_ref = f"{source}:{dataset}:{snapshot['version']}"
             resolved_inputs[input_name] = resolved_ref
             resolved_input_metadata[input_name] = {
@@ -1659,6 +1687,41 @@ class DataRegistry:
             raise LookupError(f"No registered source snapshot {source}/{dataset}")
         return snapshots[-1]
 
+    def _latest_derived_artifact(
+        self,
+        source: str,
+        dataset: str,
+        *,
+        pinned_snapshot_ids: Optional[Dict[Tuple[str, str], str]] = None,
+    ) -> Optional[RegistryEntry]:
+        """Latest artifact of source/dataset; with pinned_snapshot_ids ((source, dataset) ->
+        snapshot_id), only artifacts whose derived_from agrees with every pinned dataset it
+        names, or None if no such artifact exists."""
+        artifacts = [
+            entry
+            for entry in self.list_derived_artifacts()
+            if entry.get("source") == source and entry.get("dataset") == dataset
+        ]
+        if not artifacts:
+            raise LookupError(f"No registered derived artifact {source}/{dataset}")
+        if pinned_snapshot_ids is not None:
+            artifacts = [
+                entry for entry in artifacts
+                if self._derived_from_pinned(entry.get("derived_from") or [], pinned_snapshot_ids)
+            ]
+            if not artifacts:
+                return None
+        return sorted(artifacts, key=lambda entry: registry_version_sort_key(entry.get("version")))[-1]
+
+    @staticmethod
+    def _derived_from_pinned(derived_from: List[Dict[str, Any]], pinned_snapshot_ids: Dict[Tuple[str, str], str]) -> bool:
+        for parent in derived_from:
+            snapshot_id = parent.get("snapshot_id") or ""
+            pinned = pinned_snapshot_ids.get(tuple(snapshot_id.split(":", 2)[:2]))
+            if pinned is not None and pinned != snapshot_id:
+                return False
+        return True
+
     @staticmethod
     def _resolver_definition_fingerprint(definition: RegistryEntry) -> str:
         fingerprint_definition = deepcopy(definition)
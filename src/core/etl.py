@@ -92,6 +92,11 @@ class ETL:
                     adapter_total=adapter_total,
                 )
 
+        resolver_cache_stats = self.get_resolver_cache_stats()
+        for output_adapter in self.output_adapters:
+            if hasattr(output_adapter, "set_resolver_cache_stats"):
+                output_adapter.set_resolver_cache_stats(resolver_cache_stats)
+
         if do_post_processing:
             for output_adapter in self.output_adapters:
                 output_adapter.do_post_processing(clean_edges=clean_edges)
@@ -103,3 +108,23 @@ class ETL:
         formatted_time = humanize.precisedelta(elapsed_timedelta, format='%0.0f')
 
         print(f"\tTotal elapsed time: {formatted_time}")
+        self.report_resolver_cache_stats()
+
+    def get_resolver_cache_stats(self) -> Dict[str, dict]:
+        stats = {}
+        seen = set()
+        for resolver in self.resolver_map.values():
+            if id(resolver) in seen:
+                continue
+            seen.add(id(resolver))
+            name = f"{resolver.__class__.__name__}({', '.join(resolver.types)})"
+            stats[name] = resolver.get_cache_stats()
+        return stats
+
+    def report_resolver_cache_stats(self):
+        for name, stats in self.get_resolver_cache_stats().items():
+            hit_rate = "n/a" if stats["hit_rate"] is None else f"{stats['hit_rate']:.1%}"
+            capacity = "unbounded" if stats["capacity"] is None else stats["capacity"]
+            print(f"\tResolve cache {name}: {stats['size']} entries (capacity {capacity}), "
+                  f"{stats['hits']} hits, {stats['misses']} misses, {stats['evictions']} evictions, "
+                  f"hit rate {hit_rate}")
@@ -2,12 +2,14 @@ import csv
 import os
 import sqlite3
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Dict, List, Optional, Set
 
-from src.id_resolvers.resolver_snapshot import resolver_input
+from src.id_resolvers.resolver_snapshot import export_sqlite_snapshot, open_snapshot_connection, resolver_input
 from src.id_resolvers.sqlite_cache_resolver import DEFAULT_SQLITE_RESOLVER_CACHE_DIR, SqliteCacheResolver
 from src.interfaces.id_resolver import IdMatch
 from src.models.node import Node
+from src.registry.manifest import sha256_file
 
 
 @dataclass(frozen=True)
@@ -22,10 +24,13 @@ class DiseaseIdResolver(SqliteCacheResolver):
     name = "Disease ID Resolver"
     xref_suffix = "_xref"
     cache_schema_version = "v2"
+    index_input_name = "index_data_source"
+    index_file_name = "disease_resolver_index.sqlite"
+    source_file_name = "disease_ids.tsv"
 
     def __init__(self, resolver_snapshot, cache_path: str = None, **kwargs):
         self.resolver_snapshot = resolver_snapshot
-        self.file_path = str(resolver_input(resolver_snapshot, "data_source").file("disease_ids.tsv"))
+        self.file_path = str(resolver_input(resolver_snapshot, "data_source").file(self.source_file_name))
         self.cache_path = cache_path
         super().__init__(**kwargs)
 
@@ -41,9 +46,48 @@ class DiseaseIdResolver(SqliteCacheResolver):
             f"\tsize:{stat.st_size}\tmtime_ns:{stat.st_mtime_ns}"
         )
 
+    def prebuilt_index_path(self) -> Optional[Path]:
+        index_source = self.resolver_snapshot.resolver_inputs.get(self.index_input_name)
+        if index_source is None:
+            return None
+        index_path = index_source.file(self.index_file_name)
+        metadata = self.read_index_metadata(index_path)
+        schema_version = metadata.get("schema_version")
+        if schema_version != self.cache_schema_version:
+            raise ValueError(
+                f"Disease resolver index {index_path} has schema {schema_version!r}; "
+                f"expected {self.cache_schema_version!r}"
+            )
+        # an index from another disease_ids release would resolve against the wrong mapping
+        source_sha256 = self.data_source_sha256()
+        if metadata.get("source_sha256") != source_sha256:
+            print(
+                f"WARNING: disease resolver index {index_path} was built from {self.source_file_name} "
+                f"sha256 {metadata.get('source_sha256')!r}; data_source has {source_sha256!r}. "
+                f"Building the local lookup cache instead."
+            )
+            return None
+        return index_path
+
+    def data_source_sha256(self) -> str:
+        # registry manifests record file digests; hash the local file when they don't
+        data_source = resolver_input(self.resolver_snapshot, "data_source")
+        for entry in data_source.manifest.get("files") or []:
+            if Path(entry.get("path") or "").name == self.source_file_name and entry.get("sha256"):
+                return entry["sha256"]
+        return sha256_file(Path(self.file_path))
+
     def matching_ids(self):
         raise NotImplementedError("DiseaseIdResolver populates its sqlite cache directly")
 
+    @staticmethod
+    def create_lookup_tables(cur):
+        cur.execute('CREATE TABLE matches (id TEXT, match TEXT, type TEXT, priority INTEGER)')
+        cur.execute('CREATE INDEX match_index ON matches (match)')
+        cur.execute('CREATE INDEX id_index ON matches (id)')
+        cur.execute('CREATE TABLE equivalent_ids (id TEXT, equivalent_id TEXT)')
+        cur.execute('CREATE INDEX equivalent_id_index ON equivalent_ids (id)')
+
     def create_lookup_db(self):
         print('\tcreating sqlite lookup db')
         self.reset_connection()
@@ -54,64 +98,112 @@ class DiseaseIdResolver(SqliteCacheResolver):
             cur.execute('DROP TABLE IF EXISTS equivalent_ids')
             cur.execute('DROP TABLE IF EXISTS file_metadata')
 
-            cur.execute('CREATE TABLE matches (id TEXT, match TEXT, type TEXT, priority INTEGER)')
-            cur.execute('CREATE INDEX match_index ON matches (match)')
-            cur.execute('CREATE INDEX id_index ON matches (id)')
-            cur.execute('CREATE TABLE equivalent_ids (id TEXT, equivalent_id TEXT)')
-            cur.execute('CREATE INDEX equivalent_id_index ON equivalent_ids (id)')
+            self.create_lookup_tables(cur)
             cur.execute('CREATE TABLE file_metadata (version_key TEXT)')
 
             self.connection.commit()
 
     def populate_lookup_db(self):
+        with self._sqlite_lock:
+            self.insert_lookup_rows(self.connection.cursor(), self.file_path)
+            self.store_file_metadata()
+            self.connection.commit()
+
+    @classmethod
+    def insert_lookup_rows(cls, cur, file_path: str) -> Dict[str, int]:
         match_rows: Set[DiseaseMatchRow] = set()
         equivalent_rows: Set[tuple[str, str]] = set()
 
-        for canonical_id, aliases_by_type in self._iter_rows():
+        for canonical_id, aliases_by_type in cls._iter_rows(file_path):
             for alias in aliases_by_type["equivalent"]:
-                if self._is_curie(alias):
+                if cls._is_curie(alias):
                     equivalent_rows.add((canonical_id, alias))
 
             for alias in aliases_by_type["standard"]:
-                for variant in self._alias_variants(alias):
+                for variant in cls._alias_variants(alias):
                     match_rows.add(DiseaseMatchRow(canonical_id, variant, "standard_id", 0))
 
             for alias in aliases_by_type["nn"]:
-                for variant in self._alias_variants(alias):
+                for variant in cls._alias_variants(alias):
                     match_rows.add(DiseaseMatchRow(canonical_id, variant, "nn_curie", 1))
 
             for alias in aliases_by_type["xref"]:
-                for variant in self._alias_variants(alias):
+                for variant in cls._alias_variants(alias):
                     match_rows.add(DiseaseMatchRow(canonical_id, variant, "xref", 2))
 
-        with self._sqlite_lock:
-            cur = self.connection.cursor()
-            cur.executemany(
-                'INSERT INTO matches VALUES (?, ?, ?, ?)',
-                [(row.id, row.match, row.type, row.priority) for row in match_rows],
-            )
-            cur.executemany(
-                'INSERT INTO equivalent_ids VALUES (?, ?)',
-                sorted(equivalent_rows),
-            )
-            self.store_file_metadata()
-            self.connection.commit()
+        cur.executemany(
+            'INSERT INTO matches VALUES (?, ?, ?, ?)',
+            [(row.id, row.match, row.type, row.priority) for row in match_rows],
+        )
+        cur.executemany(
+            'INSERT INTO equivalent_ids VALUES (?, ?)',
+            sorted(equivalent_rows),
+        )
+        return {"match_rows": len(match_rows), "equivalent_id_rows": len(equivalent_rows)}
+
+    @classmethod
+    def build_index_file(cls, file_path: str, output_path: Path) -> Dict[str, int]:
+        """Build the lookup tables from disease_ids.tsv into a standalone read-only index file.
+
+        The file carries its schema version and the sha256 of the source file instead of
+        a local version key, so it can be published to the registry, opened as-is on any
+        host, and checked against the disease_ids snapshot it is used with.
+        """
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        build_path = output_path.with_name(f".{output_path.name}.{os.getpid()}.build")
+        if build_path.exists():
+            build_path.unlink()
+        connection = sqlite3.connect(build_path)
+        try:
+            cur = connection.cursor()
+            cls.create_lookup_tables(cur)
+            stats = cls.insert_lookup_rows(cur, file_path)
+            source_sha256 = sha256_file(Path(file_path))
+            cur.execute('CREATE TABLE index_metadata (schema_version TEXT, source_sha256 TEXT)')
+            cur.execute('INSERT INTO index_metadata VALUES (?, ?)', (cls.cache_schema_version, source_sha256))
+            connection.commit()
+            export_sqlite_snapshot(connection, output_path)
+        finally:
+            connection.close()
+            build_path.unlink()
+        stats["schema_version"] = cls.cache_schema_version
+        stats["source_sha256"] = source_sha256
+        return stats
+
+    @staticmethod
+    def read_index_metadata(index_path: Path) -> Dict[str, str]:
+        connection = open_snapshot_connection(index_path)
+        try:
+            cursor = connection.execute('SELECT * FROM index_metadata')
+            row = cursor.fetchone()
+            columns = [column[0] for column in cursor.description]
+        except sqlite3.DatabaseError:
+            return {}
+        finally:
+            connection.close()
+        return dict(zip(columns, row)) if row else {}
 
-    def _iter_rows(self):
-        with open(self.file_path, newline="", encoding="utf-8") as handle:
+    @classmethod
+    def read_index_schema_version(cls, index_path: Path) -> Optional[str]:
+        return cls.read_index_metadata(index_path).get("schema_version")
+
+    @classmethod
+    def _iter_rows(cls, file_path: str):
+        with open(file_path, newline="", encoding="utf-8") as handle:
             reader = csv.DictReader(handle, delimiter="\t")
-            xref_columns = [column for column in reader.fieldnames or [] if column.endswith(self.xref_suffix)]
+            xref_columns = [column for column in reader.fieldnames or [] if column.endswith(cls.xref_suffix)]
 
             for row in reader:
-                canonical_id = self._clean_id(row.get("standard_id"))
+                canonical_id = cls._clean_id(row.get("standard_id"))
                 if not canonical_id:
                     continue
 
                 standard_aliases = {canonical_id}
-                nn_aliases = set(self._split_aliases(row.get("nn_curie")))
+                nn_aliases = set(cls._split_aliases(row.get("nn_curie")))
                 xref_aliases = set()
                 for column in xref_columns:
-                    xref_aliases.update(self._split_aliases(row.get(column)))
+                    xref_aliases.update(cls._split_aliases(row.get(column)))
 
                 equivalent_aliases = set()
                 equivalent_aliases.update(standard_aliases)
@@ -184,47 +276,25 @@ class DiseaseIdResolver(SqliteCacheResolver):
     def resolve_internal(self, input_nodes: List[Node]) -> Dict[str, List[IdMatch]]:
         result_list: Dict[str, List[IdMatch]] = {}
         input_ids = sorted({node.id for node in input_nodes})
-        with self._sqlite_lock:
-            cur = self.connection.cursor()
-            max_vars = 50000
-
-            for chunk in [input_ids[i:i + max_vars] for i in range(0, len(input_ids), max_vars)]:
-                if not chunk:
-                    continue
-                cur.execute(
-                    """
-                    SELECT id, match, type, priority
-                    FROM matches
-                    WHERE match IN ({})
-                    ORDER BY priority, id
-                    """.format(",".join("?" * len(chunk))),
-                    tuple(chunk),
-                )
-                for resolved_id, input_id, match_type, _priority in cur.fetchall():
-                    if input_id not in result_list:
-                        result_list[input_id] = []
-                    if resolved_id in {match.match for match in result_list[input_id]}:
-                        continue
-                    result_list[input_id].append(IdMatch(
-                        input=input_id,
-                        match=resolved_id,
-                        equivalent_ids=[],
-                        context=[match_type],
-                    ))
-
-            resolved_ids = sorted({match.match for matches in result_list.values() for match in matches})
-            equivalent_map: Dict[str, List[str]] = {}
-            for chunk in [resolved_ids[i:i + max_vars] for i in range(0, len(resolved_ids), max_vars)]:
-                if not chunk:
-                    continue
-                cur.execute(
-                    "SELECT id, equivalent_id FROM equivalent_ids WHERE id IN ({}) ORDER BY equivalent_id".format(
-                        ",".join("?" * len(chunk))
-                    ),
-                    tuple(chunk),
-                )
-                for resolved_id, equivalent_id in cur.fetchall():
-                    equivalent_map.setdefault(resolved_id, []).append(equivalent_id)
+        cur = self.read_connection().cursor()
+        match_rows = self.select_matches(cur, "id, match, type, priority", "match", input_ids)
+        for resolved_id, input_id, match_type, _priority in sorted(match_rows, key=lambda row: (row[3], row[0])):
+            if input_id not in result_list:
+                result_list[input_id] = []
+            if resolved_id in {match.match for match in result_list[input_id]}:
+                continue
+            result_list[input_id].append(IdMatch(
+                input=input_id,
+                match=resolved_id,
+                equivalent_ids=[],
+                context=[match_type],
+            ))
+
+        resolved_ids = sorted({match.match for matches in result_list.values() for match in matches})
+        equivalent_map: Dict[str, List[str]] = {}
+        equivalent_rows = self.select_matches(cur, "id, equivalent_id", "id", resolved_ids, table="equivalent_ids")
+        for resolved_id, equivalent_id in sorted(equivalent_rows, key=lambda row: row[1]):
+            equivalent_map.setdefault(resolved_id, []).append(equivalent_id)
 
         for matches in result_list.values():
             for match in matches:
@@ -1,5 +1,10 @@
+import json
+import os
+import sqlite3
+import threading
 import time
-from typing import List, Dict, Iterable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Iterable, Optional
 
 import requests
 from src.interfaces.id_resolver import IdResolver, IdMatch
@@ -7,6 +12,69 @@ from src.models.node import Node
 from src.shared.util import yield_per
 
 
+class _RateLimiter:
+    """Spaces calls to wait() at least 1 / requests_per_second apart across threads."""
+
+    def __init__(self, requests_per_second: Optional[float]):
+        self.interval = 1.0 / requests_per_second if requests_per_second else 0.0
+        self._lock = threading.Lock()
+        self._next_time = 0.0
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_time)
+            self._next_time = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class NodeNormCache:
+    """Persistent CURIE -> normalized result cache, partitioned by service key.
+
+    A None result (the service does not know the CURIE) is cached as well, so it is not
+    asked again until the service version changes.
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False, timeout=300)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS normalized_nodes ("
+            "service_key TEXT, curie TEXT, result TEXT, PRIMARY KEY (service_key, curie)) WITHOUT ROWID"
+        )
+        self.connection.commit()
+
+    def get_many(self, service_key: str, curies: List[str]) -> Dict[str, Optional[dict]]:
+        found = {}
+        with self._lock:
+            for batch in yield_per(curies, 50000):
+                rows = self.connection.execute(
+                    "SELECT curie, result FROM normalized_nodes WHERE service_key = ? AND curie IN ({})".format(
+                        ",".join("?" * len(batch))),
+                    (service_key, *batch),
+                ).fetchall()
+                for curie, result in rows:
+                    found[curie] = json.loads(result)
+        return found
+
+    def put_many(self, service_key: str, results: Dict[str, Optional[dict]]):
+        with self._lock:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO normalized_nodes VALUES (?, ?, ?)",
+                [(service_key, curie, json.dumps(result)) for curie, result in results.items()],
+            )
+            self.connection.commit()
+
+    def close(self):
+        with self._lock:
+            self.connection.close()
+
+
 class TranslatorNodeNormResolver(IdResolver):
     base_url = "https://nodenormalization-sri.renci.org/1.5"
     name = f"Translator Node Normalizer: {base_url}"
@@ -40,6 +108,10 @@ class TranslatorNodeNormResolver(IdResolver):
                  request_timeout: int = 120,
                  max_retries: int = 10,
                  retry_backoff_seconds: int = 60,
+                 max_concurrent_requests: int = 1,
+                 requests_per_second: Optional[float] = None,
+                 cache_path: Optional[str] = None,
+                 base_url: Optional[str] = None,
                  **kwargs):
         super().__init__(**kwargs)
         self.resolver_snapshot = resolver_snapshot
@@ -47,6 +119,42 @@ class TranslatorNodeNormResolver(IdResolver):
         self.request_timeout = request_timeout
         self.max_retries = max(1, max_retries)
         self.retry_backoff_seconds = retry_backoff_seconds
+        self.max_concurrent_requests = max(1, max_concurrent_requests)
+        self.rate_limiter = _RateLimiter(requests_per_second)
+        if base_url is not None:
+            self.base_url = base_url.rstrip("/")
+            self.name = f"Translator Node Normalizer: {self.base_url}"
+        self.node_cache = NodeNormCache(cache_path) if cache_path else None
+        self._service_key = None
+
+    def node_norm_status_url(self):
+        return f"{self.base_url}/status"
+
+    def get_service_version(self) -> Optional[str]:
+        try:
+            response = requests.get(self.node_norm_status_url(), timeout=self.request_timeout)
+            response.raise_for_status()
+            status = response.json()
+        except (requests.exceptions.RequestException, ValueError) as exc:
+            print(f"Unable to read Translator Node Normalizer version: {exc}")
+            return None
+        for key in ("babel_version", "version"):
+            if status.get(key):
+                return str(status[key])
+        return None
+
+    def get_service_key(self) -> Optional[str]:
+        """Cache partition for the current service: URL, request options and service version.
+
+        None when the service version cannot be determined; the disk cache is then bypassed
+        rather than risk mixing results from different releases.
+        """
+        if self._service_key is None:
+            version = self.get_service_version()
+            if version is None:
+                return None
+            self._service_key = f"{self.base_url}\tconflate:{self.conflate_genes_and_proteins}\t{version}"
+        return self._service_key
 
     def node_norm_url(self):
         return f"{self.base_url}/get_normalized_nodes"
@@ -169,22 +277,69 @@ class TranslatorNodeNormResolver(IdResolver):
 
         input_ids = list(set([node.id for node in input_nodes]))
 
+        service_key = self.get_service_key() if self.node_cache is not None else None
+        normalized = {}
+        if service_key is not None:
+            normalized = self.node_cache.get_many(service_key, input_ids)
+            print(f"Found {len(normalized)} of {len(input_ids)} IDs in the Node Normalizer cache")
+        to_query = [input_id for input_id in input_ids if input_id not in normalized]
+
+        for batch_results in self._query_batches(to_query):
+            if service_key is not None:
+                self.node_cache.put_many(service_key, batch_results)
+            normalized.update(batch_results)
+
         result_list = {}
+        for input_id, results in normalized.items():
+            res_obj: List[IdMatch] = []
+            if results is not None:
+                res_obj = [
+                    IdMatch(
+                        input=input_id,
+                        match=results['id']['identifier'],
+                        equivalent_ids=[equiv_id['identifier'] for equiv_id in results['equivalent_identifiers']]
+                    )]
+            result_list[input_id] = res_obj
+        return result_list
+
+    @staticmethod
+    def _compact_result(results):
+        if results is None:
+            return None
+        return {
+            "id": {"identifier": results["id"]["identifier"]},
+            "equivalent_identifiers": [
+                {"identifier": equiv_id["identifier"]} for equiv_id in results["equivalent_identifiers"]
+            ],
+        }
+
+    def _query_batches(self, input_ids: List[str]):
+        """Yield the normalized results of each batch as it completes.
 
-        for batch in yield_per(input_ids, self.batch_size):
+        Up to max_concurrent_requests batches are in flight at once; every attempt,
+        including retries, goes through the shared rate limiter.
+        """
+        batches = list(yield_per(input_ids, self.batch_size))
+        if not batches:
+            return
+
+        def query(batch):
             response_data = self._post_to_node_normalizer(batch)
+            return {input_id: self._compact_result(results) for input_id, results in response_data.items()}
 
-            for input_id, results in response_data.items():
-                res_obj: List[IdMatch] = []
-                if results is not None:
-                    res_obj = [
-                        IdMatch(
-                            input=input_id,
-                            match=results['id']['identifier'],
-                            equivalent_ids=[equiv_id['identifier'] for equiv_id in results['equivalent_identifiers']]
-                        )]
-                result_list[input_id] = res_obj
-        return result_list
+        if self.max_concurrent_requests == 1 or len(batches) == 1:
+            for batch in batches:
+                yield query(batch)
+            return
+
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrent_requests, len(batches))) as executor:
+            futures = [executor.submit(query, batch) for batch in batches]
+            try:
+                for future in as_completed(futures):
+                    yield future.result()
+            finally:
+                for future in futures:
+                    future.cancel()
 
     def _post_to_node_normalizer(self, curies: Iterable[str]):
         batch = list(curies)
@@ -203,6 +358,7 @@ class TranslatorNodeNormResolver(IdResolver):
         last_exception = None
 
         for attempt in range(1, self.max_retries + 1):
+            self.rate_limiter.wait()
             try:
                 response = requests.post(
                     self.node_norm_url(),
@@ -1,14 +1,28 @@
+import os
+import sqlite3
+import threading
+from pathlib import Path
 from typing import List, Dict
 
+from src.id_resolvers.resolver_snapshot import export_sqlite_snapshot, open_snapshot_connection, snapshot_file_path
+from src.id_resolvers.sqlite_cache_resolver import DEFAULT_SQLITE_RESOLVER_CACHE_DIR
 from src.input_adapters.sql_adapter import SqliteAdapter
 from src.input_adapters.sqlite_ramp.tables import Source as SqliteSource
-from src.interfaces.id_resolver import IdResolver, IdMatch
+from src.interfaces.id_resolver import IdResolver, IdMatch, ResolveCache
 from src.models.node import Node
 
+_MISSING = object()
+
 
 class RampMetaboliteIdResolver(IdResolver, SqliteAdapter):
-    source_to_ramp: Dict[str, str]
-    ramp_to_sources: Dict[str, List[str]]
+    """Resolves metabolite ids to RaMP compound ids.
+
+    Lookups go against an indexed snapshot derived from the RaMP Source table, built once
+    per RaMP file and reused by later instances, so construction does not load the table.
+    Recently used ids are kept in small in-process LRUs.
+    """
+    snapshot_path: Path = None
+    max_lookup_vars = 50000
 
     @staticmethod
     def _normalize_id(input_id: str) -> str:
@@ -17,49 +31,150 @@ class RampMetaboliteIdResolver(IdResolver, SqliteAdapter):
             return f"{prefix.lower()}:{id_part}"
         return input_id
 
-    def __init__(self, sqlite_file: str, **kwargs):
+    def __init__(self, sqlite_file: str, snapshot_dir: str = None, lookup_cache_capacity: int = 100000, **kwargs):
         SqliteAdapter.__init__(self, sqlite_file)
         IdResolver.__init__(self, **kwargs)
-        self._build_lookup()
+        self.sqlite_file = sqlite_file
+        self._local = threading.local()
+        self.ramp_id_cache = ResolveCache(capacity=lookup_cache_capacity)
+        self.sources_cache = ResolveCache(capacity=lookup_cache_capacity)
+        if snapshot_dir is None:
+            snapshot_dir = DEFAULT_SQLITE_RESOLVER_CACHE_DIR
+        self.snapshot_path = snapshot_file_path(snapshot_dir, self.__class__.__name__, self.get_version_info())
+        if self.snapshot_path.exists():
+            print(f"RampMetaboliteIdResolver: using read-only snapshot {self.snapshot_path}")
+        else:
+            self.export_snapshot(self.snapshot_path)
 
-    def _build_lookup(self):
-        self.source_to_ramp = {}
-        self.ramp_to_sources = {}
+    def get_version_info(self) -> str:
+        stat = os.stat(self.sqlite_file)
+        return f"{os.path.abspath(self.sqlite_file)}\tsize:{stat.st_size}\tmtime_ns:{stat.st_mtime_ns}"
 
-        results = self.get_session().query(
+    def get_cache_stats(self) -> Dict[str, object]:
+        stats = super().get_cache_stats()
+        stats["ramp_ids"] = self.ramp_id_cache.stats()
+        stats["sources"] = self.sources_cache.stats()
+        return stats
+
+    def _source_rows(self):
+        return self.get_session().query(
             SqliteSource.sourceId,
             SqliteSource.rampId
-        ).filter(SqliteSource.geneOrCompound == 'compound').all()
+        ).filter(SqliteSource.geneOrCompound == 'compound').yield_per(50000)
+
+    def export_snapshot(self, path) -> Path:
+        """Write the source -> RaMP id lookup to an immutable snapshot file.
 
-        for source_id, ramp_id in results:
-            normalized = self._normalize_id(source_id)
-            self.source_to_ramp[normalized] = ramp_id
-            if ramp_id not in self.ramp_to_sources:
-                self.ramp_to_sources[ramp_id] = []
-            if source_id not in self.ramp_to_sources[ramp_id]:
-                self.ramp_to_sources[ramp_id].append(source_id)
+        Source ids are keyed by their normalized form and every RaMP id also maps to
+        itself, so already-canonical ids pass through. Equivalent ids keep the order they
+        first appear in the Source table.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        build_path = path.with_name(f".{path.name}.{os.getpid()}.build")
+        if build_path.exists():
+            build_path.unlink()
+        connection = sqlite3.connect(build_path)
+        try:
+            connection.execute('CREATE TABLE source_to_ramp (source_id TEXT PRIMARY KEY, ramp_id TEXT) WITHOUT ROWID')
+            connection.execute('CREATE TABLE ramp_sources (ramp_id TEXT, source_id TEXT, position INTEGER, '
+                               'PRIMARY KEY (ramp_id, source_id))')
+            batch = []
+            for position, (source_id, ramp_id) in enumerate(self._source_rows()):
+                batch.append((self._normalize_id(source_id), ramp_id, source_id, position))
+                if len(batch) >= 50000:
+                    self._insert_snapshot_rows(connection, batch)
+                    batch = []
+            self._insert_snapshot_rows(connection, batch)
+
+            ramp_ids = [row[0] for row in connection.execute('SELECT DISTINCT ramp_id FROM ramp_sources')]
+            connection.executemany('INSERT OR REPLACE INTO source_to_ramp VALUES (?, ?)',
+                                   [(self._normalize_id(ramp_id), ramp_id) for ramp_id in ramp_ids])
+            connection.execute('CREATE INDEX ramp_sources_order ON ramp_sources (ramp_id, position)')
+            connection.commit()
+            export_sqlite_snapshot(connection, path)
+        finally:
+            connection.close()
+            build_path.unlink()
+        print(f"RampMetaboliteIdResolver: exported snapshot {path} for {len(ramp_ids)} metabolites")
+        return path
+
+    @staticmethod
+    def _insert_snapshot_rows(connection, rows):
+        connection.executemany('INSERT OR REPLACE INTO source_to_ramp VALUES (?, ?)',
+                               [(normalized, ramp_id) for normalized, ramp_id, _, _ in rows])
+        connection.executemany('INSERT OR IGNORE INTO ramp_sources VALUES (?, ?, ?)',
+                               [(ramp_id, source_id, position) for _, ramp_id, source_id, position in rows])
 
-        # also map ramp IDs to themselves so already-canonical IDs pass through
-        for ramp_id in list(self.ramp_to_sources.keys()):
-            self.source_to_ramp[self._normalize_id(ramp_id)] = ramp_id
+    def _snapshot_connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = open_snapshot_connection(self.snapshot_path)
+            self._local.connection = connection
+        return connection
 
-        print(f"RampMetaboliteIdResolver: loaded {len(self.source_to_ramp)} source IDs "
-              f"for {len(self.ramp_to_sources)} metabolites")
+    def _query_snapshot(self, query: str, keys: List[str]) -> List[tuple]:
+        cur = self._snapshot_connection().cursor()
+        rows = []
+        for i in range(0, len(keys), self.max_lookup_vars):
+            chunk = keys[i:i + self.max_lookup_vars]
+            cur.execute(query.format(",".join("?" * len(chunk))), tuple(chunk))
+            rows.extend(cur.fetchall())
+        return rows
+
+    @staticmethod
+    def _cached_values(cache: ResolveCache, keys) -> tuple:
+        found, missing = {}, []
+        for key in keys:
+            value = cache.get(key, _MISSING)
+            if value is _MISSING:
+                missing.append(key)
+            else:
+                found[key] = value
+        return found, missing
+
+    def _lookup_from_snapshot(self, input_nodes: List[Node]):
+        normalized_ids = sorted({self._normalize_id(node.id) for node in input_nodes})
+        source_to_ramp, missing = self._cached_values(self.ramp_id_cache, normalized_ids)
+        if missing:
+            fetched = dict(self._query_snapshot(
+                'SELECT source_id, ramp_id FROM source_to_ramp WHERE source_id IN ({})', missing))
+            for source_id in missing:
+                # unknown ids are cached too, as None
+                ramp_id = fetched.get(source_id)
+                self.ramp_id_cache[source_id] = ramp_id
+                source_to_ramp[source_id] = ramp_id
+
+        ramp_ids = sorted({ramp_id for ramp_id in source_to_ramp.values() if ramp_id is not None})
+        ramp_to_sources, missing = self._cached_values(self.sources_cache, ramp_ids)
+        if missing:
+            fetched = {}
+            for ramp_id, source_id in self._query_snapshot(
+                    'SELECT ramp_id, source_id FROM ramp_sources WHERE ramp_id IN ({}) ORDER BY ramp_id, position',
+                    missing):
+                fetched.setdefault(ramp_id, []).append(source_id)
+            for ramp_id in missing:
+                sources = fetched.get(ramp_id, [])
+                self.sources_cache[ramp_id] = sources
+                ramp_to_sources[ramp_id] = sources
+        return source_to_ramp, ramp_to_sources
 
     def resolve_internal(self, input_nodes: List[Node]) -> Dict[str, List[IdMatch]]:
+        source_to_ramp, ramp_to_sources = self._lookup_from_snapshot(input_nodes)
+
         result_list = {}
         for node in input_nodes:
-            ramp_id = self.source_to_ramp.get(self._normalize_id(node.id))
+            ramp_id = source_to_ramp.get(self._normalize_id(node.id))
             if ramp_id is not None:
                 match_type = 'exact' if node.id == ramp_id else 'sourceId'
                 result_list[node.id] = [
                     IdMatch(
                         input=node.id,
                         match=ramp_id,
-                        equivalent_ids=self.ramp_to_sources.get(ramp_id, []),
+                        equivalent_ids=list(ramp_to_sources.get(ramp_id, [])),
                         context=[match_type]
                     )
                 ]
             else:
                 result_list[node.id] = []
-        return result_list
\ No newline at end of file
+        return result_list
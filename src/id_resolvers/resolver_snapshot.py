@@ -1,5 +1,13 @@
+import hashlib
+import os
+import sqlite3
+from pathlib import Path
+from typing import Optional
+
 from src.registry.fetchers import MaterializedDataset
 
+SNAPSHOT_MMAP_SIZE = 1 << 34
+
 
 def resolver_definition(resolver_snapshot: MaterializedDataset) -> dict:
     return resolver_snapshot.manifest.get("definition") or {}
@@ -20,3 +28,40 @@ def resolver_input(resolver_snapshot: MaterializedDataset, input_name: str) -> M
         raise KeyError(
             f"Resolver snapshot {resolver_snapshot.snapshot_id} does not define input {input_name!r}"
         ) from exc
+
+
+def resolver_build_key(resolver_snapshot: Optional[MaterializedDataset]) -> Optional[str]:
+    if resolver_snapshot is None:
+        return None
+    return resolver_snapshot.manifest.get("build_key") or resolver_snapshot.snapshot_id
+
+
+def snapshot_file_path(snapshot_dir: str, resolver_name: str, *key_parts) -> Path:
+    """Location of an immutable lookup snapshot, named by a digest of its key parts.
+
+    Key parts should pin everything the snapshot content depends on (registry build key,
+    input version info, options), so a file at this path never needs revalidation.
+    """
+    digest = hashlib.sha256("\t".join(str(part) for part in key_parts).encode("utf-8")).hexdigest()[:20]
+    return Path(snapshot_dir).expanduser() / f"{resolver_name}-{digest}.sqlite"
+
+
+def open_snapshot_connection(path: Path, mmap_size: int = SNAPSHOT_MMAP_SIZE) -> sqlite3.Connection:
+    # immutable=1 skips locking and change detection; with mmap every process opening
+    # the same file reads the same OS page cache pages instead of private copies.
+    connection = sqlite3.connect(f"file:{path}?mode=ro&immutable=1", uri=True, check_same_thread=False)
+    connection.execute(f"PRAGMA mmap_size = {mmap_size}")
+    return connection
+
+
+def export_sqlite_snapshot(connection: sqlite3.Connection, path: Path) -> Path:
+    """Write a compacted copy of the database behind connection to path, atomically."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    if tmp_path.exists():
+        tmp_path.unlink()
+    connection.execute("VACUUM INTO ?", (str(tmp_path),))
+    os.chmod(tmp_path, 0o444)
+    os.replace(tmp_path, path)
+    return path
@@ -1,11 +1,15 @@
 import os.path
 import sqlite3
 import threading
+import time
+from itertools import islice
 from pathlib import Path
 from contextlib import closing
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import List, Dict, Generator, Any
+from typing import List, Dict, Generator, Any, Iterable, Optional
+from src.id_resolvers.resolver_snapshot import export_sqlite_snapshot, open_snapshot_connection, \
+    resolver_build_key, snapshot_file_path
 from src.interfaces.id_resolver import IdResolver, IdMatch
 from src.models.node import Node
 
@@ -23,21 +27,74 @@ class MatchingPair:
 
 class SqliteCacheResolver(IdResolver, ABC):
     connection: sqlite3.Connection = None
+    snapshot_path: Path = None
     sqlite_busy_timeout_ms = 300000
+    populate_chunk_size = 100000
+    lookup_strategies = ("temp_table", "in_list")
+    max_lookup_vars = 50000
+    bulk_load_cache_size_kib = 262144
 
     def cache_location(self):
         return str(DEFAULT_SQLITE_RESOLVER_CACHE_DIR / f"{self.__class__.__name__}.sqlite")
 
-    def __init__(self, **kwargs):
+    def __init__(self, lookup_strategy: str = "temp_table", snapshot_dir: str = None, **kwargs):
+        if lookup_strategy not in self.lookup_strategies:
+            raise ValueError(f"Unknown lookup_strategy '{lookup_strategy}'. Known strategies: {list(self.lookup_strategies)}")
+        self.lookup_strategy = lookup_strategy
         IdResolver.__init__(self, **kwargs)
+        # _sqlite_lock guards the writer connection (cache build and version checks);
+        # lookups go through per-thread read-only connections and do not take it.
         self._sqlite_lock = threading.RLock()
+        self._local = threading.local()
+        self._read_connections = []
+
+        prebuilt_path = self.prebuilt_index_path()
+        if prebuilt_path is not None:
+            print(f'\tusing prebuilt resolver index {prebuilt_path}')
+            self.snapshot_path = prebuilt_path
+            return
+
+        if snapshot_dir is not None:
+            snapshot_path = self.get_snapshot_path(snapshot_dir)
+            if snapshot_path.exists():
+                print(f'\tusing read-only resolver snapshot {snapshot_path}')
+                self.snapshot_path = snapshot_path
+                return
+
         self.connection = self.create_connection()
 
-        if self.db_is_corrupt() or self.input_version_has_changed():
-            self.create_lookup_db()
-            self.populate_lookup_db()
-        else:
-            print('\tusing existing sqlite database for id resolution')
+        with self._sqlite_lock:
+            if self.db_is_corrupt() or self.input_version_has_changed():
+                self.create_lookup_db()
+                self.populate_lookup_db()
+            else:
+                print('\tusing existing sqlite database for id resolution')
+            if snapshot_dir is not None:
+                self.export_snapshot(snapshot_path)
+                self.snapshot_path = snapshot_path
+
+    def prebuilt_index_path(self) -> Optional[Path]:
+        """Path of a lookup db built ahead of time (e.g. published to the registry), if any.
+
+        When set, the resolver opens it read-only and never builds a local cache.
+        """
+        return None
+
+    def get_snapshot_path(self, snapshot_dir: str) -> Path:
+        return snapshot_file_path(
+            snapshot_dir,
+            self.__class__.__name__,
+            resolver_build_key(getattr(self, "resolver_snapshot", None)),
+            self.get_version_info(),
+        )
+
+    def export_snapshot(self, path) -> Path:
+        """Write the lookup db to an immutable snapshot file other processes can open read-only."""
+        with self._sqlite_lock:
+            self.connection.commit()
+            export_sqlite_snapshot(self.connection, path)
+        print(f'\texported resolver snapshot {path}')
+        return Path(path)
 
     def create_connection(self):
         cache_loc = self.cache_location()
@@ -55,7 +112,33 @@ class SqliteCacheResolver(IdResolver, ABC):
             print(f"\tunable to enable sqlite WAL mode for id resolver cache: {exc}")
         return connection
 
+    def read_connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            if self.snapshot_path is not None:
+                connection = open_snapshot_connection(self.snapshot_path)
+            else:
+                connection = sqlite3.connect(
+                    f"file:{self.cache_location()}?mode=ro",
+                    uri=True,
+                    check_same_thread=False,
+                    timeout=self.sqlite_busy_timeout_ms / 1000,
+                )
+                connection.execute(f"PRAGMA busy_timeout = {self.sqlite_busy_timeout_ms}")
+            self._local.connection = connection
+            with self._sqlite_lock:
+                self._read_connections.append(connection)
+        return connection
+
+    def close_read_connections(self):
+        with self._sqlite_lock:
+            for connection in self._read_connections:
+                connection.close()
+            self._read_connections = []
+            self._local = threading.local()
+
     def reset_connection(self):
+        self.close_read_connections()
         if self.connection is not None:
             self.connection.close()
         cache_loc = self.cache_location()
@@ -114,17 +197,79 @@ class SqliteCacheResolver(IdResolver, ABC):
                 cur.execute('DROP TABLE IF EXISTS matches')
                 cur.execute('DROP TABLE IF EXISTS file_metadata')
 
+                # indexes are built by populate_lookup_db once the rows are loaded
                 cur.execute('CREATE TABLE matches (id TEXT, match TEXT, type TEXT)')
-                cur.execute('CREATE INDEX id_index ON matches (id)')
-                cur.execute('CREATE INDEX match_index ON matches (match)')
                 cur.execute('CREATE TABLE file_metadata (version_key TEXT)')
 
             self.connection.commit()
 
+    @staticmethod
+    def create_lookup_indexes(cur):
+        cur.execute('CREATE INDEX IF NOT EXISTS id_index ON matches (id)')
+        cur.execute('CREATE INDEX IF NOT EXISTS match_index ON matches (match)')
+
     def populate_lookup_db(self):
-        matches = list(set([match for match in self.matching_ids()]))
-        self.save_to_sqlite(matches)
-        self.store_file_metadata()
+        """Stream matching_ids() into sqlite in chunks, all inside one transaction.
+
+        Rows are staged in a temp table and de-duplicated by sqlite on the way into
+        matches, so memory use does not grow with the size of the source. Indexes and
+        the version key are written last, in the same transaction, so an interrupted
+        build is detected as stale on the next start.
+        """
+        start_time = time.time()
+        with self._sqlite_lock:
+            self._set_bulk_load_pragmas(True)
+            try:
+                with closing(self.connection.cursor()) as cur:
+                    cur.execute('BEGIN')
+                    cur.execute('DROP TABLE IF EXISTS temp.staged_matches')
+                    cur.execute('CREATE TEMP TABLE staged_matches (id TEXT, match TEXT, type TEXT)')
+                    staged_count = self._stage_matches(cur, self.matching_ids(), start_time)
+
+                    cur.execute('INSERT INTO matches SELECT DISTINCT id, match, type FROM temp.staged_matches')
+                    cur.execute('DROP TABLE temp.staged_matches')
+                    cur.execute('SELECT COUNT(*) FROM matches')
+                    match_count = cur.fetchone()[0]
+
+                    index_start = time.time()
+                    self.create_lookup_indexes(cur)
+                    print(f'\tbuilt lookup indexes in {time.time() - index_start:.2f} seconds')
+
+                    cur.execute('DELETE FROM file_metadata')
+                    cur.execute('INSERT INTO file_metadata (version_key) VALUES (?)', (self.get_version_info(),))
+                self.connection.commit()
+            except BaseException:
+                self.connection.rollback()
+                raise
+            finally:
+                self._set_bulk_load_pragmas(False)
+
+        elapsed = max(time.time() - start_time, 1e-9)
+        print(f'\tloaded {match_count} unique matches ({staged_count} staged) in {elapsed:.2f} seconds '
+              f'({staged_count / elapsed:,.0f} rows/sec)')
+
+    def _stage_matches(self, cur, matches: Iterable[MatchingPair], start_time: float) -> int:
+        staged_count = 0
+        match_iter = iter(matches)
+        while True:
+            chunk = [(match.id, match.match, match.type)
+                     for match in islice(match_iter, self.populate_chunk_size)]
+            if not chunk:
+                break
+            cur.executemany('INSERT INTO temp.staged_matches VALUES (?, ?, ?)', chunk)
+            staged_count += len(chunk)
+            if staged_count % (self.populate_chunk_size * 10) == 0:
+                elapsed = max(time.time() - start_time, 1e-9)
+                print(f'\tstaged {staged_count} matches ({staged_count / elapsed:,.0f} rows/sec)')
+        return staged_count
+
+    def _set_bulk_load_pragmas(self, enabled: bool):
+        if enabled:
+            self.connection.execute('PRAGMA synchronous = OFF')
+            self.connection.execute(f'PRAGMA cache_size = -{self.bulk_load_cache_size_kib}')
+        else:
+            self.connection.execute('PRAGMA synchronous = NORMAL')
+            self.connection.execute('PRAGMA cache_size = -2000')
 
     def store_file_metadata(self):
         with self._sqlite_lock:
@@ -141,36 +286,37 @@ class SqliteCacheResolver(IdResolver, ABC):
             self.connection.commit()
 
     def get_prefix_counts(self) -> List[Dict[str, object]]:
-        with self._sqlite_lock:
-            with closing(self.connection.cursor()) as cur:
-                cur.execute("""
-                    SELECT
-                        substr(match, 1, instr(match, ':') - 1) AS prefix,
-                        COUNT(DISTINCT match) AS count
-                    FROM matches
-                    WHERE instr(match, ':') > 1
-                    GROUP BY prefix
-                    ORDER BY count DESC, prefix
-                """)
-                return [
-                    {"prefix": prefix, "count": count}
-                    for prefix, count in cur.fetchall()
-                ]
+        with closing(self.read_connection().cursor()) as cur:
+            cur.execute("""
+                SELECT
+                    substr(match, 1, instr(match, ':') - 1) AS prefix,
+                    COUNT(DISTINCT match) AS count
+                FROM matches
+                WHERE instr(match, ':') > 1
+                GROUP BY prefix
+                ORDER BY count DESC, prefix
+            """)
+            return [
+                {"prefix": prefix, "count": count}
+                for prefix, count in cur.fetchall()
+            ]
 
     def get_example_ids(self, limit: int = 5) -> List[str]:
-        with self._sqlite_lock:
-            with closing(self.connection.cursor()) as cur:
-                cur.execute("""
-                    SELECT match, MIN(CASE WHEN id = match THEN 1 ELSE 0 END) AS exact_rank
-                    FROM matches
-                    WHERE instr(match, ':') > 1
-                    GROUP BY match
-                    ORDER BY exact_rank, match
-                    LIMIT ?
-                """, (limit,))
-                return [row[0] for row in cur.fetchall()]
+        with closing(self.read_connection().cursor()) as cur:
+            cur.execute("""
+                SELECT match, MIN(CASE WHEN id = match THEN 1 ELSE 0 END) AS exact_rank
+                FROM matches
+                WHERE instr(match, ':') > 1
+                GROUP BY match
+                ORDER BY exact_rank, match
+                LIMIT ?
+            """, (limit,))
+            return [row[0] for row in cur.fetchall()]
 
     def __del__(self):
+        if getattr(self, "_sqlite_lock", None) is None:
+            return
+        self.close_read_connections()
         if self.connection is not None:
             with self._sqlite_lock:
                 self.connection.close()
@@ -183,46 +329,62 @@ class SqliteCacheResolver(IdResolver, ABC):
     def matching_ids(self) -> Generator[MatchingPair, Any, None]:
         raise NotImplementedError('derived class must implement matching_ids')
 
+    def select_matches(self, cur, columns: str, key_column: str, keys: List[str], table: str = "matches") -> List[tuple]:
+        """Return `columns` from table for every row whose key_column is in keys.
+
+        temp_table bulk-loads the keys into an indexed temp table and joins it against
+        the lookup table; in_list issues chunked `IN (...)` queries.
+        """
+        if not keys:
+            return []
+        if self.lookup_strategy == "in_list":
+            rows = []
+            for i in range(0, len(keys), self.max_lookup_vars):
+                chunk = keys[i:i + self.max_lookup_vars]
+                cur.execute(f'SELECT {columns} FROM {table} WHERE {key_column} IN ({",".join("?" * len(chunk))})',
+                            tuple(chunk))
+                rows.extend(cur.fetchall())
+            return rows
+
+        cur.execute('CREATE TEMP TABLE IF NOT EXISTS lookup_keys (key TEXT PRIMARY KEY) WITHOUT ROWID')
+        try:
+            cur.executemany('INSERT OR IGNORE INTO temp.lookup_keys VALUES (?)', ((key,) for key in keys))
+            # CROSS JOIN pins lookup_keys as the outer loop; the temp table has no stats and
+            # the planner otherwise may scan the whole lookup table for small batches.
+            qualified = ", ".join(f"{table}.{column.strip()}" for column in columns.split(","))
+            cur.execute(f'SELECT {qualified} FROM temp.lookup_keys '
+                        f'CROSS JOIN {table} ON {table}.{key_column} = lookup_keys.key')
+            return cur.fetchall()
+        finally:
+            cur.execute('DELETE FROM temp.lookup_keys')
+            cur.connection.commit()
+
     def resolve_internal(self, input_nodes: List[Node]) -> Dict[str, List[IdMatch]]:
         result_list = {}
         id_list = [node.id for node in input_nodes]
-        with self._sqlite_lock:
-            with closing(self.connection.cursor()) as cur:
-                max_vars = 50000
-                id_chunks = [id_list[i:i + max_vars] for i in range(0, len(id_list), max_vars)]
-                id_matches = []
-                for chunk in id_chunks:
-                    if not chunk:
-                        continue
-                    cur.execute('SELECT id, match, type FROM matches WHERE match IN ({})'.format(','.join('?' * len(chunk))), tuple(chunk))
-                    id_matches.extend(cur.fetchall())
-
-                if len(id_matches) > 0:
-                    resolved_id_list = set()
-                    for (resolved_id, input_id, type) in id_matches:
-                        resolved_id_list.add(resolved_id)
-                        match_type = 'exact' if resolved_id == input_id else type
-                        if input_id not in result_list:
-                            result_list[input_id] = [IdMatch(input=input_id, match=resolved_id, equivalent_ids=[], context=[match_type])]
-                        else:
-                            result_list[input_id].append(IdMatch(input=input_id, match=resolved_id, equivalent_ids=[], context=[match_type]))
-
-                    equiv_id_matches = []
-                    resolved_ids = list(resolved_id_list)
-                    for chunk in [resolved_ids[i:i + max_vars] for i in range(0, len(resolved_ids), max_vars)]:
-                        if not chunk:
-                            continue
-                        cur.execute("SELECT id, match FROM matches WHERE id IN ({})".format(','.join('?' * len(chunk))), tuple(chunk))
-                        equiv_id_matches.extend(cur.fetchall())
-
-                    match_map = {}
-                    for (resolved_id, matching_id) in equiv_id_matches:
-                        if resolved_id not in match_map:
-                            match_map[resolved_id] = []
-                        match_map[resolved_id].append(matching_id)
-
-                    for match_list in result_list.values():
-                        for match in match_list:
-                            match.equivalent_ids = match_map.get(match.match, [])
+        with closing(self.read_connection().cursor()) as cur:
+            id_matches = self.select_matches(cur, 'id, match, type', 'match', id_list)
+
+            if len(id_matches) > 0:
+                resolved_id_list = set()
+                for (resolved_id, input_id, type) in id_matches:
+                    resolved_id_list.add(resolved_id)
+                    match_type = 'exact' if resolved_id == input_id else type
+                    if input_id not in result_list:
+                        result_list[input_id] = [IdMatch(input=input_id, match=resolved_id, equivalent_ids=[], context=[match_type])]
+                    else:
+                        result_list[input_id].append(IdMatch(input=input_id, match=resolved_id, equivalent_ids=[], context=[match_type]))
+
+                equiv_id_matches = self.select_matches(cur, 'id, match', 'id', list(resolved_id_list))
+
+                match_map = {}
+                for (resolved_id, matching_id) in equiv_id_matches:
+                    if resolved_id not in match_map:
+                        match_map[resolved_id] = []
+                    match_map[resolved_id].append(matching_id)
+
+                for match_list in result_list.values():
+                    for match in match_list:
+                        match.equivalent_ids = match_map.get(match.match, [])
 
         return result_list
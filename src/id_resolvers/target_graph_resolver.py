@@ -1,8 +1,12 @@
+import hashlib
+import time
+from pathlib import Path
 from typing import List, Any, Generator, Optional
 
 from src.constants import Prefix
 from src.id_resolvers.resolver_snapshot import resolver_input, resolver_options
 from src.id_resolvers.sqlite_cache_resolver import SqliteCacheResolver, MatchingPair
+from src.id_resolvers.target_match_index import TargetMatchIndex
 from src.interfaces.id_resolver import IdMatch
 from src.models.node import EquivalentId
 from src.shared.targetgraph_parser import TargetGraphGeneParser, TargetGraphTranscriptParser, TargetGraphProteinParser, \
@@ -125,7 +129,7 @@ class TCRDTargetResolver(TargetGraphResolver):
             version_info.append(parser.get_version_info())
         return '\t'.join(version_info)
 
-    def __init__(self, resolver_snapshot, reviewed_only: bool = False, **kwargs):
+    def __init__(self, resolver_snapshot, reviewed_only: bool = False, match_index_dir: str = None, **kwargs):
         self.resolver_snapshot = resolver_snapshot
         options = resolver_options(resolver_snapshot)
         collapse_to_canonical = options.get("collapse_to_canonical", False)
@@ -143,96 +147,113 @@ class TCRDTargetResolver(TargetGraphResolver):
         self.transcript_parser = TargetGraphTranscriptParser(file_path=transcript_file_path)
         self.collapse_to_canonical = collapse_to_canonical
         self.reviewed_only = reviewed_only
+        self.match_index_dir = match_index_dir or str(Path(self.cache_location()).parent)
 
         TargetGraphResolver.__init__(self, canonical_class=_resolve_canonical_class(canonical_type), **kwargs)
 
-    def matching_ids(self) -> Generator[MatchingPair, Any, None]:
-        transcript_ids, transcript_id_idx, transcript_gene_map = self.get_transcript_ids()
+    def match_index_config_prefix(self) -> str:
+        # the options that shape the index; each combination keeps its own file
+        config = f"reviewed only: {self.reviewed_only}\tcollapse to canonical: {self.collapse_to_canonical}"
+        digest = hashlib.sha256(config.encode("utf-8")).hexdigest()[:8]
+        return f"{self.__class__.__name__}-{digest}"
+
+    def match_index_path(self) -> Optional[Path]:
+        match_index_dir = getattr(self, "match_index_dir", None)
+        if match_index_dir is None:
+            return None
+        digest = hashlib.sha256(self.get_version_info().encode("utf-8")).hexdigest()[:20]
+        return Path(match_index_dir) / f"{self.match_index_config_prefix()}-{digest}.match_index.pkl"
+
+    def get_match_index(self) -> TargetMatchIndex:
+        path = self.match_index_path()
+        if path is not None and path.exists():
+            index = TargetMatchIndex.load(path)
+            if index is not None:
+                print(f"\tloaded target match index from {path}")
+                return index
+
+        start_time = time.time()
+        index = self.build_match_index()
+        print(f"\tbuilt target match index in {time.time() - start_time:.2f} seconds: {index.memory_summary()}")
+        if path is not None:
+            # older input versions of this configuration only
+            for stale_path in path.parent.glob(f"{self.match_index_config_prefix()}-*.match_index.pkl"):
+                stale_path.unlink()
+            index.save(path)
+        return index
+
+    def build_match_index(self) -> TargetMatchIndex:
+        index = TargetMatchIndex()
+        self.add_transcript_ids(index)
+        self.add_gene_ids(index)
+        self.add_protein_ids(index, self.reviewed_only, self.collapse_to_canonical)
+        return index.finalize()
 
-        gene_ids, gene_ids_idx = self.get_gene_ids()
-        protein_ids, protein_transcript_map, protein_gene_map = self.get_protein_ids(
-            self.reviewed_only, self.collapse_to_canonical
-        )
+    def matching_ids(self) -> Generator[MatchingPair, Any, None]:
+        index = self.get_match_index()
+        genes, transcripts = index.genes, index.transcripts
 
         missing_transcripts = set()
         missing_genes = set()
         missing_t_genes = set()
 
-        for protein_ifx_id in protein_ids.keys():
-            if protein_ifx_id in protein_transcript_map and len(protein_transcript_map[protein_ifx_id]) > 0:
-                for match in protein_transcript_map[protein_ifx_id]:
-                    if match not in transcript_id_idx:
-                        missing_transcripts.add(match)
-                    else:
-                        transcript_ifx_ids = transcript_id_idx[match]
-                        for transcript_ifx_id in transcript_ifx_ids:
-                            if transcript_ifx_id in transcript_gene_map:
-                                for gene_alias in transcript_gene_map[transcript_ifx_id]:
-                                    if gene_alias not in gene_ids_idx:
-                                        missing_t_genes.add(gene_alias)
-                                    else:
-                                        gene_ifx_ids = gene_ids_idx[gene_alias]
-                                        for gene_ifx_id in gene_ifx_ids:
-                                            equivalent_ids = gene_ids[gene_ifx_id]
-                                            for gene_alias in equivalent_ids:
-                                                protein_ids[protein_ifx_id].add(MatchingPair(id=protein_ifx_id, match=gene_alias.match, type=gene_alias.type))
-
-                            equivalent_ids = transcript_ids[transcript_ifx_id]
-                            for transcript_alias in equivalent_ids:
-                                protein_ids[protein_ifx_id].add(MatchingPair(id=protein_ifx_id, match=transcript_alias.match, type=transcript_alias.type))
-
-            if protein_ifx_id in protein_gene_map and len(protein_gene_map[protein_ifx_id]) > 0:
-                for match in protein_gene_map[protein_ifx_id]:
-                    if match not in gene_ids_idx:
-                        missing_genes.add(match)
-                    else:
-                        gene_ifx_ids = gene_ids_idx[match]
-                        for gene_ifx_id in gene_ifx_ids:
-                            equivalent_ids = gene_ids[gene_ifx_id]
-                            for gene_alias in equivalent_ids:
-                                protein_ids[protein_ifx_id].add(MatchingPair(id=protein_ifx_id, match=gene_alias.match, type=gene_alias.type))
+        def add_gene_aliases(pairs, gene_alias, missing):
+            if not genes.has_alias(gene_alias):
+                missing.add(gene_alias)
+                return
+            for gene_ifx_id in genes.entities_for(gene_alias):
+                pairs.update(genes.aliases_of(gene_ifx_id))
+
+        # pairs for one protein are built, emitted and dropped before the next, rather
+        # than holding a set of MatchingPairs per protein for the whole run
+        for protein_ifx_id in index.protein_keys():
+            pairs = set(index.protein_pairs.values_of(protein_ifx_id))
+
+            for (transcript_alias,) in index.protein_transcripts.values_of(protein_ifx_id):
+                if not transcripts.has_alias(transcript_alias):
+                    missing_transcripts.add(transcript_alias)
+                    continue
+                for transcript_ifx_id in transcripts.entities_for(transcript_alias):
+                    for (gene_alias,) in index.transcript_genes.values_of(transcript_ifx_id):
+                        add_gene_aliases(pairs, gene_alias, missing_t_genes)
+                    pairs.update(transcripts.aliases_of(transcript_ifx_id))
+
+            for (gene_alias,) in index.protein_genes.values_of(protein_ifx_id):
+                add_gene_aliases(pairs, gene_alias, missing_genes)
+
+            protein_id = index.value(protein_ifx_id)
+            for match, match_type in pairs:
+                yield MatchingPair(id=protein_id, match=index.value(match), type=index.value(match_type))
 
         print('missing transcripts')
         for tx in missing_transcripts:
-            print(f"\t{tx}")
+            print(f"\t{index.value(tx)}")
 
         print('missing genes')
         for gene in missing_genes:
-            print(f"\t{gene}")
+            print(f"\t{index.value(gene)}")
 
         print('missing transcript genes')
         for gene in missing_t_genes:
-            print(f"\t{gene}")
-
-        for p in protein_ids.keys():
-            for match in protein_ids[p]:
-                yield match
-
-    def get_gene_ids(self):
-        gene_map = {}
-        gene_id_idx = {}
+            print(f"\t{index.value(gene)}")
 
+    def add_gene_ids(self, index: TargetMatchIndex):
+        exact = index.intern('exact')
         for line in self.gene_parser.all_rows():
-            gene_id = self.gene_parser.get_id(line)
-
-            equiv_ids = self.gene_parser.get_equivalent_ids(line)
-            ids = [MatchingPair(id=gene_id, match=gene_id, type='exact')]
-            for equiv_ids in equiv_ids:
-                equiv_id_str = equiv_ids.id_str()
-                ids.append(MatchingPair(id=gene_id, match=equiv_id_str, type=equiv_ids.type.value))
-                if equiv_id_str not in gene_id_idx:
-                    gene_id_idx[equiv_id_str] = set()
-                gene_id_idx[equiv_id_str].add(gene_id)
-            gene_map[gene_id] = set(ids)
-
-        return gene_map, gene_id_idx
-
-    def get_protein_ids(self, reviewed_only: bool, collapse_to_canonical: bool):
-        protein_ids = {}
-        protein_transcript_map = {}
-        protein_gene_map = {}
+            gene_id = index.intern(self.gene_parser.get_id(line))
+            pairs = {(gene_id, exact)}
+            aliases = []
+            for equiv_id in self.gene_parser.get_equivalent_ids(line):
+                alias = index.intern(equiv_id.id_str())
+                pairs.add((alias, index.intern(equiv_id.type.value)))
+                aliases.append(alias)
+            index.genes.add_row(gene_id, pairs, aliases)
+
+    def add_protein_ids(self, index: TargetMatchIndex, reviewed_only: bool, collapse_to_canonical: bool):
         protein_rows = []
         canonical_protein_ids = set()
+        exact = index.intern('exact')
+        isoform = index.intern('isoform')
 
         for parser in self.protein_parsers:
             for line in parser.all_rows():
@@ -252,65 +273,42 @@ class TCRDTargetResolver(TargetGraphResolver):
                     continue
                 target_protein_id = canonical_protein_id
 
-            if target_protein_id not in protein_transcript_map:
-                protein_transcript_map[target_protein_id] = set()
-            if target_protein_id not in protein_gene_map:
-                protein_gene_map[target_protein_id] = set()
-
-            if target_protein_id not in protein_ids:
-                protein_ids[target_protein_id] = set()
-
-            match_type = 'exact' if target_protein_id == protein_id else 'isoform'
-            protein_ids[target_protein_id].add(
-                MatchingPair(id=target_protein_id, match=protein_id, type=match_type)
-            )
+            target = index.intern(target_protein_id)
+            match_type = exact if target_protein_id == protein_id else isoform
+            index.protein_pairs.add(target, index.intern(protein_id), match_type)
 
             for equiv_id in parser.get_equivalent_ids(line):
-                protein_ids[target_protein_id].add(
-                    MatchingPair(id=target_protein_id, match=equiv_id.id_str(), type=equiv_id.type.value)
-                )
-
-            transcript_ids = parser.get_transcript_ids(line)
-            gene_id = parser.get_gene_id(line)
+                index.protein_pairs.add(target, index.intern(equiv_id.id_str()), index.intern(equiv_id.type.value))
 
-            for transcript_id in transcript_ids:
+            for transcript_id in parser.get_transcript_ids(line):
                 transcript_id_to_use = EquivalentId(id=transcript_id, type=Prefix.ENSEMBL).id_str()
-                protein_transcript_map[target_protein_id].add(transcript_id_to_use)
+                index.protein_transcripts.add(target, index.intern(transcript_id_to_use))
 
+            gene_id = parser.get_gene_id(line)
             if gene_id is not None:
                 gene_id_to_use = EquivalentId(id=gene_id, type=Prefix.NCBIGene).id_str()
-                protein_gene_map[target_protein_id].add(gene_id_to_use)
-
-        return protein_ids, protein_transcript_map, protein_gene_map
+                index.protein_genes.add(target, index.intern(gene_id_to_use))
 
-    def get_transcript_ids(self):
-        transcript_gene_map = {}
-        transcript_id_idx = {}
-        transcript_ids = {}
+    def add_transcript_ids(self, index: TargetMatchIndex):
+        exact = index.intern('exact')
         for line in self.transcript_parser.all_rows():
-            transcript_id = self.transcript_parser.get_id(line)
-            if transcript_id not in transcript_gene_map:
-                transcript_gene_map[transcript_id] = set()
+            transcript_id = index.intern(self.transcript_parser.get_id(line))
 
             ensg_id = self.transcript_parser.get_associated_ensg_id(line)
             ncbi_id = self.transcript_parser.get_associated_ncbi_id(line)
 
             if ensg_id is not None and len(ensg_id) > 0:
                 gene_id = EquivalentId(id=ensg_id, type=Prefix.ENSEMBL).id_str()
-                transcript_gene_map[transcript_id].add(gene_id)
+                index.transcript_genes.add(transcript_id, index.intern(gene_id))
 
             if ncbi_id is not None and len(ncbi_id) > 0:
                 gene_id = EquivalentId(id=ncbi_id, type=Prefix.NCBIGene).id_str()
-                transcript_gene_map[transcript_id].add(gene_id)
-
-            equiv_ids = self.transcript_parser.get_equivalent_ids(line)
-            ids = [MatchingPair(id=transcript_id, match=transcript_id, type='exact')]
-            for equiv_ids in equiv_ids:
-                transcript_id_str = equiv_ids.id_str()
-                ids.append(MatchingPair(id=transcript_id, match=transcript_id_str, type=equiv_ids.type.value))
-                if transcript_id_str not in transcript_id_idx:
-                    transcript_id_idx[transcript_id_str] = set()
-                transcript_id_idx[transcript_id_str].add(transcript_id)
-
-            transcript_ids[transcript_id] = set(ids)
-        return transcript_ids, transcript_id_idx, transcript_gene_map
+                index.transcript_genes.add(transcript_id, index.intern(gene_id))
+
+            pairs = {(transcript_id, exact)}
+            aliases = []
+            for equiv_id in self.transcript_parser.get_equivalent_ids(line):
+                alias = index.intern(equiv_id.id_str())
+                pairs.add((alias, index.intern(equiv_id.type.value)))
+                aliases.append(alias)
+            index.transcripts.add_row(transcript_id, pairs, aliases)
@@ -0,0 +1,192 @@
+import os
+import pickle
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+def _int_array(values: Iterable[int] = ()) -> array:
+    return array('q', values)
+
+
+def _group_by_key(keys: array, key_count: int, *columns: array) -> Tuple[array, List[array]]:
+    """Counting sort of parallel columns by an integer key.
+
+    Returns CSR offsets (rows for key k live in [offsets[k], offsets[k + 1])) and the
+    regrouped columns. Stable, so rows keep their insertion order within a key.
+    """
+    offsets = _int_array([0]) * (key_count + 1)
+    for key in keys:
+        offsets[key + 1] += 1
+    for key in range(key_count):
+        offsets[key + 1] += offsets[key]
+
+    cursor = array('q', offsets)
+    grouped = [_int_array([0]) * len(keys) for _ in columns]
+    for row, key in enumerate(keys):
+        position = cursor[key]
+        cursor[key] += 1
+        for source, target in zip(columns, grouped):
+            target[position] = source[row]
+    return offsets, grouped
+
+
+class StringInterner:
+    def __init__(self):
+        self.values: List[str] = []
+        self.index: Optional[Dict[str, int]] = {}
+
+    @classmethod
+    def frozen(cls, values: List[str]) -> "StringInterner":
+        # lookups by string are only needed while building; a loaded index walks ints
+        interner = cls()
+        interner.values = values
+        interner.index = None
+        return interner
+
+    def intern(self, value: str) -> int:
+        key = self.index.get(value)
+        if key is None:
+            key = len(self.values)
+            self.index[value] = key
+            self.values.append(value)
+        return key
+
+    def __len__(self):
+        return len(self.values)
+
+
+class AliasTable:
+    """Entity -> (alias, type) rows plus a reverse alias -> entity index, as int arrays.
+
+    Mirrors the dict-of-sets shape TCRDTargetResolver used to build: when an entity
+    appears on several rows its last row's aliases win, while the reverse index keeps
+    every row's contribution.
+    """
+
+    def __init__(self):
+        self.row_entities = _int_array()
+        self.row_offsets = _int_array([0])
+        self.row_aliases = _int_array()
+        self.row_types = _int_array()
+        self.index_aliases = _int_array()
+        self.index_entities = _int_array()
+
+    def add_row(self, entity: int, pairs: Iterable[Tuple[int, int]], indexed_aliases: Iterable[int]):
+        self.row_entities.append(entity)
+        for alias, alias_type in pairs:
+            self.row_aliases.append(alias)
+            self.row_types.append(alias_type)
+        self.row_offsets.append(len(self.row_aliases))
+        for alias in indexed_aliases:
+            self.index_aliases.append(alias)
+            self.index_entities.append(entity)
+
+    def finalize(self, key_count: int):
+        self.entity_row = _int_array([-1]) * key_count
+        for row, entity in enumerate(self.row_entities):
+            self.entity_row[entity] = row
+        self.alias_offsets, (self.alias_entities,) = _group_by_key(self.index_aliases, key_count, self.index_entities)
+        del self.index_aliases, self.index_entities
+
+    def aliases_of(self, entity: int) -> Iterable[Tuple[int, int]]:
+        row = self.entity_row[entity]
+        if row < 0:
+            return ()
+        start, end = self.row_offsets[row], self.row_offsets[row + 1]
+        return zip(self.row_aliases[start:end], self.row_types[start:end])
+
+    def has_alias(self, alias: int) -> bool:
+        return self.alias_offsets[alias + 1] > self.alias_offsets[alias]
+
+    def entities_for(self, alias: int) -> array:
+        return self.alias_entities[self.alias_offsets[alias]:self.alias_offsets[alias + 1]]
+
+
+class GroupedPairs:
+    """Key -> list of int tuples, accumulated across rows and grouped by key in CSR form."""
+
+    def __init__(self, width: int):
+        self.keys = _int_array()
+        self.columns = [_int_array() for _ in range(width)]
+
+    def add(self, key: int, *values: int):
+        self.keys.append(key)
+        for column, value in zip(self.columns, values):
+            column.append(value)
+
+    def finalize(self, key_count: int):
+        self.offsets, self.columns = _group_by_key(self.keys, key_count, *self.columns)
+        del self.keys
+
+    def keys_with_values(self) -> Iterable[int]:
+        offsets = self.offsets
+        return (key for key in range(len(offsets) - 1) if offsets[key + 1] > offsets[key])
+
+    def values_of(self, key: int):
+        start, end = self.offsets[key], self.offsets[key + 1]
+        return zip(*(column[start:end] for column in self.columns))
+
+
+class TargetMatchIndex:
+    """Integer-interned gene/transcript/protein alias graph used by TCRDTargetResolver."""
+
+    format_version = 1
+
+    def __init__(self):
+        self.strings = StringInterner()
+        self.genes = AliasTable()
+        self.transcripts = AliasTable()
+        self.transcript_genes = GroupedPairs(width=1)
+        self.protein_pairs = GroupedPairs(width=2)
+        self.protein_transcripts = GroupedPairs(width=1)
+        self.protein_genes = GroupedPairs(width=1)
+
+    def intern(self, value: str) -> int:
+        return self.strings.intern(value)
+
+    def finalize(self) -> "TargetMatchIndex":
+        key_count = len(self.strings)
+        for table in (self.genes, self.transcripts, self.transcript_genes,
+                      self.protein_pairs, self.protein_transcripts, self.protein_genes):
+            table.finalize(key_count)
+        self.strings = StringInterner.frozen(self.strings.values)
+        return self
+
+    def protein_keys(self) -> Iterable[int]:
+        return self.protein_pairs.keys_with_values()
+
+    def value(self, key: int) -> str:
+        return self.strings.values[key]
+
+    def save(self, path: Path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        state = dict(self.__dict__)
+        state["strings"] = self.strings.values
+        with open(tmp_path, "wb") as handle:
+            pickle.dump((self.format_version, state), handle, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["TargetMatchIndex"]:
+        with open(path, "rb") as handle:
+            format_version, state = pickle.load(handle)
+        if format_version != cls.format_version:
+            return None
+        index = cls.__new__(cls)
+        index.__dict__.update(state)
+        index.strings = StringInterner.frozen(state["strings"])
+        return index
+
+    def memory_summary(self) -> Dict[str, int]:
+        arrays = 0
+        for table in (self.genes, self.transcripts, self.transcript_genes,
+                      self.protein_pairs, self.protein_transcripts, self.protein_genes):
+            for value in vars(table).values():
+                if isinstance(value, array):
+                    arrays += value.itemsize * len(value)
+                elif isinstance(value, list):
+                    arrays += sum(column.itemsize * len(column) for column in value if isinstance(column, array))
+        return {"strings": len(self.strings), "array_bytes": arrays}
@@ -7,7 +7,7 @@ import ijson
 from src.constants import Prefix
 from src.models.node import Node
 from src.shared.uniprot_parser import UniProtParser
-from src.interfaces.id_resolver import IdResolver, IdMatch
+from src.interfaces.id_resolver import DEFAULT_RESOLVE_CACHE_CAPACITY, IdResolver, IdMatch
 
 scores = {
     "exact": 0,
@@ -45,7 +45,8 @@ class UniProtResolver(IdResolver):
                  file_name: str = "uniprot-human-reviewed.json.gz",
                  types: Optional[List[str]] = None,
                  no_match_behavior="Allow",
-                 multi_match_behavior="All"):
+                 multi_match_behavior="All",
+                 cache_capacity: Optional[int] = DEFAULT_RESOLVE_CACHE_CAPACITY):
         self.alias_map = {}
         if data_source is not None:
             uniprot_json_path = str(data_source.file(file_name))
@@ -57,6 +58,7 @@ class UniProtResolver(IdResolver):
             types=types or ["Protein"],
             no_match_behavior=no_match_behavior,
             multi_match_behavior=multi_match_behavior,
+            cache_capacity=cache_capacity,
         )
         path = os.path.expanduser(self.uniprot_json_path)
         print(f"reading file at {path}")
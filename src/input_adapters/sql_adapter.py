@@ -1,5 +1,10 @@
-from sqlalchemy import create_engine, text
+from datetime import datetime
+
+from sqlalchemy import MetaData, and_, create_engine, func, select, text
+from sqlalchemy import inspect as sqlalchemy_inspect
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.schema import AddConstraint, CreateIndex, CreateTable
 from dataclasses import replace
 
 from src.shared.db_credentials import DBCredentials
@@ -77,6 +82,120 @@ class MySqlAdapter(HostedSqlAdapter):
         engine.dispose()
         self.update_database(db_name)
 
+    @staticmethod
+    def _is_fk_integrity_error(exc: Exception) -> bool:
+        message = str(exc).lower()
+        return isinstance(exc, IntegrityError) and (
+            "foreign key constraint fails" in message
+            or "cannot add or update a child row" in message
+        )
+
+    def create_tables(self, metadata: MetaData, defer_indexes: bool = False):
+        """Create all tables in metadata.
+
+        With defer_indexes, tables are created bare: only primary keys and unique
+        indexes are added up front (upserts rely on them), while secondary indexes
+        and foreign keys are left for add_deferred_indexes once data is loaded.
+        """
+        engine = self.get_engine()
+        if not defer_indexes:
+            metadata.create_all(engine)
+            return
+
+        existing_tables = set(sqlalchemy_inspect(engine).get_table_names())
+        with engine.begin() as conn:
+            for table in metadata.sorted_tables:
+                if table.name in existing_tables:
+                    continue
+                conn.execute(CreateTable(table, include_foreign_key_constraints=[]))
+                for index in table.indexes:
+                    if index.unique:
+                        conn.execute(CreateIndex(index))
+        print(f"Created {len(metadata.sorted_tables)} tables without secondary indexes or foreign keys")
+
+    def add_deferred_indexes(self, metadata: MetaData, violation_sample_size: int = 5):
+        """Add any secondary indexes and foreign keys from metadata that are missing in the database.
+
+        Safe to call on a fully built schema (nothing is missing) and after a resumed
+        bulk load. All foreign keys are attempted; violations are collected and reported
+        together at the end rather than stopping at the first one.
+        """
+        engine = self.get_engine()
+        inspector = sqlalchemy_inspect(engine)
+        tables = [table for table in metadata.sorted_tables if inspector.has_table(table.name)]
+        fk_violations = []
+
+        # committed statement by statement: a rejected foreign key rolls back only itself
+        with engine.connect() as conn:
+            for table in tables:
+                existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+                for index in sorted(table.indexes, key=lambda ix: ix.name or ""):
+                    if index.unique or index.name in existing_indexes:
+                        continue
+                    start_time = datetime.now()
+                    conn.execute(CreateIndex(index))
+                    conn.commit()
+                    duration = (datetime.now() - start_time).total_seconds()
+                    print(f"Added index {index.name} on {table.name} in {duration:.2f} seconds")
+
+            for table in tables:
+                existing_fks = {
+                    (tuple(fk["constrained_columns"]), fk["referred_table"], tuple(fk["referred_columns"]))
+                    for fk in inspector.get_foreign_keys(table.name)
+                }
+                for fk in table.foreign_key_constraints:
+                    fk_signature = (
+                        tuple(element.parent.name for element in fk.elements),
+                        fk.referred_table.name,
+                        tuple(element.column.name for element in fk.elements),
+                    )
+                    if fk_signature in existing_fks:
+                        continue
+                    start_time = datetime.now()
+                    try:
+                        conn.execute(AddConstraint(fk))
+                        conn.commit()
+                    except Exception as exc:
+                        conn.rollback()
+                        if not self._is_fk_integrity_error(exc):
+                            raise
+                        fk_violations.append(self._describe_fk_violations(conn, fk, violation_sample_size))
+                        continue
+                    duration = (datetime.now() - start_time).total_seconds()
+                    print(f"Added foreign key {fk.name or table.name} -> "
+                          f"{fk.referred_table.name} in {duration:.2f} seconds")
+
+        if fk_violations:
+            for violation in fk_violations:
+                print(f"Foreign key violation: {violation}")
+            raise RuntimeError(
+                f"Could not add {len(fk_violations)} foreign key(s) because of orphaned rows: "
+                + "; ".join(fk_violations)
+            )
+
+    @staticmethod
+    def _describe_fk_violations(conn, fk, sample_size: int) -> str:
+        child = fk.parent
+        parent = fk.referred_table
+        join_condition = and_(*(element.parent == element.column for element in fk.elements))
+        orphan_filter = and_(
+            *(element.parent.isnot(None) for element in fk.elements),
+            *(element.column.is_(None) for element in fk.elements),
+        )
+        orphans = child.outerjoin(parent, join_condition)
+        child_columns = [element.parent for element in fk.elements]
+
+        orphan_count = conn.execute(
+            select(func.count()).select_from(orphans).where(orphan_filter)
+        ).scalar()
+        sample = conn.execute(
+            select(*child_columns).distinct().select_from(orphans).where(orphan_filter).limit(sample_size)
+        ).all()
+        return (
+            f"{child.name}{[column.name for column in child_columns]} -> {parent.name}: "
+            f"{orphan_count} orphaned rows, e.g. {[tuple(row) for row in sample]}"
+        )
+
 
 
 class PostgreSqlAdapter(HostedSqlAdapter):
@@ -1,7 +1,10 @@
 import copy
+import threading
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from dataclasses import fields
 from enum import Enum
+from functools import lru_cache
 from typing import List, Dict, Optional, Type
 from dataclasses import dataclass, asdict, field
 
@@ -31,6 +34,75 @@ class IdMatch:
     def to_dict(self) -> Dict[str, str]:
         return asdict(self)
 
+# entries kept per resolver unless its YAML sets cache_capacity (null for unbounded)
+DEFAULT_RESOLVE_CACHE_CAPACITY = 500_000
+
+
+class ResolveCache:
+    """LRU cache of resolver results keyed by input id.
+
+    capacity=None keeps every entry; otherwise the least recently used ids are evicted
+    once the cache holds more than capacity entries.
+    """
+
+    def __init__(self, capacity: Optional[int] = None):
+        if capacity is not None and capacity < 0:
+            raise ValueError(f"cache capacity must be non-negative, got {capacity}")
+        self.capacity = capacity
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, key) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __getitem__(self, key):
+        with self._lock:
+            value = self._entries[key]
+            self._entries.move_to_end(key)
+            return value
+
+    def __setitem__(self, key, value):
+        if self.capacity == 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if self.capacity is not None:
+                while len(self._entries) > self.capacity:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, object]:
+        lookups = self.hits + self.misses
+        return {
+            "capacity": self.capacity,
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else None,
+        }
+
+
 class IdResolver(ABC):
     class MatchKeys(Enum):
         matched = "matched"
@@ -40,19 +112,20 @@ class IdResolver(ABC):
     name: str
     no_match_behavior: NoMatchBehavior
     multi_match_behavior: MultiMatchBehavior
-    resolve_cache: Dict[str, List[IdMatch]]
+    resolve_cache: ResolveCache
     types: List[str]
 
     def __init__(self,
                  types: List[str],
                  no_match_behavior = NoMatchBehavior.Allow,
                  multi_match_behavior = MultiMatchBehavior.All,
-                 canonical_class: Optional[Type[Node]] = None):
+                 canonical_class: Optional[Type[Node]] = None,
+                 cache_capacity: Optional[int] = DEFAULT_RESOLVE_CACHE_CAPACITY):
         print(f'creating ID resolver: {self.__class__.__name__}')
         self.types = types
         self.no_match_behavior = NoMatchBehavior.parse(no_match_behavior)
         self.multi_match_behavior = MultiMatchBehavior.parse(multi_match_behavior)
-        self.resolve_cache = {}
+        self.resolve_cache = ResolveCache(capacity=cache_capacity)
         self.canonical_class = canonical_class
 
     @staticmethod
@@ -68,14 +141,18 @@ class IdResolver(ABC):
     def get_example_ids(self, limit: int = 5) -> List[str]:
         return []
 
+    def get_cache_stats(self) -> Dict[str, object]:
+        return self.resolve_cache.stats()
+
     def _resolve_internal(self, input_nodes: List[Node]) -> (Dict[str, List[IdMatch]], set):
         output_dict = {}
         un_resolved_nodes = []
         unique_nodes_dict = {node.id: node for node in input_nodes}
         unique_nodes = list(unique_nodes_dict.values())
         for node in unique_nodes:
-            if node.id in self.resolve_cache:
-                output_dict[node.id] = self.resolve_cache[node.id]
+            cached = self.resolve_cache.get(node.id)
+            if cached is not None:
+                output_dict[node.id] = cached
             else:
                 un_resolved_nodes.append(node)
         if len(un_resolved_nodes) == 0:
@@ -130,87 +207,101 @@ class IdResolver(ABC):
                 setattr(coerced, f.name, value)
         return coerced
 
+    @staticmethod
+    @lru_cache(maxsize=100_000)
+    def _parse_equivalent_id_parts(equiv_id: str) -> tuple:
+        # only the immutable parts are cached; EquivalentId is mutable and must not be shared
+        parsed = EquivalentId.parse(equiv_id)
+        return parsed.id, parsed.type
+
+    @classmethod
+    def _parse_equivalent_id(cls, equiv_id: str) -> EquivalentId:
+        id_part, prefix = cls._parse_equivalent_id_parts(equiv_id)
+        return EquivalentId(id=id_part, type=prefix)
+
+    @staticmethod
+    def _copy_entry(entry: Node, **overrides) -> Node:
+        # Shallow copy with fresh top-level containers: copies no longer share lists/dicts
+        # with each other, without paying for a deepcopy of every nested value.
+        new_entry = copy.copy(entry)
+        for key, value in vars(new_entry).items():
+            if isinstance(value, (list, dict, set)):
+                setattr(new_entry, key, copy.copy(value))
+        for key, value in overrides.items():
+            setattr(new_entry, key, value)
+        return new_entry
+
+    def _unmatched_entry(self, entry: Node) -> Node:
+        return self._copy_entry(entry, old_id=entry.id)
+
     def get_merged_map(self, entries, id_map, allow_retype: bool = False):
         updated_count, validated_count = 0, 0
+        matched = {}
+        newborns = {}
+        unmatched = {}
         entity_map = {
-            IdResolver.MatchKeys.matched: {},
-            IdResolver.MatchKeys.newborns: {},
-            IdResolver.MatchKeys.unmatched: {}
+            IdResolver.MatchKeys.matched: matched,
+            IdResolver.MatchKeys.newborns: newborns,
+            IdResolver.MatchKeys.unmatched: unmatched
         }
+        seen_ids = set()
         for entry in entries:
-            if entry.id in id_map and len(id_map.get(entry.id)) > 0:
-                matches = id_map[entry.id]
-
-                old_id = entry.id
-                if matches:
-                    if len(matches) > 0:
-                        first_match = matches[0]
-                        new_id = first_match.match
-
-                        full_xref_list = list(set([
-                            EquivalentId.parse(equiv_id) for m in matches for equiv_id in m.equivalent_ids
-                        ]))
-
-                        is_cross_type = self.canonical_class is not None and not isinstance(entry, self.canonical_class)
-                        can_retype = self._can_retype_entry(entry) if is_cross_type else False
-                        if is_cross_type and not allow_retype:
-                            print(f"WARNING: {type(entry).__name__} '{old_id}' resolves cross-type to "
-                                  f"{self.canonical_class.__name__} '{new_id}'. Treating as unmatched — "
-                                  f"use a {self.canonical_class.__name__} adapter for node data, or "
-                                  f"canonical_type is only applied for edge endpoint resolution.")
-                            if old_id not in entity_map[IdResolver.MatchKeys.unmatched]:
-                                new_entry = copy.deepcopy(entry)
-                                new_entry.old_id = old_id
-                                entity_map[IdResolver.MatchKeys.unmatched][old_id] = new_entry
-                            continue
-                        if is_cross_type and allow_retype and not can_retype:
-                            print(f"WARNING: {type(entry).__name__} '{old_id}' resolves cross-type to "
-                                  f"{self.canonical_class.__name__} '{new_id}', but populated fields are not "
-                                  f"compatible with {self.canonical_class.__name__}. Treating as unmatched.")
-                            if old_id not in entity_map[IdResolver.MatchKeys.unmatched]:
-                                new_entry = copy.deepcopy(entry)
-                                new_entry.old_id = old_id
-                                entity_map[IdResolver.MatchKeys.unmatched][old_id] = new_entry
-                            continue
-
-                        if old_id not in entity_map[IdResolver.MatchKeys.matched]:
-
-                            if is_cross_type and allow_retype:
-                                first_entry = self._coerce_entry_to_canonical(entry, new_id, full_xref_list)
-                            else:
-                                first_entry = copy.deepcopy(entry)
-                                first_entry.id = new_id
-                                first_entry.xref = full_xref_list
-
-                            if new_id != old_id:
-                                first_entry.old_id = old_id
-                                updated_count += 1
-                            else:
-                                validated_count += 1
-
-                            entity_map[IdResolver.MatchKeys.matched][old_id] = first_entry
-
-                        if len(matches) > 1:
-                            if old_id not in entity_map[IdResolver.MatchKeys.newborns]:
-
-                                entity_map[IdResolver.MatchKeys.newborns][old_id] = []
-                                for subsequent_match in matches[1:]:
-                                    new_id = subsequent_match.match
-                                    if is_cross_type and allow_retype:
-                                        new_entry = self._coerce_entry_to_canonical(entry, new_id, full_xref_list)
-                                    else:
-                                        new_entry = copy.deepcopy(entry)
-                                        new_entry.id = new_id
-                                        new_entry.xref = full_xref_list
-                                    new_entry.old_id = old_id
-                                    if new_entry.id not in [node.id for node in
-                                                            entity_map[IdResolver.MatchKeys.newborns][old_id]]:
-                                        entity_map[IdResolver.MatchKeys.newborns][old_id].append(new_entry)
+            old_id = entry.id
+            # Every decision below depends only on the id (entries are grouped by class),
+            # so repeated ids in a batch would only redo work that is then discarded.
+            if old_id in seen_ids:
+                continue
+            seen_ids.add(old_id)
+
+            matches = id_map.get(old_id)
+            if not matches:
+                unmatched[old_id] = self._unmatched_entry(entry)
+                continue
+
+            new_id = matches[0].match
+            is_cross_type = self.canonical_class is not None and not isinstance(entry, self.canonical_class)
+            if is_cross_type and not allow_retype:
+                print(f"WARNING: {type(entry).__name__} '{old_id}' resolves cross-type to "
+                      f"{self.canonical_class.__name__} '{new_id}'. Treating as unmatched — "
+                      f"use a {self.canonical_class.__name__} adapter for node data, or "
+                      f"canonical_type is only applied for edge endpoint resolution.")
+                unmatched[old_id] = self._unmatched_entry(entry)
+                continue
+            if is_cross_type and not self._can_retype_entry(entry):
+                print(f"WARNING: {type(entry).__name__} '{old_id}' resolves cross-type to "
+                      f"{self.canonical_class.__name__} '{new_id}', but populated fields are not "
+                      f"compatible with {self.canonical_class.__name__}. Treating as unmatched.")
+                unmatched[old_id] = self._unmatched_entry(entry)
+                continue
+
+            full_xref_list = list({
+                self._parse_equivalent_id(equiv_id) for m in matches for equiv_id in m.equivalent_ids
+            })
+
+            def make_entry(match_id):
+                if is_cross_type:
+                    return self._coerce_entry_to_canonical(entry, match_id, full_xref_list)
+                return self._copy_entry(entry, id=match_id, xref=full_xref_list)
+
+            first_entry = make_entry(new_id)
+            if new_id != old_id:
+                first_entry.old_id = old_id
+                updated_count += 1
             else:
-                if entry.id not in entity_map[IdResolver.MatchKeys.unmatched]:
-                    new_entry = copy.deepcopy(entry)
-                    new_entry.old_id = entry.id
-                    entity_map[IdResolver.MatchKeys.unmatched][entry.id] = new_entry
+                validated_count += 1
+            matched[old_id] = first_entry
+
+            if len(matches) > 1:
+                newborn_ids = set()
+                newborn_entries = []
+                for subsequent_match in matches[1:]:
+                    if subsequent_match.match in newborn_ids:
+                        continue
+                    newborn_ids.add(subsequent_match.match)
+                    new_entry = make_entry(subsequent_match.match)
+                    new_entry.old_id = old_id
+                    newborn_entries.append(new_entry)
+                newborns[old_id] = newborn_entries
         print(f"updated {updated_count} ids, validated {validated_count} ids")
         return entity_map
 
@@ -8,13 +8,15 @@ from datetime import datetime, date, timezone
 from enum import Enum
 from typing import Type, List, get_origin, get_args, Union
 
-from arango.exceptions import DocumentInsertError, DocumentUpdateError
+from arango.exceptions import ArangoServerError, DocumentInsertError, DocumentUpdateError
 from src.core.decorators import collect_facets, collect_indexed_fields, collect_search_fields
 from src.interfaces.metadata import DatabaseMetadata, CollectionMetadata, get_git_metadata
 from src.interfaces.output_adapter import OutputAdapter
 from src.interfaces.resolver_metadata import resolver_fingerprint_summary
 from src.models.datasource_version_info import DataSourceDetails
 from src.shared.arango_adapter import ArangoAdapter
+from src.shared.arango_facets import FACET_COUNTS_KEY, compute_facet_counts
+from src.shared.arango_search import SEARCH_VIEW_NAME, ensure_search_view
 from src.shared.record_merger import RecordMerger, FieldConflictBehavior
 
 from src.shared.db_credentials import DBCredentials
@@ -29,6 +31,7 @@ class ArangoOutputAdapter(OutputAdapter, ArangoAdapter):
         self._graph_view_source_yaml = None
         self._resolver_fingerprints_by_type = {}
         self._resolver_source_yaml = None
+        self._resolver_cache_stats = {}
         self._registry_datasets = []
         self.minio_storage = self._object_storage_from_credentials(minio_credentials)
         super().__init__(credentials=credentials, database_name=database_name)
@@ -49,6 +52,9 @@ class ArangoOutputAdapter(OutputAdapter, ArangoAdapter):
         self._resolver_fingerprints_by_type = resolver_fingerprints_by_type or {}
         self._resolver_source_yaml = source_yaml
 
+    def set_resolver_cache_stats(self, resolver_cache_stats=None):
+        self._resolver_cache_stats = resolver_cache_stats or {}
+
     def set_registry_dataset_metadata(self, registry_datasets=None):
         self._registry_datasets = registry_datasets or []
 
@@ -795,11 +801,19 @@ class ArangoOutputAdapter(OutputAdapter, ArangoAdapter):
         }, overwrite=True)
 
         if self._collection_schemas:
+            self.create_search_view()
             metadata_store.insert({
                 "_key": "collection_schemas",
                 "collections": self._collection_schemas
             }, overwrite=True)
             print(f"Wrote collection schemas for {len(self._collection_schemas)} collections")
+            facet_counts = self.get_facet_counts()
+            if facet_counts:
+                metadata_store.insert({
+                    "_key": FACET_COUNTS_KEY,
+                    "collections": facet_counts,
+                }, overwrite=True)
+                print(f"Wrote facet counts for {len(facet_counts)} collections")
 
         graph_views = self.get_graph_views_metadata(existing_graph_views)
         if graph_views:
@@ -811,6 +825,39 @@ class ArangoOutputAdapter(OutputAdapter, ArangoAdapter):
             }, overwrite=True)
             print(f"Wrote graph views metadata for {len(graph_views)} views")
 
+    def create_search_view(self) -> None:
+        """Link each collection's search fields into the ArangoSearch view used by QA browser search."""
+        db = self.get_db()
+        collection_fields = {
+            name: (schema_entry.get("search_metadata") or {}).get("text_fields") or []
+            for name, schema_entry in self._collection_schemas.items()
+            if db.has_collection(name)
+        }
+        try:
+            linked = ensure_search_view(db, collection_fields)
+        except ArangoServerError as exc:
+            # the QA browser falls back to scanning with a substring filter
+            print(f"Could not create search view {SEARCH_VIEW_NAME}: {exc}")
+            return
+        for name in linked:
+            self._collection_schemas[name].setdefault("search_metadata", {})["search_view"] = SEARCH_VIEW_NAME
+        if linked:
+            print(f"Linked {len(linked)} collections into search view {SEARCH_VIEW_NAME}")
+
+    def get_facet_counts(self) -> dict:
+        """Unfiltered facet counts for every collection with category fields, one query each."""
+        db = self.get_db()
+        facet_counts = {}
+        for name, schema_entry in sorted(self._collection_schemas.items()):
+            fields = (schema_entry.get("facet_metadata") or {}).get("category_fields") or []
+            if not fields or not db.has_collection(name):
+                continue
+            facet_counts[name] = {
+                "computed_at": datetime.now(timezone.utc).isoformat(),
+                "fields": compute_facet_counts(db, name, fields),
+            }
+        return facet_counts
+
     def get_etl_metadata(self):
         git_info = get_git_metadata()
         resolver_source_yaml = getattr(self, "_resolver_source_yaml", None)
@@ -826,6 +873,7 @@ class ArangoOutputAdapter(OutputAdapter, ArangoAdapter):
                 "summary": resolver_fingerprint_summary(resolver_fingerprints_by_type),
             },
             "registry_datasets": getattr(self, "_registry_datasets", []),
+            "resolver_cache_stats": getattr(self, "_resolver_cache_stats", {}),
             "runner": os.getenv("USER", "unknown"),
             "git_info": git_info,
             "hostname": socket.gethostname(),
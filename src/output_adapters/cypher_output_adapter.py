@@ -27,11 +27,15 @@ class GraphDBOutputAdapter(OutputAdapter, ABC):
 
         self.loader.merger = RecordMerger(field_conflict_behavior=field_conflict_behavior)
         object_groups = self.sort_and_convert_objects(objects)
+        node_groups = []
+        relationship_groups = []
         for obj_list, labels, is_relationship, start_labels, end_labels, obj_cls in object_groups.values():
             if is_relationship:
-                self.loader.load_relationship_records(obj_list, start_labels, labels, end_labels, skip_merge=single_source)
+                relationship_groups.append((obj_list, start_labels, labels, end_labels))
             else:
-                self.loader.load_node_records(obj_list, labels, skip_merge=single_source)
+                node_groups.append((obj_list, labels))
+        self.loader.load_node_groups(node_groups, skip_merge=single_source)
+        self.loader.load_relationship_groups(relationship_groups, skip_merge=single_source)
         return True
 
 class MemgraphOutputAdapter(GraphDBOutputAdapter):
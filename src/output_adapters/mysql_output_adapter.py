@@ -1,14 +1,17 @@
 from abc import ABC
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
 import os
 import platform
 import socket
+import threading
+import time
 import warnings
 from src.interfaces.metadata import DatabaseMetadata, get_git_metadata
-from sqlalchemy import case, func, text
+from sqlalchemy import case, create_engine, func, text
 from sqlalchemy import inspect as sqlalchemy_inspect
 from sqlalchemy.dialects.mysql import insert as mysql_insert
-from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.exc import OperationalError
 from src.input_adapters.sql_adapter import MySqlAdapter
 from src.interfaces.output_adapter import OutputAdapter
 from src.interfaces.resolver_metadata import resolver_fingerprint_summary
@@ -157,6 +160,36 @@ TYPEAHEAD_INSERTS = [
 ]
 
 
+class _ConcurrentChunkWriter:
+    """Runs insert chunks on a pool of writer threads, each with its own pooled connection.
+
+    At most max_pending chunks are queued or in flight; submit blocks until a slot frees up,
+    so serialized rows never pile up in memory faster than MySQL can take them.
+    """
+
+    def __init__(self, write_chunk, max_workers: int, max_pending: int):
+        self._write_chunk = write_chunk
+        self._max_pending = max(max_pending, max_workers)
+        self._pending = set()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mysql-writer")
+
+    def submit(self, *args) -> None:
+        while len(self._pending) >= self._max_pending:
+            self._wait(FIRST_COMPLETED)
+        self._pending.add(self._executor.submit(self._write_chunk, *args))
+
+    def _wait(self, return_when) -> None:
+        done, self._pending = wait(self._pending, return_when=return_when)
+        for future in done:
+            future.result()
+
+    def close(self) -> None:
+        try:
+            self._wait(ALL_COMPLETED)
+        finally:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+
+
 class MySQLOutputAdapter(OutputAdapter, MySqlAdapter, ABC):
     database_name: str
     truncate_tables: bool
@@ -164,6 +197,10 @@ class MySQLOutputAdapter(OutputAdapter, MySqlAdapter, ABC):
     conversion_chunk_size: int = 500
     insert_batch_size: int = 100_000
     min_insert_batch_size: int = 100
+    # deadlocks (1213) and lock wait timeouts (1205) between writer threads roll back the
+    # whole chunk; it is replayed up to this many times, waiting backoff * 2**attempt
+    lock_conflict_retries: int = 5
+    lock_conflict_backoff_seconds: float = 0.5
     adapter_run_model = None
 
     def __init__(
@@ -171,9 +208,16 @@ class MySQLOutputAdapter(OutputAdapter, MySqlAdapter, ABC):
         credentials: DBCredentials,
         database_name: str,
         truncate_tables: bool = True,
+        bulk_load: bool = False,
+        insert_workers: int = 1,
+        max_pending_insert_chunks: int | None = None,
     ):
         self.database_name = database_name
         self.truncate_tables = truncate_tables
+        self.bulk_load = bulk_load
+        self.insert_workers = max(1, insert_workers)
+        self.max_pending_insert_chunks = max_pending_insert_chunks or 2 * self.insert_workers
+        self._stats_lock = threading.Lock()
         self._current_run_id = None
         self._current_adapter_name = None
         self._current_adapter_stats = None
@@ -181,6 +225,17 @@ class MySQLOutputAdapter(OutputAdapter, MySqlAdapter, ABC):
         MySqlAdapter.__init__(self, credentials)
         self.update_database(database_name)
 
+    def get_engine(self):
+        # one connection per writer thread plus the main thread, instead of the default 5 + 10
+        if not hasattr(self, '_engine'):
+            self._engine = create_engine(
+                self.connection_string,
+                pool_pre_ping=True,
+                pool_size=max(5, self.insert_workers + 1),
+                max_overflow=max(10, self.insert_workers),
+            )
+        return self._engine
+
     @staticmethod
     def _serialize_rows(converted_objects):
         raw_rows = []
@@ -199,14 +254,6 @@ class MySQLOutputAdapter(OutputAdapter, MySqlAdapter, ABC):
         all_keys = set().union(*(row.keys() for row in raw_rows))
         return [{key: row.get(key) for key in all_keys} for row in raw_rows]
 
-    @staticmethod
-    def _is_fk_integrity_error(exc: Exception) -> bool:
-        message = str(exc).lower()
-        return isinstance(exc, IntegrityError) and (
-            "foreign key constraint fails" in message
-            or "cannot add or update a child row" in message
-        )
-
     def _diagnose_fk_batch_failure(self, table_class, rows):
         stmt = mysql_insert(table_class.__table__)
         print(f"Batch insert failed for {table_class.__name__}; retrying row-by-row to isolate FK issue")
@@ -259,20 +306,53 @@ class MySQLOutputAdapter(OutputAdapter, MySqlAdapter, ABC):
         code = args[0] if args else None
         return code in {2006, 2013}
 
-    def _execute_insert_chunk(self, stmt, table_class, rows, stats, retry_depth: int = 0):
+    @staticmethod
+    def _is_lock_conflict_error(exc: Exception) -> bool:
+        if not isinstance(exc, OperationalError):
+            return False
+
+        message = str(exc).lower()
+        if "deadlock found" in message or "lock wait timeout exceeded" in message:
+            return True
+
+        orig = getattr(exc, "orig", None)
+        args = getattr(orig, "args", ())
+        code = args[0] if args else None
+        return code in {1205, 1213}
+
+    def _execute_insert_chunk(self, stmt, table_class, rows, stats, retry_depth: int = 0,
+                              lock_retry: int = 0):
         session = self.get_session()
         try:
             insert_start = datetime.now()
             session.execute(stmt, rows)
             session.commit()
             if stats is not None:
-                stats["insert_seconds"] += (datetime.now() - insert_start).total_seconds()
-                stats["inserted_row_count"] += len(rows)
+                with self._stats_lock:
+                    stats["insert_seconds"] += (datetime.now() - insert_start).total_seconds()
+                    stats["inserted_row_count"] += len(rows)
             return
         except Exception as exc:
             session.rollback()
             if self._is_fk_integrity_error(exc):
                 self._diagnose_fk_batch_failure(table_class, rows)
+            if self._is_lock_conflict_error(exc) and lock_retry < self.lock_conflict_retries:
+                delay = self.lock_conflict_backoff_seconds * 2 ** lock_retry
+                print(
+                    f"MySQL lock conflict inserting {len(rows)} {table_class.__name__} rows; "
+                    f"retrying in {delay:.1f}s ({lock_retry + 1}/{self.lock_conflict_retries})"
+                )
+                session.close()
+                time.sleep(delay)
+                self._execute_insert_chunk(
+                    stmt,
+                    table_class,
+                    rows,
+                    stats,
+                    retry_depth=retry_depth,
+                    lock_retry=lock_retry + 1,
+                )
+                return
             if self._is_retryable_disconnect_error(exc) and len(rows) > self.min_insert_batch_size:
                 next_chunk_size = max(self.min_insert_batch_size, len(rows) // 2)
                 print(
@@ -292,6 +372,24 @@ class MySQLOutputAdapter(OutputAdapter, MySqlAdapter, ABC):
         finally:
             session.close()
 
+    @staticmethod
+    def _requires_ordered_inserts(table_class, is_upsert: bool) -> bool:
+        # Upserts resolve duplicates in arrival order, and self-referencing rows need their
+        # parents committed first; everything else can be written by any connection in any order.
+        if is_upsert:
+            return True
+        table = table_class.__table__
+        return any(fk.referred_table is table for fk in table.foreign_key_constraints)
+
+    def _get_chunk_writer(self, table_class, is_upsert: bool):
+        if self.insert_workers <= 1 or self._requires_ordered_inserts(table_class, is_upsert):
+            return None
+        return _ConcurrentChunkWriter(
+            self._execute_insert_chunk,
+            max_workers=self.insert_workers,
+            max_pending=self.max_pending_insert_chunks,
+        )
+
     @staticmethod
     def _new_adapter_stats() -> dict:
         return {
@@ -408,47 +506,61 @@ class MySQLOutputAdapter(OutputAdapter, MySqlAdapter, ABC):
                     start_time = datetime.now()
                     table_class = None
                     stmt = None
+                    chunk_writer = None
                     inserted_count = 0
 
-                    for obj_chunk in self._chunked(obj_list, self.conversion_chunk_size):
-                        conversion_start = datetime.now()
-                        converted_objects = []
-                        for obj in obj_chunk:
-                            result = converter(obj)
-                            if isinstance(result, list):
-                                converted_objects.extend(result)
-                            elif result is not None:
-                                converted_objects.append(result)
-                        if stats is not None:
-                            stats["conversion_seconds"] += (datetime.now() - conversion_start).total_seconds()
-                            stats["converted_object_count"] += len(converted_objects)
-
-                        if not converted_objects:
-                            continue
-
-                        if table_class is None:
-                            table_class = converted_objects[0].__class__
-                            stmt = mysql_insert(table_class.__table__)
-                            if table_class is TinxImportance:
-                                stmt = stmt.on_duplicate_key_update(
-                                    score=func.greatest(table_class.score, stmt.inserted.score),
-                                    doid=case(
-                                        (stmt.inserted.score > table_class.score, stmt.inserted.doid),
-                                        else_=table_class.doid,
-                                    ),
+                    try:
+                        for obj_chunk in self._chunked(obj_list, self.conversion_chunk_size):
+                            conversion_start = datetime.now()
+                            converted_objects = []
+                            for obj in obj_chunk:
+                                result = converter(obj)
+                                if isinstance(result, list):
+                                    converted_objects.extend(result)
+                                elif result is not None:
+                                    converted_objects.append(result)
+                            if stats is not None:
+                                stats["conversion_seconds"] += (datetime.now() - conversion_start).total_seconds()
+                                stats["converted_object_count"] += len(converted_objects)
+
+                            if not converted_objects:
+                                continue
+
+                            if table_class is None:
+                                table_class = converted_objects[0].__class__
+                                stmt = mysql_insert(table_class.__table__)
+                                if table_class is TinxImportance:
+                                    stmt = stmt.on_duplicate_key_update(
+                                        score=func.greatest(table_class.score, stmt.inserted.score),
+                                        doid=case(
+                                            (stmt.inserted.score > table_class.score, stmt.inserted.doid),
+                                            else_=table_class.doid,
+                                        ),
+                                    )
+                                if table_class is WordCount:
+                                    stmt = stmt.on_duplicate_key_update(count=stmt.inserted.count)
+                                chunk_writer = self._get_chunk_writer(
+                                    table_class,
+                                    is_upsert=table_class in (TinxImportance, WordCount),
                                 )
-                            if table_class is WordCount:
-                                stmt = stmt.on_duplicate_key_update(count=stmt.inserted.count)
-                            print(f"Inserting objects of type {table_class.__name__}")
-
-                        serialization_start = datetime.now()
-                        rows = self._serialize_rows(converted_objects)
-                        if stats is not None:
-                            stats["serialization_seconds"] += (datetime.now() - serialization_start).total_seconds()
-                        inserted_count += len(rows)
-
-                        for row_chunk in self._chunked(rows, self.insert_batch_size):
-                            self._execute_insert_chunk(stmt, table_class, row_chunk, stats)
+                                print(f"Inserting objects of type {table_class.__name__}")
+
+                            serialization_start = datetime.now()
+                            rows = self._serialize_rows(converted_objects)
+                            if stats is not None:
+                                stats["serialization_seconds"] += (datetime.now() - serialization_start).total_seconds()
+                            inserted_count += len(rows)
+
+                            for row_chunk in self._chunked(rows, self.insert_batch_size):
+                                if chunk_writer is None:
+                                    self._execute_insert_chunk(stmt, table_class, row_chunk, stats)
+                                else:
+                                    chunk_writer.submit(stmt, table_class, row_chunk, stats)
+                    finally:
+                        # Every chunk of this table must be committed before the next table starts,
+                        # since later tables may hold foreign keys into this one.
+                        if chunk_writer is not None:
+                            chunk_writer.close()
 
                     if table_class is None:
                         continue
@@ -472,6 +584,17 @@ class MySQLOutputAdapter(OutputAdapter, MySqlAdapter, ABC):
         self.recreate_mysql_db(self.database_name, effective_truncate)
         return True
 
+    def create_schema(self) -> None:
+        self.create_tables(self.output_converter.sql_base.metadata, defer_indexes=self.bulk_load)
+
+    def finalize_schema(self) -> None:
+        if not self.bulk_load:
+            return
+        self.add_deferred_indexes(self.output_converter.sql_base.metadata)
+
+    def do_post_processing(self, clean_edges: bool = True) -> None:
+        self.finalize_schema()
+
     def get_completed_adapter_names(self, run_id: str) -> set[str]:
         if not self._supports_adapter_run_metadata():
             return set()
@@ -571,13 +694,20 @@ class MySQLOutputAdapter(OutputAdapter, MySqlAdapter, ABC):
 class TestOutputAdapter(MySQLOutputAdapter):
     output_converter: TestSQLOutputConverter
 
-    def __init__(self, credentials: DBCredentials, database_name: str):
-        MySQLOutputAdapter.__init__(self, credentials, database_name)
+    def __init__(self, credentials: DBCredentials, database_name: str, bulk_load: bool = False,
+                 insert_workers: int = 1):
+        MySQLOutputAdapter.__init__(
+            self,
+            credentials,
+            database_name,
+            bulk_load=bulk_load,
+            insert_workers=insert_workers,
+        )
         self.output_converter = TestSQLOutputConverter(sql_base=TestBase)
 
     def create_or_truncate_datastore(self, truncate_tables: bool = None) -> bool:
         super().create_or_truncate_datastore(truncate_tables=truncate_tables)
-        self.output_converter.sql_base.metadata.create_all(self.get_engine())
+        self.create_schema()
         return True
 
 
@@ -592,12 +722,18 @@ class TCRDOutputAdapter(MySQLOutputAdapter):
         truncate_tables: bool,
         source_graph_credentials: DBCredentials | dict | None = None,
         source_graph_database: str | None = None,
+        bulk_load: bool = False,
+        insert_workers: int = 1,
+        max_pending_insert_chunks: int | None = None,
     ):
         MySQLOutputAdapter.__init__(
             self,
             credentials,
             database_name,
             truncate_tables=truncate_tables,
+            bulk_load=bulk_load,
+            insert_workers=insert_workers,
+            max_pending_insert_chunks=max_pending_insert_chunks,
         )
         self.output_converter = TCRDOutputConverter()
         self.source_graph_credentials = self._coerce_db_credentials(source_graph_credentials)
@@ -620,7 +756,7 @@ class TCRDOutputAdapter(MySQLOutputAdapter):
 
     def create_or_truncate_datastore(self, truncate_tables: bool = None) -> bool:
         super().create_or_truncate_datastore(truncate_tables=truncate_tables)
-        self.output_converter.sql_base.metadata.create_all(self.get_engine())
+        self.create_schema()
         self._validate_source_graph_resolver_metadata()
         session = self.get_session()
         try:
@@ -1099,6 +1235,7 @@ class TCRDOutputAdapter(MySQLOutputAdapter):
             session.execute(text(insert_sql))
 
     def do_post_processing(self, clean_edges: bool = True) -> None:
+        self.finalize_schema()
         NcatsTypeaheadIndex.__table__.create(self.get_engine(), checkfirst=True)
         session = self.get_session()
         try:
@@ -14,15 +14,18 @@ import sys
 import threading
 import time
 import uuid
+import zlib
 from contextlib import asynccontextmanager
 from pathlib import Path
 from datetime import datetime, timezone
+from itertools import islice
 from typing import Optional, Dict, Iterable, List
 from urllib.parse import quote as url_quote, urlencode
 
 import urllib3
 import yaml
 from arango import ArangoClient
+from arango.http import DefaultHTTPClient
 from fastapi import FastAPI, Request, Form, HTTPException
 from fastapi.responses import HTMLResponse, StreamingResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
@@ -34,6 +37,18 @@ from starlette.concurrency import run_in_threadpool
 import uvicorn
 
 from src.core.data_registry import DataRegistry
+from src.shared.arango_facets import FACET_COUNTS_KEY, STORED_FACET_TOP, compute_facet_counts
+from src.shared.arango_search import has_search_tokens, view_search_loop
+from src.qa_browser.db_concurrency import BackendBusy, BackendLimiter, ConsoleQueries, run_until_disconnect
+from src.qa_browser.http_cache import (
+    CachedResponse,
+    ResponseCache,
+    Validator,
+    is_not_modified,
+    make_validator,
+    not_modified_response,
+    validator_headers,
+)
 from src.registry.storage import DEFAULT_REGISTRY_CACHE_DIR
 from src.models.node import Node
 from src.qa_browser.disease_id_graph import (
@@ -45,7 +60,6 @@ from src.qa_browser.disease_id_graph import (
     compute_dashboard_stats,
     compute_source_agreement_matrix,
     compute_source_flow_data,
-    compute_version_diff,
     export_filtered_download,
     export_flagged_tsv,
     export_search_tsv,
@@ -53,12 +67,14 @@ from src.qa_browser.disease_id_graph import (
     find_concept_neighbors,
     load_baseline_data,
     load_disease_graph_data,
-    load_version_data,
     load_flagged_concepts,
+    load_full_version_diff,
+    page_version_diff,
     parse_disease_ids,
     resolve_concept,
     resolve_name_candidates,
     search_concepts,
+    truncate_version_diff,
 )
 from src.qa_browser.ramp_id_graph import set_ramp_diagnosis_file
 from src.qa_browser.registry_usage import (
@@ -83,6 +99,7 @@ DISEASE_APP_GRAPH_BUNDLED_DIR = BASE_DIR / "data" / "disease_app_graph"
 @asynccontextmanager
 async def _app_lifespan(_app: FastAPI):
     _start_resolver_warmup_thread()
+    _start_version_diff_warmup_thread()
     yield
 
 
@@ -103,6 +120,9 @@ _mysql_credentials: dict = {}
 _mysql_sources: dict = {}
 _mysql_db_engines: dict = {}
 _mysql_inspector_cache: dict = {}   # db_name -> CachableInspector data
+_arango_dbs: dict = {}   # db name -> StandardDatabase sharing the client's connection pool
+_db_handles_lock = threading.Lock()
+_mysql_inspector_locks: dict = {}
 _minio_credentials: dict = {}
 _parquet_storage_credentials: dict = {}
 _disease_graph_dir: str = ""
@@ -148,6 +168,14 @@ _resolver_warmup_status: dict = {
     "errors": [],
 }
 _REGISTRY_USAGE_TTL_SECONDS = 60
+# Requests per backend run at most *_CONCURRENCY at once; the rest queue without holding
+# a worker thread and get 503 after _BACKEND_QUEUE_TIMEOUT_SECONDS.
+_ARANGO_CONCURRENCY = int(os.getenv("QA_BROWSER_ARANGO_CONCURRENCY", "8"))
+_MYSQL_CONCURRENCY = int(os.getenv("QA_BROWSER_MYSQL_CONCURRENCY", "4"))
+_BACKEND_QUEUE_TIMEOUT_SECONDS = int(os.getenv("QA_BROWSER_BACKEND_QUEUE_TIMEOUT_SECONDS", "30"))
+_ARANGO_REQUEST_TIMEOUT_SECONDS = int(os.getenv("QA_BROWSER_ARANGO_TIMEOUT_SECONDS", "120"))
+_MYSQL_READ_TIMEOUT_SECONDS = int(os.getenv("QA_BROWSER_MYSQL_TIMEOUT_SECONDS", "120"))
+_CONSOLE_QUERY_TIMEOUT_SECONDS = int(os.getenv("QA_BROWSER_CONSOLE_TIMEOUT_SECONDS", "60"))
 _REGISTRY_CATALOG_TTL_SECONDS = int(os.getenv("QA_BROWSER_REGISTRY_CATALOG_TTL_SECONDS", "300"))
 _RESOLVER_API_MAX_IDS = 1000
 _RESOLVER_WARMUP_ENABLED = os.getenv("QA_BROWSER_WARM_RESOLVERS", "1").lower() in {
@@ -3709,17 +3737,15 @@ def _get_mysql_source(source_id: str) -> dict:
     raise KeyError(f"Unknown MySQL source: {source_id}")
 
 
-def _get_parquet_buffer(file_ref: str):
-    """Fetch a parquet file from registry object storage and return (BytesIO, size_bytes).
+def _with_parquet_storage(file_ref: str, operation):
+    """Run operation(client, bucket, key) against the first storage credentials that work.
 
-    file_ref must be an s3:// URI produced by the ETL pipeline.
-    Returns (None, None) if the file cannot be fetched.
+    file_ref must be an s3:// URI produced by the ETL pipeline. Returns None if it is not
+    one or no storage credentials are configured.
     """
     if not file_ref.startswith("s3://"):
-        return None, None
+        return None
     try:
-        import io
-
         without_prefix = file_ref[len("s3://"):]
         bucket, key = without_prefix.split("/", 1)
         credentials_options = []
@@ -3728,15 +3754,13 @@ def _get_parquet_buffer(file_ref: str):
         if _minio_credentials:
             credentials_options.append(("registry storage", _minio_credentials))
         if not credentials_options:
-            return None, None
+            return None
 
         errors = []
         for label, credentials in credentials_options:
             try:
                 storage = _storage_from_credentials(credentials, use_internal_url=True)
-                response = storage.client().get_object(Bucket=bucket, Key=key)
-                data = response["Body"].read()
-                return io.BytesIO(data), response["ContentLength"]
+                return operation(storage.client(), bucket, key)
             except Exception as exc:
                 errors.append(f"{label}: {exc}")
         raise RuntimeError("; ".join(errors))
@@ -3744,24 +3768,64 @@ def _get_parquet_buffer(file_ref: str):
         raise RuntimeError(f"Failed to fetch {file_ref} from registry object storage: {e}") from e
 
 
+def _get_parquet_buffer(file_ref: str):
+    """Fetch a parquet file from registry object storage and return (BytesIO, size_bytes, etag).
+
+    Returns (None, None, None) if the file cannot be fetched.
+    """
+    def fetch(client, bucket, key):
+        response = client.get_object(Bucket=bucket, Key=key)
+        return io.BytesIO(response["Body"].read()), response["ContentLength"], response.get("ETag")
+
+    return _with_parquet_storage(file_ref, fetch) or (None, None, None)
+
+
+def _get_parquet_etag(file_ref: str) -> Optional[str]:
+    """ETag of a stored parquet file, from a HEAD request (no download)."""
+    return _with_parquet_storage(
+        file_ref,
+        lambda client, bucket, key: client.head_object(Bucket=bucket, Key=key).get("ETag"),
+    )
+
+
 def get_client() -> ArangoClient:
     global _client
-    if _client is None:
-        url = _credentials.get("internal_url") or _credentials.get("url", "http://localhost:8529")
-        _client = ArangoClient(hosts=url, request_timeout=120, verify_override=False)
-    return _client
+    with _db_handles_lock:
+        if _client is None:
+            url = _credentials.get("internal_url") or _credentials.get("url", "http://localhost:8529")
+            # keep-alive pool sized for the request limit plus background work (warmups, exports)
+            http_client = DefaultHTTPClient(
+                request_timeout=_ARANGO_REQUEST_TIMEOUT_SECONDS,
+                pool_connections=_ARANGO_CONCURRENCY + 4,
+                pool_maxsize=_ARANGO_CONCURRENCY + 4,
+            )
+            _client = ArangoClient(hosts=url, http_client=http_client, verify_override=False)
+        return _client
 
 
 def get_db(name: str):
     client = get_client()
-    return client.db(name, username=_credentials.get("user", "root"),
-                     password=_credentials.get("password", "password"))
+    with _db_handles_lock:
+        if name not in _arango_dbs:
+            _arango_dbs[name] = client.db(name, username=_credentials.get("user", "root"),
+                                          password=_credentials.get("password", "password"))
+        return _arango_dbs[name]
 
 
 def get_sys_db():
-    client = get_client()
-    return client.db("_system", username=_credentials.get("user", "root"),
-                     password=_credentials.get("password", "password"))
+    return get_db("_system")
+
+
+def _create_mysql_engine(url: str, pool_size: int) -> Engine:
+    return create_engine(
+        url,
+        pool_pre_ping=True,
+        pool_size=pool_size,
+        max_overflow=2,
+        pool_timeout=_BACKEND_QUEUE_TIMEOUT_SECONDS,
+        pool_recycle=3600,
+        connect_args={"connect_timeout": 10, "read_timeout": _MYSQL_READ_TIMEOUT_SECONDS},
+    )
 
 
 def get_mysql_engine(source_id: str = "default") -> Optional[Engine]:
@@ -3776,16 +3840,17 @@ def get_mysql_engine(source_id: str = "default") -> Optional[Engine]:
         return None
 
     cache_key = f"{source_id}::_root"
-    if cache_key not in _mysql_db_engines:
-        host = credentials.get("url", "localhost")
-        port = credentials.get("port", 3306)
-        user = credentials.get("user", "root")
-        password = url_quote(credentials.get("password", ""), safe="")
-        _mysql_db_engines[cache_key] = create_engine(
-            f"mysql+pymysql://{user}:{password}@{host}:{port}",
-            pool_pre_ping=True, pool_size=2,
-        )
-    return _mysql_db_engines[cache_key]
+    with _db_handles_lock:
+        if cache_key not in _mysql_db_engines:
+            host = credentials.get("url", "localhost")
+            port = credentials.get("port", 3306)
+            user = credentials.get("user", "root")
+            password = url_quote(credentials.get("password", ""), safe="")
+            _mysql_db_engines[cache_key] = _create_mysql_engine(
+                f"mysql+pymysql://{user}:{password}@{host}:{port}",
+                pool_size=2,
+            )
+        return _mysql_db_engines[cache_key]
 
 
 def get_mysql_db_engine(db_name: str, source_id: str = "default") -> Engine:
@@ -3793,16 +3858,17 @@ def get_mysql_db_engine(db_name: str, source_id: str = "default") -> Engine:
     source = _get_mysql_source(source_id)
     credentials = source["credentials"]
     cache_key = f"{source_id}::{db_name}"
-    if cache_key not in _mysql_db_engines:
-        host = credentials.get("url", "localhost")
-        port = credentials.get("port", 3306)
-        user = credentials.get("user", "root")
-        password = url_quote(credentials.get("password", ""), safe="")
-        _mysql_db_engines[cache_key] = create_engine(
-            f"mysql+pymysql://{user}:{password}@{host}:{port}/{db_name}",
-            pool_pre_ping=True, pool_size=2,
-        )
-    return _mysql_db_engines[cache_key]
+    with _db_handles_lock:
+        if cache_key not in _mysql_db_engines:
+            host = credentials.get("url", "localhost")
+            port = credentials.get("port", 3306)
+            user = credentials.get("user", "root")
+            password = url_quote(credentials.get("password", ""), safe="")
+            _mysql_db_engines[cache_key] = _create_mysql_engine(
+                f"mysql+pymysql://{user}:{password}@{host}:{port}/{db_name}",
+                pool_size=_MYSQL_CONCURRENCY,
+            )
+        return _mysql_db_engines[cache_key]
 
 
 def get_mysql_inspector(db_name: str, source_id: str = "default"):
@@ -3812,7 +3878,14 @@ def get_mysql_inspector(db_name: str, source_id: str = "default"):
     Call invalidate_mysql_inspector(db_name) to force a refresh.
     """
     cache_key = f"{source_id}::{db_name}"
-    if cache_key not in _mysql_inspector_cache:
+    if cache_key in _mysql_inspector_cache:
+        return _mysql_inspector_cache[cache_key]
+    with _db_handles_lock:
+        lock = _mysql_inspector_locks.setdefault(cache_key, threading.Lock())
+    # one inspection per database; concurrent first requests wait for it instead of repeating it
+    with lock:
+        if cache_key in _mysql_inspector_cache:
+            return _mysql_inspector_cache[cache_key]
         engine = get_mysql_db_engine(db_name, source_id=source_id)
         insp = sa_inspect(engine)
         table_names = insp.get_table_names()
@@ -4103,6 +4176,8 @@ def _get_collection_search_metadata(db, coll_name: str) -> dict:
         text_fields = _infer_collection_search_fields(db, coll_name, schema_entry=schema_entry)
     return {
         "text_fields": text_fields,
+        # set by builds that linked the collection into an ArangoSearch view
+        "search_view": search_metadata.get("search_view") if search_metadata.get("text_fields") else None,
     }
 
 
@@ -4251,13 +4326,24 @@ def _build_collection_facet_url(db_name: str, coll_name: str, field: str,
 
 
 def _build_collection_download_url(db_name: str, coll_name: str, page: int, page_size: int,
-                                   facet_filters: Dict[str, List[str]], search_term: str = "") -> str:
+                                   facet_filters: Dict[str, List[str]], search_term: str = "",
+                                   export_format: str = "csv") -> str:
     params = _build_collection_query_params(page, page_size, facet_filters, search_term=search_term)
     query_string = urlencode(params, doseq=True)
-    base_url = _app_path(f"/db/{db_name}/collection/{coll_name}/download.csv")
+    base_url = _app_path(f"/db/{db_name}/collection/{coll_name}/download.{export_format}")
     return f"{base_url}?{query_string}" if query_string else base_url
 
 
+def _build_collection_download_format_urls(db_name: str, coll_name: str, page: int, page_size: int,
+                                           facet_filters: Dict[str, List[str]], search_term: str = "") -> Dict[str, str]:
+    return {
+        export_format: _build_collection_download_url(
+            db_name, coll_name, page, page_size, facet_filters, search_term=search_term, export_format=export_format
+        )
+        for export_format in ("csv.gz", "parquet")
+    }
+
+
 def _get_search_constraint_clause(search_fields: List[str], search_term: str, bind_vars: dict,
                                   variable: str = "doc") -> str:
     if not search_term or not search_fields:
@@ -4302,20 +4388,6 @@ def _get_filter_constraint_clause(filter_settings: Dict[str, List[str]], bind_va
     return " AND ".join(clauses)
 
 
-def _get_facet_clause(field_bind_name: str, top_bind_name: str, variable: str = "doc") -> str:
-    return f"""
-        LET values = (
-            !HAS({variable}, @{field_bind_name}) || {variable}[@{field_bind_name}] == null
-                ? [null]
-                : (IS_ARRAY({variable}[@{field_bind_name}]) ? UNIQUE({variable}[@{field_bind_name}]) : [{variable}[@{field_bind_name}]])
-        )
-            FOR item IN values
-                COLLECT value = item WITH COUNT INTO count
-                SORT count DESC, value
-                LIMIT @{top_bind_name}
-                RETURN {{ value, count }}"""
-
-
 def _normalize_facet_value(value):
     return "null" if value is None else str(value)
 
@@ -4347,10 +4419,113 @@ def _build_collection_constraints(active_filters: Dict[str, List[str]], search_f
     return " AND ".join(clauses)
 
 
+def _collection_loop(coll_name: str, active_filters: Dict[str, List[str]], search_fields: List[str],
+                     search_term: str, bind_vars: dict, search_view: Optional[str] = None,
+                     variable: str = "doc") -> tuple[str, bool]:
+    """FOR head over the documents matching the filters and search, and whether they are ranked.
+
+    With a search view the term is matched as word prefixes through the view and the loop
+    variable can be sorted by BM25; otherwise every document is scanned with the substring
+    filter.
+    """
+    if search_view and search_fields and has_search_tokens(search_term):
+        bind_vars["search_term"] = search_term
+        bind_vars["search_collection"] = coll_name
+        loop = view_search_loop(search_view, search_fields, bind_vars, variable=variable)
+        filter_clause = _get_filter_constraint_clause(active_filters, bind_vars, variable=variable)
+        return f"""{loop}
+            {f"FILTER {filter_clause}" if filter_clause else ""}""", True
+    filter_clause = _build_collection_constraints(
+        active_filters=active_filters,
+        search_fields=search_fields,
+        search_term=search_term,
+        bind_vars=bind_vars,
+        variable=variable,
+    )
+    return f"""FOR {variable} IN `{coll_name}`
+            {f"FILTER {filter_clause}" if filter_clause else ""}""", False
+
+
+def _collection_sort(ranked: bool, variable: str = "doc") -> str:
+    return f"SORT BM25({variable}) DESC, {variable}._key ASC" if ranked else f"SORT {variable}._key ASC"
+
+
+_FACET_COUNTS_CACHE_TTL_SECONDS = 300
+_FACET_COUNTS_CACHE_SIZE = 256
+_facet_counts_cache: dict = {}   # query signature -> (expires_at, counts)
+_facet_counts_cache_locks: dict = {}
+_facet_counts_cache_guard = threading.Lock()
+
+
+def _get_stored_facet_counts(db, coll_name: str) -> Optional[dict]:
+    """Unfiltered facet counts materialized by the last build, if it wrote them."""
+    if not db.has_collection("metadata_store"):
+        return None
+    try:
+        doc = db.collection("metadata_store").get(FACET_COUNTS_KEY)
+    except Exception:
+        return None
+    entry = ((doc or {}).get("collections") or {}).get(coll_name)
+    return entry.get("fields") if entry else None
+
+
+def _query_facet_counts(db, db_name: str, coll_name: str, fields: List[str],
+                        filters: Dict[str, List[str]], search_fields: List[str], search_term: str,
+                        top: int, search_view: Optional[str] = None) -> Dict[str, List[dict]]:
+    """Facet counts for fields under one set of constraints, shared briefly between the
+    per-field panel requests a page fires at once."""
+    signature = (
+        db_name, coll_name, tuple(fields), top, search_term, search_view,
+        tuple((field, tuple(values)) for field, values in sorted(filters.items())),
+    )
+    with _facet_counts_cache_guard:
+        lock = _facet_counts_cache_locks.setdefault(signature, threading.Lock())
+    with lock:
+        cached = _facet_counts_cache.get(signature)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        bind_vars = {}
+        loop, _ = _collection_loop(coll_name, filters, search_fields, search_term, bind_vars, search_view=search_view)
+        counts = compute_facet_counts(db, coll_name, fields, top=top, bind_vars=bind_vars, loop=loop)
+        with _facet_counts_cache_guard:
+            _facet_counts_cache[signature] = (time.monotonic() + _FACET_COUNTS_CACHE_TTL_SECONDS, counts)
+            while len(_facet_counts_cache) > _FACET_COUNTS_CACHE_SIZE:
+                oldest = next(iter(_facet_counts_cache))
+                _facet_counts_cache.pop(oldest)
+                _facet_counts_cache_locks.pop(oldest, None)
+        return counts
+
+
+def _collection_facet_rows(db, db_name: str, coll_name: str, field: str, category_fields: List[str],
+                           active_filters: Dict[str, List[str]], search_fields: List[str],
+                           search_term: str, top: int = 20, search_view: Optional[str] = None) -> List[dict]:
+    """[{value, count}] for one facet panel.
+
+    Unfiltered pages read the counts stored at build time. Otherwise every field without
+    a selection of its own shares one multi-facet query under all active constraints; a
+    field with selections is counted under the other fields' constraints only, so its
+    unselected values stay visible.
+    """
+    if not active_filters and not search_term and top <= STORED_FACET_TOP:
+        stored = _get_stored_facet_counts(db, coll_name)
+        if stored is not None and field in stored:
+            return stored[field][:top]
+    if active_filters.get(field):
+        other_filters = {k: v for k, v in active_filters.items() if k != field}
+        fields = [field]
+    else:
+        other_filters = active_filters
+        fields = [name for name in category_fields if not active_filters.get(name)] or [field]
+    counts = _query_facet_counts(
+        db, db_name, coll_name, fields, other_filters, search_fields, search_term, top, search_view=search_view
+    )
+    return counts.get(field, [])
+
+
 def _build_collection_facet_panels(db, db_name: str, coll_name: str, page_size: int,
                                    category_fields: List[str], active_filters: Dict[str, List[str]],
                                    search_fields: List[str], search_term: str,
-                                   top: int = 20) -> List[dict]:
+                                   top: int = 20, search_view: Optional[str] = None) -> List[dict]:
     ordered_fields = sorted(
         category_fields,
         key=lambda field: (0 if active_filters.get(field) else 1, field),
@@ -4366,6 +4541,8 @@ def _build_collection_facet_panels(db, db_name: str, coll_name: str, page_size:
             search_fields=search_fields,
             search_term=search_term,
             top=top,
+            category_fields=category_fields,
+            search_view=search_view,
         )
         for field in ordered_fields
     ]
@@ -4374,24 +4551,20 @@ def _build_collection_facet_panels(db, db_name: str, coll_name: str, page_size:
 def _build_collection_facet_panel(db, db_name: str, coll_name: str, page_size: int,
                                   field: str, active_filters: Dict[str, List[str]],
                                   search_fields: List[str], search_term: str,
-                                  top: int = 20) -> dict:
-    other_filters = {k: v for k, v in active_filters.items() if k != field}
-    bind_vars = {
-        "facet_field": field,
-        "facet_top": top,
-    }
-    filter_clause = _build_collection_constraints(
-        active_filters=other_filters,
+                                  top: int = 20, category_fields: Optional[List[str]] = None,
+                                  search_view: Optional[str] = None) -> dict:
+    rows = _collection_facet_rows(
+        db=db,
+        db_name=db_name,
+        coll_name=coll_name,
+        field=field,
+        category_fields=category_fields or [field],
+        active_filters=active_filters,
         search_fields=search_fields,
         search_term=search_term,
-        bind_vars=bind_vars,
+        top=top,
+        search_view=search_view,
     )
-    query = f"""
-        FOR doc IN `{coll_name}`
-            {f"FILTER {filter_clause}" if filter_clause else ""}
-            {_get_facet_clause('facet_field', 'facet_top')}
-    """
-    rows = list(db.aql.execute(query, bind_vars=bind_vars))
     selected_values = set(active_filters.get(field, []))
     facet_values = []
     for row in rows:
@@ -5373,6 +5546,307 @@ def _resolver_examples_payload_for_api(source: str, resolver: str, version: str)
     }
 
 
+# ── Backend limits ───────────────────────────────────────────────────────────
+
+_backend_limiter = BackendLimiter()
+_console_queries = ConsoleQueries()
+_ARANGO_BACKEND_PATH_RE = re.compile(r"^/db/[^/]+(?:/|$)")
+_MYSQL_BACKEND_PATH_RE = re.compile(r"^/mysql/(?P<source_id>[^/]+)/[^/]+")
+# cancel requests must not queue behind the query they cancel
+_CONSOLE_CANCEL_PATH_RE = re.compile(r"/(?:aql|sql)/cancel$")
+
+
+def _request_backend(path: str) -> Optional[tuple[str, int]]:
+    if _CONSOLE_CANCEL_PATH_RE.search(path):
+        return None
+    if _ARANGO_BACKEND_PATH_RE.match(path):
+        return "arango", _ARANGO_CONCURRENCY
+    match = _MYSQL_BACKEND_PATH_RE.match(path)
+    if match:
+        source_id = match.group("source_id")
+        # /mysql/{db_name}/... only redirects; share one key for names that are not sources
+        return f"mysql:{source_id if source_id in _mysql_sources else ''}", _MYSQL_CONCURRENCY
+    return None
+
+
+@app.middleware("http")
+async def _limit_backend_concurrency(request: Request, call_next):
+    path = request.scope["path"]
+    root_path = _root_path(request)
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path):]
+    backend = _request_backend(path)
+    if backend is None:
+        return await call_next(request)
+    name, limit = backend
+    try:
+        async with _backend_limiter.slot(name, limit, _BACKEND_QUEUE_TIMEOUT_SECONDS):
+            return await call_next(request)
+    except BackendBusy as exc:
+        return HTMLResponse(
+            f"The {exc.backend.split(':')[0]} backend is busy with other requests; try again shortly.",
+            status_code=503,
+            headers={"Retry-After": "5"},
+        )
+
+
+# ── Conditional GET ──────────────────────────────────────────────────────────
+# Pages below these paths only change when a build, a disease release or a schema
+# refresh lands. Each scope maps to a validator; responses carry it as an ETag and
+# repeat requests are answered with 304 or from _response_cache without the route.
+
+_HTTP_VALIDATOR_TTL_SECONDS = 5
+_RESPONSE_CACHE_MAX_ENTRY_BYTES = 2 * 1024 * 1024
+_response_cache = ResponseCache(int(os.getenv("QA_BROWSER_RESPONSE_CACHE_MB", "64")) * 1024 * 1024)
+_http_validator_memo: dict = {}
+_http_validator_memo_lock = threading.Lock()
+_mysql_schema_digests: dict = {}
+# part of every ETag: a restart may ship new templates, and data-changing POSTs bump their scope
+_http_cache_epoch = uuid.uuid4().hex
+_http_scope_generations: dict = {}
+# the POSTs that change what a scope renders; console queries and resolve APIs only read
+_HTTP_CACHE_INVALIDATIONS = [
+    ("mysql_schema", re.compile(r"^/mysql/[^/]+/[^/]+/refresh-schema$")),
+    ("registry", re.compile(r"^/registry/update-status$")),
+]
+_HTTP_CACHE_SCOPES = [
+    ("arango", re.compile(r"^/db/(?P<db_name>[^/]+)(?:/collection/(?P<coll_name>[^/]+))?(?:/|$)")),
+    ("disease", re.compile(r"^/(?:disease-id-qa/(?:api/|download)|api/v1/disease/)")),
+    ("mysql_schema", re.compile(r"^/mysql/(?P<source_id>[^/]+)/(?P<db_name>[^/]+)/schema$")),
+    ("registry", re.compile(r"^/registry(?P<page>/resolvers|/graphs)?$")),
+    ("registry", re.compile(r"^/registry(?P<page>/resolvers)/[^/]+/[^/]+$")),
+]
+# query consoles mint a query_id per render for their Cancel button; a cached page would hand
+# one id to every user, and cancelling would kill someone else's query
+_HTTP_CACHE_EXCLUDED = re.compile(r"^/(?:db/[^/]+/aql|mysql/(?:[^/]+/)?[^/]+/sql)(?:/|$)")
+_REGISTRY_PAGE_CATALOG_CATEGORIES = {
+    None: ("source_snapshots", "derived_artifacts", "external_registrations"),
+    "/resolvers": ("resolver_snapshots",),
+    "/graphs": (),
+}
+
+
+def _http_cache_scope(path: str) -> Optional[tuple[str, dict]]:
+    if _HTTP_CACHE_EXCLUDED.match(path):
+        return None
+    for name, pattern in _HTTP_CACHE_SCOPES:
+        match = pattern.match(path)
+        if match:
+            return name, match.groupdict()
+    return None
+
+
+def _memoized_validator(key: tuple, loader):
+    """loader() result for key, reused for _HTTP_VALIDATOR_TTL_SECONDS so page bursts cost one lookup."""
+    now = time.monotonic()
+    with _http_validator_memo_lock:
+        cached = _http_validator_memo.get(key)
+    if cached is not None and now - cached[0] < _HTTP_VALIDATOR_TTL_SECONDS:
+        return cached[1]
+    value = loader()
+    with _http_validator_memo_lock:
+        _http_validator_memo[key] = (now, value)
+    return value
+
+
+def _http_cache_invalidation(method: str, path: str) -> Optional[str]:
+    if method in ("GET", "HEAD"):
+        return None
+    for name, pattern in _HTTP_CACHE_INVALIDATIONS:
+        if pattern.match(path):
+            return name
+    return None
+
+
+def _invalidate_http_validators(name: str) -> None:
+    with _http_validator_memo_lock:
+        for key in [key for key in _http_validator_memo if key[0] == name]:
+            del _http_validator_memo[key]
+        _http_scope_generations[name] = _http_scope_generations.get(name, 0) + 1
+    _response_cache.discard_where(lambda key: key[0] == name)
+
+
+def _utc_from_iso(value) -> Optional[datetime]:
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        # naive values were written with datetime.now() on the build host
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).astimezone(timezone.utc)
+    except ValueError:
+        return None
+
+
+def _arango_build_token(db_name: str) -> Optional[tuple]:
+    """(run_id, checkpoint time, ETL run date) of a finished build, or None while one is running."""
+    db = get_db(db_name)
+    if not db.has_collection("metadata_store"):
+        return None
+    row = next(iter(db.aql.execute("""
+        LET etl = DOCUMENT("metadata_store", "etl_metadata").value
+        LET latest = FIRST(
+            FOR d IN metadata_store
+                FILTER d.type == "etl_checkpoint"
+                SORT d.last_updated DESC
+                LIMIT 1
+                RETURN d
+        )
+        RETURN { run_id: latest.run_id, last_updated: latest.last_updated, run_date: etl.run_date }
+    """)), None) or {}
+    run_date = _parse_iso_datetime(row.get("run_date"))
+    if run_date is None:
+        return None
+    checkpoint_updated = _parse_iso_datetime(row.get("last_updated"))
+    if checkpoint_updated is not None and checkpoint_updated > run_date:
+        # adapters finished after the last post-processing pass: build still in progress
+        return None
+    return row.get("run_id"), row.get("last_updated"), row.get("run_date")
+
+
+def _arango_http_validator(db_name: str, coll_name: Optional[str]) -> Optional[tuple]:
+    build = _memoized_validator(("arango", db_name), lambda: _arango_build_token(db_name))
+    if build is None:
+        return None
+    parts = [db_name, *build]
+    if coll_name:
+        # the QA browser itself writes some collections (harmonization stages) between builds
+        def collection_revision():
+            db = get_db(db_name)
+            return db.collection(coll_name).revision() if db.has_collection(coll_name) else None
+        parts.append(_memoized_validator(("arango", db_name, coll_name), collection_revision))
+    return tuple(parts), _utc_from_iso(build[2])
+
+
+def _disease_release_fingerprint() -> tuple:
+    directories = {_disease_graph_dir, _baseline_graph_dir}
+    directories.update(entry["path"] for entry in _discover_disease_versions())
+    fingerprint = []
+    for directory in sorted(filter(None, directories)):
+        root = Path(directory)
+        if not root.is_dir():
+            continue
+        for path in sorted(root.iterdir()):
+            if path.name.startswith(".") or not path.is_file():
+                continue
+            stat = path.stat()
+            fingerprint.append((str(path), stat.st_size, stat.st_mtime_ns))
+    return tuple(fingerprint)
+
+
+def _disease_http_validator() -> Optional[tuple]:
+    if not _disease_graph_dir:
+        return None
+    fingerprint = _memoized_validator(("disease",), _disease_release_fingerprint)
+    if not fingerprint:
+        return None
+    newest = max(mtime_ns for _, _, mtime_ns in fingerprint)
+    return fingerprint, datetime.fromtimestamp(newest / 1e9, tz=timezone.utc)
+
+
+def _mysql_schema_http_validator(source_id: str, db_name: str) -> Optional[tuple]:
+    cache_key = f"{source_id}::{db_name}"
+    meta = _mysql_inspector_cache.get(cache_key)
+    if meta is None:
+        return None
+    cached = _mysql_schema_digests.get(cache_key)
+    if cached is None or cached[0] is not meta:
+        digest = hashlib.sha256(json.dumps(meta, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        cached = _mysql_schema_digests[cache_key] = (meta, digest)
+    return (cache_key, cached[1]), None
+
+
+def _registry_http_validator(page: Optional[str]) -> Optional[tuple]:
+    """Load times of the TTL caches the page renders from, or None once any has expired."""
+    now = time.time()
+    categories = _REGISTRY_PAGE_CATALOG_CATEGORIES[page]
+    if not all(_registry_catalog_cache_fresh(category, now) for category in categories):
+        return None
+    usage_cache = _registry_graph_cache if page == "/graphs" else _registry_usage_cache
+    usage_key = "graphs" if page == "/graphs" else "usage_by_registry_id"
+    usage_loaded_at = usage_cache.get("loaded_at") or 0.0
+    if usage_cache.get(usage_key) is None or now - usage_loaded_at >= _REGISTRY_USAGE_TTL_SECONDS:
+        return None
+    catalog_loaded_at = _registry_catalog_cache.get("loaded_at") or {}
+    loaded_at = [catalog_loaded_at[category] for category in categories] + [usage_loaded_at]
+    parts = (page, *loaded_at, _registry_update_status_cache.get("checked_at"))
+    return parts, datetime.fromtimestamp(max(loaded_at), tz=timezone.utc)
+
+
+def _http_validator(request: Request, name: str, params: dict) -> Optional[Validator]:
+    if name == "arango":
+        found = _arango_http_validator(params["db_name"], params.get("coll_name"))
+    elif name == "disease":
+        found = _disease_http_validator()
+    elif name == "mysql_schema":
+        found = _mysql_schema_http_validator(params["source_id"], params["db_name"])
+    else:
+        found = _registry_http_validator(params.get("page"))
+    if found is None:
+        return None
+    parts, last_modified = found
+    variant = (request.headers.get("HX-Request") == "true", _root_path(request))
+    generation = (_http_cache_epoch, _http_scope_generations.get(name, 0))
+    return make_validator((name, parts, variant, generation), last_modified)
+
+
+def _response_cache_key(request: Request, name: str, validator: Validator) -> tuple:
+    return name, request.scope["path"], request.url.query, validator.etag
+
+
+def _http_validator_or_none(request: Request, name: str, params: dict) -> Optional[Validator]:
+    try:
+        return _http_validator(request, name, params)
+    except Exception as exc:
+        # never fail a page because its validator could not be read; serve it uncached
+        print(f"HTTP validator for {request.url.path} unavailable: {exc}")
+        return None
+
+
+@app.middleware("http")
+async def _conditional_get(request: Request, call_next):
+    path = request.scope["path"]
+    root_path = _root_path(request)
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path):]
+    invalidates = _http_cache_invalidation(request.method, path)
+    if invalidates is not None:
+        response = await call_next(request)
+        # after the route, so a GET racing it cannot cache old data under the new generation
+        _invalidate_http_validators(invalidates)
+        return response
+    scope = _http_cache_scope(path)
+    if scope is None or request.method not in ("GET", "HEAD"):
+        return await call_next(request)
+    name, params = scope
+
+    validator = await run_in_threadpool(_http_validator_or_none, request, name, params)
+    if validator is not None:
+        if is_not_modified(request.headers, validator):
+            return not_modified_response(validator, vary="HX-Request")
+        cached = _response_cache.get(_response_cache_key(request, name, validator))
+        if cached is not None:
+            return cached.to_response()
+
+    response = await call_next(request)
+    # without a validator from before rendering, the body could be older than any validator
+    # read now (a first visit fills the MySQL schema or registry caches); serve it uncached
+    if response.status_code != 200 or validator is None:
+        return response
+    response.headers.update(validator_headers(validator))
+    response.headers.add_vary_header("HX-Request")
+
+    content_length = int(response.headers.get("content-length") or -1)
+    if (
+        request.method == "GET"
+        and 0 <= content_length <= _RESPONSE_CACHE_MAX_ENTRY_BYTES
+        and "content-disposition" not in response.headers
+    ):
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        cached = CachedResponse(body=body, headers=list(response.headers.items()))
+        _response_cache.put(_response_cache_key(request, name, validator), cached)
+        return cached.to_response()
+    return response
+
+
 # ── Routes ───────────────────────────────────────────────────────────────────
 
 @app.get("/", response_class=HTMLResponse)
@@ -5988,8 +6462,15 @@ def disease_id_qa_versions():
 def disease_id_qa_version_diff(
     from_version: Optional[str] = None,
     to_version: Optional[str] = None,
+    section: Optional[str] = None,
+    page: int = 1,
+    per_page: int = 500,
 ):
-    """Compute delta between two versioned disease app_graph datasets."""
+    """Delta between two versioned disease app_graph datasets.
+
+    Without section, returns the summary with the first rows of each list; with section
+    (e.g. tier_changes), returns one page of that list.
+    """
     if not _disease_graph_dir:
         raise HTTPException(status_code=500, detail="No --disease-graph-dir configured.")
     versions = _discover_disease_versions()
@@ -6008,9 +6489,34 @@ def disease_id_qa_version_diff(
     if to_dir is None:
         raise HTTPException(status_code=404, detail=f"Disease graph version not found: {to_version}")
 
-    baseline = load_version_data(from_dir)
-    current = load_disease_graph_data(_disease_graph_dir) if to_dir.resolve() == Path(_disease_graph_dir).resolve() else load_version_data(to_dir)
-    return compute_version_diff(current, baseline)
+    diff = load_full_version_diff(from_dir, to_dir, from_version, to_version)
+    if section:
+        return page_version_diff(diff, section, page=page, per_page=per_page)
+    return truncate_version_diff(diff)
+
+
+def _warm_default_version_diff():
+    try:
+        versions = _discover_disease_versions()
+        from_version, to_version = _default_disease_version_pair(versions)
+        if not from_version or not to_version or from_version == to_version:
+            return
+        from_dir = _disease_version_dir(from_version)
+        to_dir = _disease_version_dir(to_version)
+        if from_dir is not None and to_dir is not None:
+            load_full_version_diff(from_dir, to_dir, from_version, to_version)
+    except Exception as exc:
+        print(f"Disease version diff warmup failed: {exc}")
+
+
+def _start_version_diff_warmup_thread():
+    if not _disease_graph_dir:
+        return
+    threading.Thread(
+        target=_warm_default_version_diff,
+        name="qa-browser-version-diff-warmup",
+        daemon=True,
+    ).start()
 
 
 # ---------------------------------------------------------------------------
@@ -6339,7 +6845,7 @@ def dashboard_collections(request: Request, db_name: str):
 
 
 @app.get("/db/{db_name}/build-status", response_class=HTMLResponse)
-async def build_status_page(request: Request, db_name: str):
+def build_status_page(request: Request, db_name: str):
     db = get_db(db_name)
     build_status = _get_build_status(db)
     return templates.TemplateResponse(request, "build_status.html", {
@@ -6350,7 +6856,7 @@ async def build_status_page(request: Request, db_name: str):
 
 
 @app.get("/db/{db_name}/view/{view_id}/preview", response_class=HTMLResponse)
-async def preview_graph_view(request: Request, db_name: str, view_id: str, limit: int = 50):
+def preview_graph_view(request: Request, db_name: str, view_id: str, limit: int = 50):
     db = get_db(db_name)
     graph_views = _get_graph_views(db)
     graph_view = graph_views.get(view_id)
@@ -6410,7 +6916,7 @@ async def preview_graph_view(request: Request, db_name: str, view_id: str, limit
 
 
 @app.get("/db/{db_name}/view/{view_id}")
-async def execute_graph_view(db_name: str, view_id: str):
+def execute_graph_view(db_name: str, view_id: str):
     db = get_db(db_name)
     graph_views = _get_graph_views(db)
     graph_view = graph_views.get(view_id)
@@ -6483,11 +6989,13 @@ def collection_browser(request: Request, db_name: str, coll_name: str,
     active_filters = _parse_collection_facet_filters(request, category_fields)
     search_term = _parse_collection_search_term(request)
     filter_bind_vars = {}
-    filter_clause = _build_collection_constraints(
-        active_filters=active_filters,
-        search_fields=search_fields,
-        search_term=search_term,
-        bind_vars=filter_bind_vars,
+    loop, ranked = _collection_loop(
+        coll_name,
+        active_filters,
+        search_fields,
+        search_term,
+        filter_bind_vars,
+        search_view=search_metadata.get("search_view"),
     )
     htmx = request.headers.get("HX-Request") == "true"
 
@@ -6533,6 +7041,14 @@ def collection_browser(request: Request, db_name: str, coll_name: str,
             facet_filters=active_filters,
             search_term=search_term,
         )
+        download_format_urls = _build_collection_download_format_urls(
+            db_name=db_name,
+            coll_name=coll_name,
+            page=page,
+            page_size=page_size,
+            facet_filters=active_filters,
+            search_term=search_term,
+        )
         clear_search_url = _build_collection_url(
             db_name=db_name,
             coll_name=coll_name,
@@ -6562,6 +7078,7 @@ def collection_browser(request: Request, db_name: str, coll_name: str,
             "stats_url": stats_url,
             "facets_url": facets_url,
             "download_url": download_url,
+            "download_format_urls": download_format_urls,
             "clear_search_url": clear_search_url,
             "rows_url": rows_url,
             "loading_table": True,
@@ -6571,8 +7088,7 @@ def collection_browser(request: Request, db_name: str, coll_name: str,
 
     # Use AQL for both count and list so they always agree
     count_query = f"""
-        FOR doc IN `{coll_name}`
-            {f"FILTER {filter_clause}" if filter_clause else ""}
+        {loop}
             COLLECT WITH COUNT INTO c
             RETURN c
     """
@@ -6592,11 +7108,10 @@ def collection_browser(request: Request, db_name: str, coll_name: str,
     )
     list_bind_vars["return_fields"] = preview_fields
 
-    # Fetch documents
+    # Fetch documents, best matches first when the search ran through a view
     query = f"""
-        FOR doc IN `{coll_name}`
-            {f"FILTER {filter_clause}" if filter_clause else ""}
-            SORT doc._key ASC
+        {loop}
+            {_collection_sort(ranked)}
             LIMIT @skip, @top
             RETURN KEEP(doc, @return_fields)
     """
@@ -6628,6 +7143,9 @@ def collection_browser(request: Request, db_name: str, coll_name: str,
         search_term=search_term,
     )
     download_url = _build_collection_download_url(db_name, coll_name, page, page_size, active_filters, search_term=search_term)
+    download_format_urls = _build_collection_download_format_urls(
+        db_name, coll_name, page, page_size, active_filters, search_term=search_term
+    )
     clear_search_url = _build_collection_url(
         db_name=db_name,
         coll_name=coll_name,
@@ -6664,6 +7182,7 @@ def collection_browser(request: Request, db_name: str, coll_name: str,
         "stats_url": stats_url,
         "facets_url": facets_url,
         "download_url": download_url,
+        "download_format_urls": download_format_urls,
         "clear_search_url": clear_search_url,
         "rows_url": "",
         "loading_table": False,
@@ -6672,42 +7191,134 @@ def collection_browser(request: Request, db_name: str, coll_name: str,
     })
 
 
-@app.get("/db/{db_name}/collection/{coll_name}/download.csv")
-async def collection_download(request: Request, db_name: str, coll_name: str,
-                              page: int = 1, page_size: int = 25):
-    db = get_db(db_name)
-    facet_metadata = _get_collection_facet_metadata(db, coll_name)
-    search_metadata = _get_collection_search_metadata(db, coll_name)
-    category_fields = sorted(facet_metadata.get("category_fields") or [])
-    search_fields = list(search_metadata.get("text_fields") or [])
-    active_filters = _parse_collection_facet_filters(request, category_fields)
-    search_term = _parse_collection_search_term(request)
-    filter_bind_vars = {}
-    filter_clause = _build_collection_constraints(
-        active_filters=active_filters,
-        search_fields=search_fields,
-        search_term=search_term,
-        bind_vars=filter_bind_vars,
-    )
+# format -> (media type, file extension); parquet needs pyarrow, imported on use
+_COLLECTION_EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "csv.gz": ("application/gzip", "csv.gz"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+_COLLECTION_EXPORT_BATCH_SIZE = 5000
 
-    coll = db.collection(coll_name)
-    is_edge = coll.properties().get("type") in ("edge", 3)
-    preview_fields = _get_collection_preview_fields(
-        is_edge=is_edge,
-        facet_metadata=facet_metadata,
-        search_metadata=search_metadata,
+
+class _ExportChunkSink(io.RawIOBase):
+    """Write-only file that hands back what was written since the last drain().
+
+    ParquetWriter records offsets with tell(), so the position keeps counting across drains.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.chunks: List[bytes] = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+class _CsvExportEncoder:
+    def __init__(self, columns: List[str]):
+        self.columns = columns
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+        self.writer.writerow(columns)
+
+    def _take(self) -> bytes:
+        text = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate(0)
+        return text.encode("utf-8")
+
+    def encode(self, docs: List[dict]) -> bytes:
+        for doc in docs:
+            self.writer.writerow([_normalize_csv_value(doc.get(column)) for column in self.columns])
+        return self._take()
+
+    def finish(self) -> bytes:
+        return self._take()
+
+
+class _GzipCsvExportEncoder(_CsvExportEncoder):
+    def __init__(self, columns: List[str]):
+        super().__init__(columns)
+        self.compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+
+    def encode(self, docs: List[dict]) -> bytes:
+        return self.compressor.compress(super().encode(docs))
+
+    def finish(self) -> bytes:
+        return self.compressor.compress(super().finish()) + self.compressor.flush()
+
+
+class _ParquetExportEncoder:
+    """One row group per cursor batch. Values are written as strings, as in the CSV export,
+    because collection fields are not typed consistently across documents."""
+
+    def __init__(self, columns: List[str]):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.pa = pa
+        self.columns = columns
+        self.schema = pa.schema([(column, pa.string()) for column in columns])
+        self.sink = _ExportChunkSink()
+        self.writer = pq.ParquetWriter(self.sink, self.schema, compression="zstd")
+
+    def encode(self, docs: List[dict]) -> bytes:
+        if docs:
+            table = self.pa.table(
+                {column: [_parquet_export_value(doc.get(column)) for doc in docs] for column in self.columns},
+                schema=self.schema,
+            )
+            self.writer.write_table(table)
+        return self.sink.drain()
+
+    def finish(self) -> bytes:
+        self.writer.close()
+        return self.sink.drain()
+
+
+def _parquet_export_value(value):
+    if value is None:
+        return None
+    return str(_normalize_csv_value(value))
+
+
+_COLLECTION_EXPORT_ENCODERS = {
+    "csv": _CsvExportEncoder,
+    "csv.gz": _GzipCsvExportEncoder,
+    "parquet": _ParquetExportEncoder,
+}
+
+
+def _open_collection_export(db, coll_name: str, active_filters: Dict[str, List[str]], search_fields: List[str],
+                            search_term: str, preview_fields: List[str], is_edge: bool, page: int, page_size: int,
+                            search_view: Optional[str] = None):
+    """Export columns and a server-side stream cursor over every filtered document."""
+    filter_bind_vars = {}
+    loop, ranked = _collection_loop(
+        coll_name, active_filters, search_fields, search_term, filter_bind_vars, search_view=search_view
     )
 
     # Match the export columns to the current list-page view by rediscovering
     # columns from the currently visible page, then export all filtered rows.
-    page = max(page, 1)
-    page_size = max(page_size, 1)
     skip = (page - 1) * page_size
     preview_bind_vars = {**filter_bind_vars, "skip": skip, "top": page_size, "return_fields": preview_fields}
     preview_query = f"""
-        FOR doc IN `{coll_name}`
-            {f"FILTER {filter_clause}" if filter_clause else ""}
-            SORT doc._key ASC
+        {loop}
+            {_collection_sort(ranked)}
             LIMIT @skip, @top
             RETURN KEEP(doc, @return_fields)
     """
@@ -6716,33 +7327,100 @@ async def collection_download(request: Request, db_name: str, coll_name: str,
     if not columns:
         columns = ["_key"]
 
+    # Only the exported columns cross the wire, in stream batches, so the server
+    # never materializes the full result.
     export_query = f"""
-        FOR doc IN `{coll_name}`
-            {f"FILTER {filter_clause}" if filter_clause else ""}
-            SORT doc._key ASC
-            RETURN doc
+        {loop}
+            {_collection_sort(ranked)}
+            RETURN KEEP(doc, @export_columns)
     """
-    cursor = db.aql.execute(export_query, bind_vars=filter_bind_vars)
-
-    def generate_csv():
-        buffer = io.StringIO()
-        writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
-        writer.writeheader()
-        yield buffer.getvalue()
-        buffer.seek(0)
-        buffer.truncate(0)
-
-        for doc in cursor:
-            row = {column: _normalize_csv_value(doc.get(column)) for column in columns}
-            writer.writerow(row)
-            yield buffer.getvalue()
-            buffer.seek(0)
-            buffer.truncate(0)
-
-    filename = f"{db_name}_{coll_name}.csv"
+    cursor = db.aql.execute(
+        export_query,
+        bind_vars={**filter_bind_vars, "export_columns": columns},
+        stream=True,
+        batch_size=_COLLECTION_EXPORT_BATCH_SIZE,
+        ttl=600,
+    )
+    return columns, cursor
+
+
+def _next_export_batch(cursor) -> List[dict]:
+    return list(islice(cursor, _COLLECTION_EXPORT_BATCH_SIZE))
+
+
+def _close_export_cursor(cursor):
+    try:
+        cursor.close(ignore_missing=True)
+    except Exception as exc:
+        print(f"Could not close export cursor: {exc}")
+
+
+async def _stream_collection_export(request: Request, cursor, encoder):
+    """Encode cursor batches as they arrive; stops and releases the cursor if the client goes away."""
+    try:
+        while True:
+            if await request.is_disconnected():
+                print("Collection export cancelled: client disconnected.")
+                return
+            docs = await run_in_threadpool(_next_export_batch, cursor)
+            chunk = encoder.encode(docs)
+            if chunk:
+                yield chunk
+            if len(docs) < _COLLECTION_EXPORT_BATCH_SIZE:
+                break
+        chunk = encoder.finish()
+        if chunk:
+            yield chunk
+    finally:
+        _close_export_cursor(cursor)
+
+
+@app.get("/db/{db_name}/collection/{coll_name}/download.{export_format}")
+async def collection_download(request: Request, db_name: str, coll_name: str, export_format: str,
+                              page: int = 1, page_size: int = 25):
+    """Stream every document matching the current facet filters and search as csv, csv.gz or parquet."""
+    if export_format not in _COLLECTION_EXPORT_FORMATS:
+        raise HTTPException(status_code=404, detail=f"Unsupported export format: {export_format}")
+    media_type, extension = _COLLECTION_EXPORT_FORMATS[export_format]
+
+    db = get_db(db_name)
+    facet_metadata = _get_collection_facet_metadata(db, coll_name)
+    search_metadata = _get_collection_search_metadata(db, coll_name)
+    category_fields = sorted(facet_metadata.get("category_fields") or [])
+    search_fields = list(search_metadata.get("text_fields") or [])
+    active_filters = _parse_collection_facet_filters(request, category_fields)
+    search_term = _parse_collection_search_term(request)
+
+    coll = db.collection(coll_name)
+    is_edge = coll.properties().get("type") in ("edge", 3)
+    preview_fields = _get_collection_preview_fields(
+        is_edge=is_edge,
+        facet_metadata=facet_metadata,
+        search_metadata=search_metadata,
+    )
+    columns, cursor = await run_in_threadpool(
+        _open_collection_export,
+        db,
+        coll_name,
+        active_filters,
+        search_fields,
+        search_term,
+        preview_fields,
+        is_edge,
+        max(page, 1),
+        max(page_size, 1),
+        search_metadata.get("search_view"),
+    )
+    try:
+        encoder = _COLLECTION_EXPORT_ENCODERS[export_format](columns)
+    except ImportError as exc:
+        _close_export_cursor(cursor)
+        raise HTTPException(status_code=501, detail=f"{export_format} export needs pyarrow: {exc}") from exc
+
+    filename = f"{db_name}_{coll_name}.{extension}"
     return StreamingResponse(
-        generate_csv(),
-        media_type="text/csv",
+        _stream_collection_export(request, cursor, encoder),
+        media_type=media_type,
         headers={"Content-Disposition": f"attachment; filename={filename}"},
     )
 
@@ -6766,6 +7444,7 @@ def collection_facets(request: Request, db_name: str, coll_name: str, page_size:
         active_filters=active_filters,
         search_fields=search_fields,
         search_term=search_term,
+        search_view=search_metadata.get("search_view"),
     )
     return templates.TemplateResponse(request, "collection_facets.html", {
         "request": request,
@@ -6803,6 +7482,8 @@ def collection_facet(request: Request, db_name: str, coll_name: str, field: str,
         active_filters=active_filters,
         search_fields=search_fields,
         search_term=search_term,
+        category_fields=category_fields,
+        search_view=search_metadata.get("search_view"),
     )
     return templates.TemplateResponse(request, "collection_facet_panel.html", {
         "request": request,
@@ -6821,16 +7502,17 @@ def collection_stats(request: Request, db_name: str, coll_name: str):
     active_filters = _parse_collection_facet_filters(request, category_fields)
     search_term = _parse_collection_search_term(request)
     filter_bind_vars = {}
-    filter_clause = _build_collection_constraints(
-        active_filters=active_filters,
-        search_fields=search_fields,
-        search_term=search_term,
-        bind_vars=filter_bind_vars,
+    loop, _ = _collection_loop(
+        coll_name,
+        active_filters,
+        search_fields,
+        search_term,
+        filter_bind_vars,
+        search_view=search_metadata.get("search_view"),
     )
 
     count_query = f"""
-        FOR doc IN `{coll_name}`
-            {f"FILTER {filter_clause}" if filter_clause else ""}
+        {loop}
             COLLECT WITH COUNT INTO c
             RETURN c
     """
@@ -6841,8 +7523,7 @@ def collection_stats(request: Request, db_name: str, coll_name: str):
 
     # Sample documents to discover fields
     query = f"""
-        FOR doc IN `{coll_name}`
-            {f"FILTER {filter_clause}" if filter_clause else ""}
+        {loop}
             SORT RAND()
             LIMIT @sample_size
             RETURN ATTRIBUTES(doc)
@@ -6870,6 +7551,38 @@ def collection_stats(request: Request, db_name: str, coll_name: str):
     })
 
 
+_PARQUET_STATS_CACHE_SIZE = 64
+_parquet_stats_cache: dict = {}   # (file_ref, etag) -> stats, oldest first
+_parquet_stats_cache_lock = threading.Lock()
+
+
+def _load_parquet_stats(file_ref: str) -> Optional[dict]:
+    """Column stats for a stored parquet file, cached per file ETag so unchanged files are not re-read."""
+    from src.qa_browser.parquet_stats import compute_parquet_stats
+
+    etag = _get_parquet_etag(file_ref)
+    if etag:
+        with _parquet_stats_cache_lock:
+            cached = _parquet_stats_cache.get((file_ref, etag))
+        if cached is not None:
+            return cached
+
+    buf, content_length, etag = _get_parquet_buffer(file_ref)
+    if buf is None:
+        return None
+    stats = {
+        "file_path": file_ref,
+        "file_size_mb": round(content_length / (1024 * 1024), 2),
+        **compute_parquet_stats(buf),
+    }
+    if etag:
+        with _parquet_stats_cache_lock:
+            _parquet_stats_cache[(file_ref, etag)] = stats
+            while len(_parquet_stats_cache) > _PARQUET_STATS_CACHE_SIZE:
+                _parquet_stats_cache.pop(next(iter(_parquet_stats_cache)))
+    return stats
+
+
 @app.get("/db/{db_name}/collection/{coll_name}/doc/{doc_key:path}/parquet-stats", response_class=HTMLResponse)
 async def parquet_stats(request: Request, db_name: str, coll_name: str, doc_key: str):
     """Load parquet file stats for a Dataset document (called via HTMX)."""
@@ -6884,42 +7597,9 @@ async def parquet_stats(request: Request, db_name: str, coll_name: str, doc_key:
         if not file_ref:
             error = "No file_reference found on this document."
         else:
-            import pyarrow.parquet as pq
-            buf, content_length = _get_parquet_buffer(file_ref)
-            if buf is None:
+            stats = await run_in_threadpool(_load_parquet_stats, file_ref)
+            if stats is None:
                 error = f"Could not fetch parquet file: {file_ref}"
-            else:
-                pf = pq.ParquetFile(buf)
-                metadata = pf.metadata
-
-                # Read into pandas for descriptive stats
-                table = pf.read()
-                df = table.to_pandas()
-
-                col_stats = []
-                for col_name in df.columns:
-                    col = df[col_name]
-                    info = {"name": col_name, "dtype": str(col.dtype), "non_null": int(col.count())}
-                    if col.dtype.kind in ("f", "i", "u"):  # numeric
-                        info["min"] = f"{col.min():.4g}"
-                        info["max"] = f"{col.max():.4g}"
-                        info["mean"] = f"{col.mean():.4g}"
-                        info["std"] = f"{col.std():.4g}"
-                    else:
-                        info["unique"] = int(col.nunique())
-                    col_stats.append(info)
-
-                stats = {
-                    "file_path": file_ref,
-                    "file_size_mb": round(content_length / (1024 * 1024), 2),
-                    "num_rows": metadata.num_rows,
-                    "num_columns": metadata.num_columns,
-                    "num_row_groups": metadata.num_row_groups,
-                    "index_name": df.index.name,
-                    "index_count": len(df.index),
-                    "columns": col_stats,
-                    "head": df.head(5).to_html(classes="parquet-table", border=0),
-                }
     except Exception as e:
         error = str(e)
 
@@ -6931,7 +7611,7 @@ async def parquet_stats(request: Request, db_name: str, coll_name: str, doc_key:
 
 
 @app.get("/db/{db_name}/collection/{coll_name}/doc/{doc_key:path}", response_class=HTMLResponse)
-async def document_detail(request: Request, db_name: str, coll_name: str, doc_key: str):
+def document_detail(request: Request, db_name: str, coll_name: str, doc_key: str):
     db = get_db(db_name)
     coll = db.collection(coll_name)
 
@@ -7079,7 +7759,7 @@ async def document_detail(request: Request, db_name: str, coll_name: str, doc_ke
 
 
 @app.get("/db/{db_name}/schema", response_class=HTMLResponse)
-async def schema_view(request: Request, db_name: str):
+def schema_view(request: Request, db_name: str):
     db = get_db(db_name)
     edge_defs = _edge_definitions_with_endpoint_pairs(db)
 
@@ -7111,6 +7791,33 @@ async def schema_view(request: Request, db_name: str):
     })
 
 
+_CONSOLE_QUERY_ID_RE = re.compile(r"^[A-Za-z0-9-]{1,64}$")
+
+
+def _console_query_id(value: str) -> str:
+    """The id the console page submitted with its query, or a fresh one if it is unusable."""
+    return value if _CONSOLE_QUERY_ID_RE.match(value or "") else uuid.uuid4().hex
+
+
+def _aql_console_tag(query_id: str) -> str:
+    return f"qa-browser-console:{query_id}"
+
+
+def _run_aql_console_query(db_name: str, query: str, query_id: str) -> list:
+    db = get_db(db_name)
+    # the comment lets a cancel request find this query among the server's running queries
+    tagged_query = f"/* {_aql_console_tag(query_id)} */\n{query}"
+    return list(db.aql.execute(tagged_query, max_runtime=_CONSOLE_QUERY_TIMEOUT_SECONDS))
+
+
+def _kill_aql_console_query(db_name: str, query_id: str) -> None:
+    db = get_db(db_name)
+    tag = _aql_console_tag(query_id)
+    for running in db.aql.queries():
+        if tag in (running.get("query") or ""):
+            db.aql.kill(running["id"])
+
+
 @app.get("/db/{db_name}/aql", response_class=HTMLResponse)
 async def aql_page(request: Request, db_name: str):
     return templates.TemplateResponse(request, "aql.html", {
@@ -7118,20 +7825,26 @@ async def aql_page(request: Request, db_name: str):
         "db_name": db_name,
         "results": None,
         "query": "",
+        "query_id": uuid.uuid4().hex,
         "error": None,
         "columns": [],
     })
 
 
 @app.post("/db/{db_name}/aql", response_class=HTMLResponse)
-async def aql_execute(request: Request, db_name: str, query: str = Form(...)):
+async def aql_execute(request: Request, db_name: str, query: str = Form(...), query_id: str = Form("")):
     results = None
     error = None
     columns = []
+    query_id = _console_query_id(query_id)
+    console_key = f"aql:{db_name}:{query_id}"
+    _console_queries.register(console_key, lambda: _kill_aql_console_query(db_name, query_id))
     try:
-        db = get_db(db_name)
-        cursor = db.aql.execute(query, max_runtime=60)
-        results = list(cursor)
+        results = await run_until_disconnect(
+            request,
+            lambda: _run_aql_console_query(db_name, query, query_id),
+            on_disconnect=lambda: _console_queries.cancel(console_key),
+        )
         # Auto-detect columns from results
         if results and isinstance(results[0], dict):
             col_set = set()
@@ -7140,6 +7853,9 @@ async def aql_execute(request: Request, db_name: str, query: str = Form(...)):
             columns = sorted(col_set)
     except Exception as e:
         error = str(e)
+    finally:
+        if _console_queries.unregister(console_key):
+            results, columns, error = None, [], "Query cancelled."
 
     htmx = request.headers.get("HX-Request") == "true"
     template = "aql_results.html" if htmx else "aql.html"
@@ -7149,11 +7865,18 @@ async def aql_execute(request: Request, db_name: str, query: str = Form(...)):
         "db_name": db_name,
         "results": results,
         "query": query,
+        "query_id": query_id,
         "error": error,
         "columns": columns,
     })
 
 
+@app.post("/db/{db_name}/aql/cancel", response_class=HTMLResponse)
+async def aql_cancel(db_name: str, query_id: str = Form("")):
+    cancelled = await run_in_threadpool(_console_queries.cancel, f"aql:{db_name}:{query_id}")
+    return HTMLResponse("Cancelling..." if cancelled else "No query running.")
+
+
 # ── MySQL Routes ─────────────────────────────────────────────────────────────
 
 def _mysql_template_context(source_id: str, db_name: str) -> dict:
@@ -7166,7 +7889,7 @@ def _mysql_template_context(source_id: str, db_name: str) -> dict:
 
 
 @app.get("/mysql/{source_id}/{db_name}", response_class=HTMLResponse)
-async def mysql_dashboard(request: Request, source_id: str, db_name: str):
+def mysql_dashboard(request: Request, source_id: str, db_name: str):
     engine = get_mysql_db_engine(db_name, source_id=source_id)
     schema_meta = get_mysql_inspector(db_name, source_id=source_id)
 
@@ -7205,8 +7928,8 @@ async def mysql_dashboard(request: Request, source_id: str, db_name: str):
 
 
 @app.get("/mysql/{source_id}/{db_name}/table/{table_name}", response_class=HTMLResponse)
-async def mysql_table_browser(request: Request, source_id: str, db_name: str, table_name: str,
-                               page: int = 1, page_size: int = 25):
+def mysql_table_browser(request: Request, source_id: str, db_name: str, table_name: str,
+                        page: int = 1, page_size: int = 25):
     engine = get_mysql_db_engine(db_name, source_id=source_id)
     meta = get_mysql_inspector(db_name, source_id=source_id)[table_name]
 
@@ -7256,7 +7979,7 @@ async def mysql_table_browser(request: Request, source_id: str, db_name: str, ta
 
 
 @app.get("/mysql/{source_id}/{db_name}/table/{table_name}/stats", response_class=HTMLResponse)
-async def mysql_table_stats(request: Request, source_id: str, db_name: str, table_name: str):
+def mysql_table_stats(request: Request, source_id: str, db_name: str, table_name: str):
     """Column coverage stats for a MySQL table (loaded via HTMX)."""
     engine = get_mysql_db_engine(db_name, source_id=source_id)
     columns = get_mysql_inspector(db_name, source_id=source_id)[table_name]["columns"]
@@ -7282,7 +8005,7 @@ async def mysql_table_stats(request: Request, source_id: str, db_name: str, tabl
 
 
 @app.get("/mysql/{source_id}/{db_name}/table/{table_name}/row/{pk_value:path}", response_class=HTMLResponse)
-async def mysql_row_detail(request: Request, source_id: str, db_name: str, table_name: str, pk_value: str):
+def mysql_row_detail(request: Request, source_id: str, db_name: str, table_name: str, pk_value: str):
     engine = get_mysql_db_engine(db_name, source_id=source_id)
     meta = get_mysql_inspector(db_name, source_id=source_id)[table_name]
     pk_cols = meta["pk"]
@@ -7336,7 +8059,7 @@ async def mysql_row_detail(request: Request, source_id: str, db_name: str, table
 
 
 @app.get("/mysql/{source_id}/{db_name}/schema", response_class=HTMLResponse)
-async def mysql_schema(request: Request, source_id: str, db_name: str):
+def mysql_schema(request: Request, source_id: str, db_name: str):
     schema_meta = get_mysql_inspector(db_name, source_id=source_id)
 
     fk_defs = []
@@ -7373,12 +8096,46 @@ async def mysql_refresh_schema(request: Request, source_id: str, db_name: str):
     return _redirect_to(f"/mysql/{source_id}/{db_name}", request=request, status_code=303)
 
 
+def _set_mysql_statement_timeout(conn, milliseconds: int) -> None:
+    try:
+        conn.execute(text(f"SET SESSION MAX_EXECUTION_TIME = {int(milliseconds)}"))
+    except Exception as exc:
+        # MariaDB has no MAX_EXECUTION_TIME; the driver read timeout still applies there
+        print(f"Could not set MySQL statement timeout: {exc}")
+
+
+def _run_sql_console_query(db_name: str, source_id: str, query: str, console_key: str) -> tuple[list, list]:
+    engine = get_mysql_db_engine(db_name, source_id=source_id)
+    with engine.connect() as conn:
+        connection_id = conn.execute(text("SELECT CONNECTION_ID()")).scalar()
+        _console_queries.register(
+            console_key,
+            lambda: _kill_mysql_console_query(db_name, source_id, connection_id),
+        )
+        _set_mysql_statement_timeout(conn, _CONSOLE_QUERY_TIMEOUT_SECONDS * 1000)
+        try:
+            result = conn.execute(text(query))
+            if not result.returns_rows:
+                return [], []
+            return list(result.keys()), [dict(row) for row in result.mappings().all()]
+        finally:
+            # pooled connections keep session variables
+            _set_mysql_statement_timeout(conn, 0)
+
+
+def _kill_mysql_console_query(db_name: str, source_id: str, connection_id: int) -> None:
+    engine = get_mysql_db_engine(db_name, source_id=source_id)
+    with engine.connect() as conn:
+        conn.execute(text(f"KILL QUERY {int(connection_id)}"))
+
+
 @app.get("/mysql/{source_id}/{db_name}/sql", response_class=HTMLResponse)
 async def sql_page(request: Request, source_id: str, db_name: str):
     return templates.TemplateResponse(request, "mysql_sql.html", {
         "request": request,
         "results": None,
         "query": "",
+        "query_id": uuid.uuid4().hex,
         "error": None,
         "columns": [],
         **_mysql_template_context(source_id, db_name),
@@ -7386,10 +8143,13 @@ async def sql_page(request: Request, source_id: str, db_name: str):
 
 
 @app.post("/mysql/{source_id}/{db_name}/sql", response_class=HTMLResponse)
-async def sql_execute(request: Request, source_id: str, db_name: str, query: str = Form(...)):
+async def sql_execute(request: Request, source_id: str, db_name: str, query: str = Form(...),
+                      query_id: str = Form("")):
     results = None
     error = None
     columns = []
+    query_id = _console_query_id(query_id)
+    console_key = f"sql:{source_id}:{db_name}:{query_id}"
 
     # Read-only guard
     query_upper = query.strip().upper()
@@ -7398,16 +8158,16 @@ async def sql_execute(request: Request, source_id: str, db_name: str, query: str
         error = "Only SELECT, SHOW, DESCRIBE, and EXPLAIN queries are allowed."
     else:
         try:
-            engine = get_mysql_db_engine(db_name, source_id=source_id)
-            with engine.connect() as conn:
-                result = conn.execute(text(query))
-                if result.returns_rows:
-                    columns = list(result.keys())
-                    results = [dict(row) for row in result.mappings().all()]
-                else:
-                    results = []
+            columns, results = await run_until_disconnect(
+                request,
+                lambda: _run_sql_console_query(db_name, source_id, query, console_key),
+                on_disconnect=lambda: _console_queries.cancel(console_key),
+            )
         except Exception as e:
             error = str(e)
+        finally:
+            if _console_queries.unregister(console_key):
+                results, columns, error = None, [], "Query cancelled."
 
     htmx = request.headers.get("HX-Request") == "true"
     template = "mysql_sql_results.html" if htmx else "mysql_sql.html"
@@ -7416,12 +8176,19 @@ async def sql_execute(request: Request, source_id: str, db_name: str, query: str
         "request": request,
         "results": results,
         "query": query,
+        "query_id": query_id,
         "error": error,
         "columns": columns,
         **_mysql_template_context(source_id, db_name),
     })
 
 
+@app.post("/mysql/{source_id}/{db_name}/sql/cancel", response_class=HTMLResponse)
+async def sql_cancel(source_id: str, db_name: str, query_id: str = Form("")):
+    cancelled = await run_in_threadpool(_console_queries.cancel, f"sql:{source_id}:{db_name}:{query_id}")
+    return HTMLResponse("Cancelling..." if cancelled else "No query running.")
+
+
 @app.get("/mysql/{db_name}", response_class=HTMLResponse)
 async def mysql_dashboard_default(request: Request, db_name: str):
     return _redirect_to(f"/mysql/default/{db_name}", request=request, status_code=307)
@@ -7466,6 +8233,11 @@ async def sql_execute_default(request: Request, db_name: str):
     return _redirect_to(f"/mysql/default/{db_name}/sql", request=request, status_code=307)
 
 
+@app.post("/mysql/{db_name}/sql/cancel", response_class=HTMLResponse)
+async def sql_cancel_default(request: Request, db_name: str):
+    return _redirect_to(f"/mysql/default/{db_name}/sql/cancel", request=request, status_code=307)
+
+
 # ── Helpers ──────────────────────────────────────────────────────────────────
 
 def _discover_columns(docs: list, is_edge: bool) -> list:
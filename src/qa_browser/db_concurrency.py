@@ -0,0 +1,96 @@
+"""Per-backend request limits and cancellable console queries for the QA browser.
+
+Database work runs on the threadpool with the blocking drivers. Requests for a backend
+wait for a slot on an asyncio semaphore first, so a burst against one slow database
+queues without tying up worker threads that other pages need. Console queries register
+a cancel callback that kills them on the server, from a Cancel button or when the
+client goes away.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+
+
+class BackendBusy(Exception):
+    """No slot for the backend became free within the queue timeout."""
+
+    def __init__(self, backend: str) -> None:
+        super().__init__(f"{backend} is busy")
+        self.backend = backend
+
+
+class BackendLimiter:
+    def __init__(self) -> None:
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    @asynccontextmanager
+    async def slot(self, backend: str, limit: int, timeout: float):
+        semaphore = self._semaphores.get(backend)
+        if semaphore is None:
+            semaphore = self._semaphores[backend] = asyncio.Semaphore(limit)
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout)
+        except asyncio.TimeoutError:
+            raise BackendBusy(backend) from None
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+
+class ConsoleQueries:
+    """Cancel callbacks of running console queries, by the query id the page submitted."""
+
+    def __init__(self) -> None:
+        self._cancels: Dict[str, Callable[[], Any]] = {}
+        self._cancelled: set[str] = set()
+        self._lock = threading.Lock()
+
+    def register(self, query_id: str, cancel: Callable[[], Any]) -> None:
+        with self._lock:
+            self._cancels[query_id] = cancel
+            self._cancelled.discard(query_id)
+
+    def unregister(self, query_id: str) -> bool:
+        """Forget the query; True if it was cancelled while running."""
+        with self._lock:
+            self._cancels.pop(query_id, None)
+            if query_id in self._cancelled:
+                self._cancelled.discard(query_id)
+                return True
+            return False
+
+    def cancel(self, query_id: str) -> bool:
+        with self._lock:
+            cancel = self._cancels.pop(query_id, None)
+            if cancel is None:
+                return False
+            self._cancelled.add(query_id)
+        try:
+            cancel()
+        except Exception as exc:
+            # the query may have finished between lookup and kill
+            print(f"Cancelling console query {query_id} failed: {exc}")
+        return True
+
+
+async def run_until_disconnect(request: Request, func: Callable[[], Any],
+                               on_disconnect: Optional[Callable[[], Any]] = None,
+                               poll_seconds: float = 0.5) -> Any:
+    """func() on the threadpool; if the client disconnects first, call on_disconnect()
+    (which should stop the query server-side) and still wait for func to unwind."""
+    task = asyncio.ensure_future(run_in_threadpool(func))
+    while True:
+        done, _ = await asyncio.wait({task}, timeout=poll_seconds)
+        if done:
+            return task.result()
+        if await request.is_disconnected():
+            if on_disconnect is not None:
+                await run_in_threadpool(on_disconnect)
+            return await task
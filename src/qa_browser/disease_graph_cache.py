@@ -0,0 +1,124 @@
+"""Binary caches derived from disease app_graph TSVs: parsed graph data and version diffs.
+
+The cache file holds a small pickled header followed by the pickled payload. The header
+records the format version, the size, mtime and sha256 of every source file, and the
+sha256 of the payload. A reader trusts a source file whose size and mtime still match,
+and rehashes it otherwise, so touching a TSV without changing it keeps the cache valid.
+Payloads are read through a shared read-only mmap and verified before unpickling.
+"""
+from __future__ import annotations
+
+import gc
+import hashlib
+import mmap
+import os
+import pickle
+import threading
+from pathlib import Path
+from typing import Any, Iterable
+
+CACHE_FILE_NAME = ".disease_graph_cache.pickle"
+_HASH_CHUNK = 1 << 20
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _source_key(cache_path: Path, path: Path) -> str:
+    # relative to the cache, so moving the whole release tree keeps caches valid
+    return os.path.relpath(path, cache_path.parent)
+
+
+def source_fingerprints(cache_path: Path, paths: Iterable[Path]) -> dict[str, dict[str, Any]]:
+    """size, mtime_ns and sha256 of each existing source file, keyed by its path relative to the cache."""
+    fingerprints: dict[str, dict[str, Any]] = {}
+    for path in paths:
+        if not path.exists():
+            continue
+        stat = path.stat()
+        fingerprints[_source_key(cache_path, path)] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": _file_sha256(path),
+        }
+    return fingerprints
+
+
+def _sources_unchanged(cache_path: Path, recorded: dict[str, dict[str, Any]], paths: list[Path]) -> bool:
+    present = {_source_key(cache_path, path): path for path in paths if path.exists()}
+    if sorted(present) != sorted(recorded):
+        return False
+    for key, path in present.items():
+        expected = recorded[key]
+        stat = path.stat()
+        if stat.st_size != expected["size"]:
+            return False
+        if stat.st_mtime_ns != expected["mtime_ns"] and _file_sha256(path) != expected["sha256"]:
+            return False
+    return True
+
+
+def _unpickle_without_gc(payload: memoryview) -> Any:
+    # the payload is millions of small dicts; generational collections while they are
+    # created make up most of the load time otherwise
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return pickle.loads(payload)
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def read_cache(cache_path: Path, source_paths: Iterable[Path], format_version: int) -> Any | None:
+    """The cached payload, or None when the cache is missing, stale or corrupt."""
+    source_paths = list(source_paths)
+    try:
+        with open(cache_path, "rb") as fh:
+            header = pickle.load(fh)
+            offset = fh.tell()
+            if header.get("format_version") != format_version:
+                return None
+            if not _sources_unchanged(cache_path, header.get("sources", {}), source_paths):
+                return None
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                payload = memoryview(mapped)[offset:]
+                try:
+                    if hashlib.sha256(payload).hexdigest() != header.get("payload_sha256"):
+                        print(f"Ignoring corrupt disease graph cache {cache_path}")
+                        return None
+                    return _unpickle_without_gc(payload)
+                finally:
+                    payload.release()
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, EOFError, AttributeError, pickle.UnpicklingError) as exc:
+        print(f"Ignoring unreadable disease graph cache {cache_path}: {exc}")
+        return None
+
+
+def write_cache(cache_path: Path, source_paths: Iterable[Path], format_version: int, payload: Any) -> bool:
+    """Atomically replace the cache; returns False when the directory is not writable."""
+    body = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+    header = {
+        "format_version": format_version,
+        "sources": source_fingerprints(cache_path, source_paths),
+        "payload_sha256": hashlib.sha256(body).hexdigest(),
+    }
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "wb") as fh:
+            pickle.dump(header, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            fh.write(body)
+        os.replace(tmp_path, cache_path)
+    except OSError as exc:
+        print(f"Could not write disease graph cache {cache_path}: {exc}")
+        tmp_path.unlink(missing_ok=True)
+        return False
+    return True
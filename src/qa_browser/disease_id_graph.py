@@ -5,6 +5,7 @@ import csv
 import re
 import io
 import json
+import threading
 from difflib import SequenceMatcher
 from collections import Counter, defaultdict
 from pathlib import Path
@@ -12,6 +13,9 @@ from typing import Any
 
 from fastapi import HTTPException
 
+from src.qa_browser.disease_graph_cache import CACHE_FILE_NAME, read_cache, write_cache
+from src.qa_browser.disease_search_index import ConceptSearchIndex, TermNgramIndex
+
 
 class DiseaseGraphData:
     """Indexes built from the four app_graph TSV files."""
@@ -28,6 +32,8 @@ class DiseaseGraphData:
         "_dashboard_stats",
         "_xref_to_pxrefs",
         "_resolver_terms",
+        "_search_index",
+        "_resolver_term_index",
     )
 
     def __init__(self) -> None:
@@ -42,6 +48,8 @@ class DiseaseGraphData:
         self._dashboard_stats: dict | None = None
         self._xref_to_pxrefs: dict[str, set[str]] | None = None
         self._resolver_terms: list[dict[str, Any]] | None = None
+        self._search_index: ConceptSearchIndex | None = None
+        self._resolver_term_index: TermNgramIndex | None = None
 
 
 _singleton: DiseaseGraphData | None = None
@@ -151,10 +159,68 @@ def _pick_edge_decision(decisions: list[dict]) -> dict:
     return decisions[0]
 
 
-def _load_app_graph_data(data_dir: Path) -> DiseaseGraphData:
+_APP_GRAPH_FILES = (
+    "manifest.json",
+    "disease_concepts.tsv",
+    "disease_xref_edges.tsv",
+    "xref_labels.tsv",
+    "review_decisions.tsv",
+    "disease_hierarchy_edges.tsv",
+)
+# Bump when DiseaseGraphData, the search indexes or _resolver_index change shape.
+_GRAPH_CACHE_FORMAT_VERSION = 1
+_GRAPH_CACHE_SLOTS = (
+    "concepts_by_pxref",
+    "concepts_by_ncats_id",
+    "edges_by_pxref",
+    "hierarchy_by_child",
+    "hierarchy_by_parent",
+    "labels_by_xref_id",
+    "decisions_by_pxref",
+    "manifest",
+    "_resolver_terms",
+    "_search_index",
+    "_resolver_term_index",
+)
+
+
+def _load_app_graph_data(data_dir: Path, build_indexes: bool = False) -> DiseaseGraphData:
+    """Parsed app_graph data, from the binary cache beside the TSVs when it is current.
+
+    With build_indexes the search and resolver indexes are built too, and stored in the
+    cache so the next worker start skips them as well.
+    """
     if not data_dir.is_dir():
         raise HTTPException(status_code=500, detail=f"Disease app_graph dir not found: {data_dir}")
 
+    cache_path = data_dir / CACHE_FILE_NAME
+    source_paths = [data_dir / name for name in _APP_GRAPH_FILES]
+    data = DiseaseGraphData()
+    cached = read_cache(cache_path, source_paths, _GRAPH_CACHE_FORMAT_VERSION)
+    if cached is not None:
+        for slot, value in cached.items():
+            setattr(data, slot, value)
+        print(f"Disease graph: loaded binary cache {cache_path}")
+        stale = False
+    else:
+        data = _parse_app_graph_data(data_dir)
+        stale = True
+
+    if build_indexes and (data._search_index is None or data._resolver_term_index is None):
+        _concept_search_index(data)
+        _resolver_term_index(data)
+        stale = True
+    if stale:
+        write_cache(
+            cache_path,
+            source_paths,
+            _GRAPH_CACHE_FORMAT_VERSION,
+            {slot: getattr(data, slot) for slot in _GRAPH_CACHE_SLOTS},
+        )
+    return data
+
+
+def _parse_app_graph_data(data_dir: Path) -> DiseaseGraphData:
     data = DiseaseGraphData()
 
     manifest_path = data_dir / "manifest.json"
@@ -222,7 +288,7 @@ def load_disease_graph_data(data_dir: str | Path) -> DiseaseGraphData:
         return _singleton
 
     data_dir = Path(data_dir)
-    data = _load_app_graph_data(data_dir)
+    data = _load_app_graph_data(data_dir, build_indexes=True)
     _singleton = data
     _print_graph_load("Disease graph", data)
     return data
@@ -1000,7 +1066,12 @@ def _safe_int(value: Any, default: int = 0) -> int:
         return default
 
 
-def _lexical_score(query_norm: str, term_norm: str) -> float:
+def _lexical_score(query_norm: str, term_norm: str, minimum: float = 0.0) -> float:
+    """Lexical similarity in [0, 1].
+
+    Scores below minimum are not computed exactly: the SequenceMatcher ratio is skipped
+    when its quick upper bounds show it cannot reach minimum or beat the token scores.
+    """
     if not query_norm or not term_norm:
         return 0.0
     if query_norm == term_norm:
@@ -1014,7 +1085,6 @@ def _lexical_score(query_norm: str, term_norm: str) -> float:
     token_overlap = len(set(query_tokens) & set(term_tokens))
     containment = token_overlap / max(1, min(len(set(query_tokens)), len(set(term_tokens))))
     jaccard = token_overlap / max(1, len(set(query_tokens) | set(term_tokens)))
-    sequence = SequenceMatcher(None, query_norm, term_norm).ratio()
 
     substring_score = 0.0
     if query_norm in term_norm or term_norm in query_norm:
@@ -1022,7 +1092,12 @@ def _lexical_score(query_norm: str, term_norm: str) -> float:
         longer = max(len(query_tokens), len(term_tokens))
         substring_score = 0.82 + 0.12 * (shorter / max(1, longer))
 
-    return round(max(sequence, containment * 0.96, jaccard * 0.9, substring_score), 4)
+    best = max(containment * 0.96, jaccard * 0.9, substring_score)
+    floor = max(best, minimum)
+    matcher = SequenceMatcher(None, query_norm, term_norm)
+    if matcher.real_quick_ratio() >= floor and matcher.quick_ratio() >= floor:
+        best = max(best, matcher.ratio())
+    return round(best, 4)
 
 
 def _tier_score(tier: str) -> float:
@@ -1165,13 +1240,35 @@ def _resolver_index(data: DiseaseGraphData) -> list[dict[str, Any]]:
     return terms
 
 
+_RESOLVER_ID_FIELDS = {"primary_xref", "ncats_disease_id", "xref_id"}
+_RESOLVER_MIN_LEXICAL = 0.7
+
+
+def _resolver_term_index(data: DiseaseGraphData) -> TermNgramIndex:
+    if data._resolver_term_index is None:
+        data._resolver_term_index = TermNgramIndex(
+            (
+                term["norm"],
+                _normalize_resolver_id(term["term"]).lower() if term["field"] in _RESOLVER_ID_FIELDS else "",
+            )
+            for term in _resolver_index(data)
+        )
+    return data._resolver_term_index
+
+
 def resolve_name_candidates(
     data: DiseaseGraphData,
     query: str,
     limit: int = 10,
     include_obsolete: bool = False,
+    exhaustive: bool = False,
 ) -> dict[str, Any]:
-    """Resolve a free-text disease name or CURIE against harmonized concepts."""
+    """Resolve a free-text disease name or CURIE against harmonized concepts.
+
+    Name queries are only scored against the resolver terms whose lexical score can
+    reach _RESOLVER_MIN_LEXICAL, which gives the same candidates as exhaustive=True,
+    where every term is scored.
+    """
     query = str(query or "").strip()
     query_id = _normalize_resolver_id(query)
     query_norm = _normalize_resolver_text(query_id)
@@ -1199,18 +1296,37 @@ def resolve_name_candidates(
             "obsolete": False,
         }, 1.0)
 
-    for term in _resolver_index(data):
+    terms = _resolver_index(data)
+    if exhaustive:
+        term_positions: Any = range(len(terms))
+    elif id_like_query:
+        term_positions = _resolver_term_index(data).id_matches(query_id.lower())
+    else:
+        # _lexical_score rounds to four places, so keep terms that round up to the cutoff
+        term_positions = _resolver_term_index(data).shortlist(query_norm, minimum=_RESOLVER_MIN_LEXICAL - 0.00005)
+
+    lexical_by_norm: dict[str, float] = {}
+    for position in term_positions:
+        term = terms[position]
         if term.get("obsolete") and not include_obsolete:
             continue
         if id_like_query:
-            if term.get("field") not in {"primary_xref", "ncats_disease_id", "xref_id"}:
+            if term.get("field") not in _RESOLVER_ID_FIELDS:
                 continue
             if _normalize_resolver_id(term.get("term", "")).lower() != query_id.lower():
                 continue
             lexical = 1.0
         else:
-            lexical = 1.0 if query_id == term.get("term") else _lexical_score(query_norm, term.get("norm", ""))
-        if lexical < 0.58:
+            term_norm = term.get("norm", "")
+            if query_id == term.get("term"):
+                lexical = 1.0
+            elif term_norm in lexical_by_norm:
+                lexical = lexical_by_norm[term_norm]
+            else:
+                lexical = lexical_by_norm[term_norm] = _lexical_score(
+                    query_norm, term_norm, minimum=_RESOLVER_MIN_LEXICAL,
+                )
+        if lexical < _RESOLVER_MIN_LEXICAL:
             continue
         pxref = term["pxref"]
         current = candidate_terms.get(pxref)
@@ -1321,7 +1437,6 @@ def _match_filters(
     concept: dict,
     data: DiseaseGraphData,
     *,
-    q_lower: str = "",
     filter_mode: str = "all",
     confidence_tier: str = "",
     is_rare: str = "",
@@ -1329,19 +1444,13 @@ def _match_filters(
     quality: str = "",
     disease_type: str = "",
 ) -> bool:
-    """Return True if the concept passes all filter criteria."""
+    """Return True if the concept passes all filter criteria (text queries go through _search_candidates)."""
     # Flagged filter
     if filter_mode == "flagged":
         decisions = data.decisions_by_pxref.get(pxref, [])
         if not _is_flagged(concept, decisions):
             return False
 
-    # Text search
-    if q_lower:
-        name = concept.get("standard_name", "").lower()
-        if q_lower not in pxref.lower() and q_lower not in name:
-            return False
-
     # Confidence tier
     if confidence_tier:
         if concept.get("confidence_tier", "").lower() != confidence_tier.lower():
@@ -1384,6 +1493,26 @@ def _match_filters(
     return True
 
 
+def _concept_search_index(data: DiseaseGraphData) -> ConceptSearchIndex:
+    if data._search_index is not None:
+        return data._search_index
+
+    index = ConceptSearchIndex()
+    for pxref, concept in data.concepts_by_pxref.items():
+        exact_ids = [pxref, concept.get("ncats_disease_id", "")]
+        exact_ids.extend(edge.get("xref_id", "") for edge in data.edges_by_pxref.get(pxref, []))
+        index.add(pxref, (pxref, concept.get("standard_name", "")), exact_ids)
+    data._search_index = index.finalize()
+    return data._search_index
+
+
+def _search_candidates(data: DiseaseGraphData, q: str):
+    """(pxref, concept) pairs matching the text query q, ranked; every concept when q is blank."""
+    if not q.strip():
+        return data.concepts_by_pxref.items()
+    return [(pxref, data.concepts_by_pxref[pxref]) for pxref in _concept_search_index(data).search(q)]
+
+
 def search_concepts(
     data: DiseaseGraphData,
     q: str = "",
@@ -1397,13 +1526,12 @@ def search_concepts(
     disease_type: str = "",
 ) -> dict[str, Any]:
     """Search concepts with pagination and optional filters."""
-    q_lower = q.strip().lower()
     matches: list[tuple[str, dict]] = []
 
-    for pxref, concept in data.concepts_by_pxref.items():
+    for pxref, concept in _search_candidates(data, q):
         if not _match_filters(
             pxref, concept, data,
-            q_lower=q_lower, filter_mode=filter_mode,
+            filter_mode=filter_mode,
             confidence_tier=confidence_tier, is_rare=is_rare,
             source=source, quality=quality,
             disease_type=disease_type,
@@ -1437,7 +1565,6 @@ def export_search_tsv(
     limit: int = 10_000,
 ) -> str:
     """Export search results as a TSV string (no pagination, capped at *limit* rows)."""
-    q_lower = q.strip().lower()
     columns = [
         "primary_xref", "standard_name", "confidence_tier",
         "confidence_tier_original", "needs_review_auto_cleared",
@@ -1451,15 +1578,11 @@ def export_search_tsv(
     writer.writeheader()
 
     count = 0
-    for pxref, concept in data.concepts_by_pxref.items():
+    for pxref, concept in _search_candidates(data, q):
         if filter_mode == "flagged":
             decisions = data.decisions_by_pxref.get(pxref, [])
             if not _is_flagged(concept, decisions):
                 continue
-        if q_lower:
-            name = concept.get("standard_name", "").lower()
-            if q_lower not in pxref.lower() and q_lower not in name:
-                continue
         writer.writerow(_concept_to_row(pxref, concept, data))
         count += 1
         if count >= limit:
@@ -1524,16 +1647,15 @@ def export_filtered_download(
     requested_edge_cols = [c for c in use_columns if c in _XREF_EDGE_COLUMNS]
     edge_mode = len(requested_edge_cols) > 0
 
-    q_lower = q.strip().lower()
     buf = io.StringIO()
     writer = csv.DictWriter(buf, fieldnames=use_columns, delimiter=delimiter, extrasaction="ignore")
     writer.writeheader()
 
     count = 0
-    for pxref, concept in data.concepts_by_pxref.items():
+    for pxref, concept in _search_candidates(data, q):
         if not _match_filters(
             pxref, concept, data,
-            q_lower=q_lower, filter_mode=filter_mode,
+            filter_mode=filter_mode,
             confidence_tier=confidence_tier, is_rare=is_rare,
             source=source, quality=quality,
             disease_type=disease_type,
@@ -1946,6 +2068,66 @@ def load_baseline_data(baseline_dir: str | Path) -> DiseaseGraphData:
     return load_version_data(baseline_dir)
 
 
+_VERSION_DIFF_FORMAT_VERSION = 1
+_version_diff_locks: dict[str, threading.Lock] = {}
+_version_diff_locks_guard = threading.Lock()
+
+
+def version_diff_cache_path(current_dir: Path, from_version: str, to_version: str) -> Path:
+    """Where the diff between two releases is stored: beside the newer release's TSVs."""
+    name = f"{_graph_id_part(from_version)}__{_graph_id_part(to_version)}.pickle"
+    return Path(current_dir) / ".disease_version_diffs" / name
+
+
+def load_full_version_diff(
+    baseline_dir: str | Path,
+    current_dir: str | Path,
+    from_version: str,
+    to_version: str,
+) -> dict[str, Any]:
+    """Full diff between two releases, computed once and then read back from disk.
+
+    The stored diff records fingerprints of both releases' TSVs and is recomputed when
+    either changes. Releases loaded only to compute the diff are not kept in memory.
+    """
+    baseline_dir, current_dir = Path(baseline_dir), Path(current_dir)
+    cache_path = version_diff_cache_path(current_dir, from_version, to_version)
+    source_paths = [d / name for d in (baseline_dir, current_dir) for name in _APP_GRAPH_FILES]
+    with _version_diff_locks_guard:
+        lock = _version_diff_locks.setdefault(str(cache_path), threading.Lock())
+    with lock:
+        diff = read_cache(cache_path, source_paths, _VERSION_DIFF_FORMAT_VERSION)
+        if diff is not None:
+            return diff
+        print(f"Computing disease version diff {from_version} -> {to_version}")
+        baseline = _load_app_graph_data(baseline_dir)
+        diff = compute_full_version_diff(_load_app_graph_data(current_dir), baseline)
+        write_cache(cache_path, source_paths, _VERSION_DIFF_FORMAT_VERSION, diff)
+        return diff
+
+
+def page_version_diff(diff: dict[str, Any], section: str, page: int = 1, per_page: int = 500) -> dict[str, Any]:
+    """One page of a version diff's row list, e.g. every tier change past the first 500."""
+    if section not in VERSION_DIFF_SECTIONS:
+        raise HTTPException(status_code=400, detail=f"Unknown version diff section: {section}")
+    rows = diff[section]
+    per_page = max(1, min(per_page, 5000))
+    total = len(rows)
+    total_pages = max(1, (total + per_page - 1) // per_page)
+    page = max(1, min(page, total_pages))
+    start = (page - 1) * per_page
+    return {
+        "rows": rows[start : start + per_page],
+        "total": total,
+        "page": page,
+        "per_page": per_page,
+        "total_pages": total_pages,
+        "section": section,
+        "baseline_version": diff["baseline_version"],
+        "current_version": diff["current_version"],
+    }
+
+
 def _concept_biolink_category(concept: dict) -> str:
     return concept.get("disease_type", "").strip() or "unknown"
 
@@ -1989,11 +2171,39 @@ def _xref_edge_key(pxref: str, edge: dict) -> tuple[str, str, str]:
     )
 
 
+# Row lists in a version diff, with how many rows compute_version_diff returns inline.
+VERSION_DIFF_SECTIONS = {
+    "added_concepts": 500,
+    "removed_concepts": 500,
+    "legacy_source_only_rows": 200,
+    "other_removed_rows": 200,
+    "tier_changes": 500,
+    "quality_changes": 500,
+    "disease_type_changes": 500,
+}
+
+
 def compute_version_diff(
     current: DiseaseGraphData,
     baseline: DiseaseGraphData,
 ) -> dict[str, Any]:
     """Compute delta between two versioned datasets."""
+    return truncate_version_diff(compute_full_version_diff(current, baseline))
+
+
+def truncate_version_diff(diff: dict[str, Any]) -> dict[str, Any]:
+    """The diff with each row list cut to its inline limit, as the version-diff API returns it."""
+    truncated = dict(diff)
+    for section, limit in VERSION_DIFF_SECTIONS.items():
+        truncated[section] = diff[section][:limit]
+    return truncated
+
+
+def compute_full_version_diff(
+    current: DiseaseGraphData,
+    baseline: DiseaseGraphData,
+) -> dict[str, Any]:
+    """Delta between two versioned datasets, with every changed row rather than the first few hundred."""
     current_pxrefs = set(current.concepts_by_pxref.keys())
     baseline_pxrefs = set(baseline.concepts_by_pxref.keys())
 
@@ -2084,7 +2294,7 @@ def compute_version_diff(
             "standard_name": current.concepts_by_pxref[p].get("standard_name", ""),
             "disease_type": _concept_biolink_category(current.concepts_by_pxref[p]),
         }
-        for p in sorted(added_pxrefs)[:500]
+        for p in sorted(added_pxrefs)
     ]
     # Build reverse index: xref_id → set of current primary_xrefs
     current_xref_owners: dict[str, set[str]] = defaultdict(set)
@@ -2209,12 +2419,12 @@ def compute_version_diff(
             "source_namespaces_removed": sum(1 for ns, count in baseline_ns_dist.items() if count and not current_ns_dist.get(ns)),
         },
         "added_concepts": added_concepts,
-        "removed_concepts": removed_concepts[:500],
-        "legacy_source_only_rows": legacy_source_only_rows[:200],
-        "other_removed_rows": other_removed_rows[:200],
-        "tier_changes": tier_changes[:500],
-        "quality_changes": quality_changes[:500],
-        "disease_type_changes": disease_type_changes[:500],
+        "removed_concepts": removed_concepts,
+        "legacy_source_only_rows": legacy_source_only_rows,
+        "other_removed_rows": other_removed_rows,
+        "tier_changes": sorted(tier_changes, key=lambda row: row["primary_xref"]),
+        "quality_changes": sorted(quality_changes, key=lambda row: row["primary_xref"]),
+        "disease_type_changes": sorted(disease_type_changes, key=lambda row: row["primary_xref"]),
         "biolink_category_distribution": {
             "baseline": dict(baseline_type_dist.most_common()),
             "current": dict(current_type_dist.most_common()),
@@ -0,0 +1,262 @@
+"""Inverted indexes over disease concepts for the disease QA search endpoints."""
+from __future__ import annotations
+
+import re
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Iterable
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_NORM_ALPHABET = "abcdefghijklmnopqrstuvwxyz0123456789 "
+_CHAR_COLUMNS = np.full(256, len(_NORM_ALPHABET), dtype=np.int64)
+_CHAR_COLUMNS[np.frombuffer(_NORM_ALPHABET.encode("ascii"), dtype=np.uint8)] = np.arange(len(_NORM_ALPHABET))
+
+
+def _postings(values: Iterable[int] = ()) -> array:
+    return array("i", values)
+
+
+def _trigrams(text: str) -> set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _tokens(text: str) -> list[str]:
+    return _TOKEN_RE.findall(text)
+
+
+def _intersect(lists: list[array]) -> list[int]:
+    if not lists:
+        return []
+    lists = sorted(lists, key=len)
+    result = set(lists[0])
+    for postings in lists[1:]:
+        result.intersection_update(postings)
+        if not result:
+            break
+    return sorted(result)
+
+
+class ConceptSearchIndex:
+    """Trigram, token-prefix and exact-id postings for concept search.
+
+    Concepts are numbered in the order they are added, and every posting list is kept
+    ascending, so merged results come back in load order -- the order the old linear
+    scan produced.
+    """
+
+    def __init__(self) -> None:
+        self.keys: list[str] = []
+        self._fields: list[tuple[str, ...]] = []
+        self._trigram_postings: dict[str, array] = defaultdict(_postings)
+        self._token_postings: dict[str, array] = defaultdict(_postings)
+        self._exact_ids: dict[str, array] = defaultdict(_postings)
+        self._sorted_tokens: list[str] = []
+
+    def add(self, key: str, fields: Iterable[str], exact_ids: Iterable[str] = ()) -> None:
+        position = len(self.keys)
+        self.keys.append(key)
+        lowered = tuple(str(field or "").lower() for field in fields)
+        self._fields.append(lowered)
+
+        trigrams: set[str] = set()
+        tokens: set[str] = set()
+        for field in lowered:
+            trigrams.update(_trigrams(field))
+            tokens.update(_tokens(field))
+        for trigram in trigrams:
+            self._trigram_postings[trigram].append(position)
+        for token in tokens:
+            self._token_postings[token].append(position)
+        for exact_id in {str(value or "").strip().lower() for value in exact_ids} - {""}:
+            self._exact_ids[exact_id].append(position)
+
+    def finalize(self) -> "ConceptSearchIndex":
+        self._trigram_postings = dict(self._trigram_postings)
+        self._token_postings = dict(self._token_postings)
+        self._exact_ids = dict(self._exact_ids)
+        self._sorted_tokens = sorted(self._token_postings)
+        return self
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def substring_matches(self, q_lower: str) -> list[int]:
+        """Concepts where q_lower is a substring of any indexed field (the original search rule)."""
+        if len(q_lower) >= 3:
+            postings = [self._trigram_postings.get(trigram) for trigram in _trigrams(q_lower)]
+            if any(p is None for p in postings):
+                return []
+            candidates: Iterable[int] = _intersect(postings)
+        else:
+            # one or two characters match most of the vocabulary anyway
+            candidates = range(len(self.keys))
+        return [
+            position for position in candidates
+            if any(q_lower in field for field in self._fields[position])
+        ]
+
+    def prefix_postings(self, prefix: str) -> set[int]:
+        matches: set[int] = set()
+        tokens = self._sorted_tokens
+        for i in range(bisect_left(tokens, prefix), len(tokens)):
+            if not tokens[i].startswith(prefix):
+                break
+            matches.update(self._token_postings[tokens[i]])
+        return matches
+
+    def token_matches(self, q_lower: str) -> list[int]:
+        """Concepts where every query token is a prefix of some indexed token."""
+        query_tokens = _tokens(q_lower)
+        if not query_tokens:
+            return []
+        result: set[int] | None = None
+        for token in sorted(set(query_tokens), key=len, reverse=True):
+            matches = self.prefix_postings(token)
+            result = matches if result is None else result & matches
+            if not result:
+                return []
+        return sorted(result)
+
+    def exact_id_matches(self, q_lower: str) -> list[int]:
+        return list(self._exact_ids.get(q_lower, ()))
+
+    def search(self, q: str) -> list[str]:
+        """Keys matching q, ranked: substring matches first, in load order, exactly as the
+        linear scan returned them; then exact-id hits on other ids (e.g. xrefs); then
+        concepts matching all query tokens by prefix."""
+        q_lower = q.strip().lower()
+        if not q_lower:
+            return list(self.keys)
+        ranked: list[int] = []
+        seen: set[int] = set()
+        for tier in (self.substring_matches(q_lower), self.exact_id_matches(q_lower), self.token_matches(q_lower)):
+            for position in tier:
+                if position not in seen:
+                    seen.add(position)
+                    ranked.append(position)
+        return [self.keys[position] for position in ranked]
+
+
+def _padded_trigrams(norm: str) -> set[str]:
+    return _trigrams(f" {norm} ")
+
+
+class TermNgramIndex:
+    """Postings over normalized resolver terms, for fuzzy name lookup.
+
+    Scoring every term with a SequenceMatcher is too slow for bulk requests, so
+    shortlist() narrows the vocabulary to the distinct norms whose lexical score can
+    still reach the caller's minimum. Each part of the lexical score has a cheap exact
+    test or upper bound: token containment and Jaccard come straight from the token
+    postings, substring matches from the trigram postings, and the SequenceMatcher
+    ratio is bounded by the length and character-count ratios (difflib's
+    real_quick_ratio and quick_ratio), computed for the whole vocabulary at once.
+    Nothing the exhaustive scorer would keep at that minimum is left out.
+    """
+
+    def __init__(self, terms: Iterable[tuple[str, str]]) -> None:
+        """terms are (norm, id_key) pairs in resolver-term order; id_key is "" for non-id terms."""
+        norm_ids: dict[str, int] = {}
+        self._norms: list[str] = []
+        self._norm_terms: list[array] = []
+        norm_token_counts = _postings()
+        trigram_postings: dict[str, array] = defaultdict(_postings)
+        token_postings: dict[str, array] = defaultdict(_postings)
+        ids: dict[str, array] = defaultdict(_postings)
+        for position, (norm, id_key) in enumerate(terms):
+            norm_id = norm_ids.get(norm)
+            if norm_id is None:
+                norm_id = norm_ids[norm] = len(self._norms)
+                self._norms.append(norm)
+                self._norm_terms.append(_postings())
+                for trigram in _padded_trigrams(norm):
+                    trigram_postings[trigram].append(norm_id)
+                tokens = set(norm.split())
+                norm_token_counts.append(len(tokens))
+                for token in tokens:
+                    token_postings[token].append(norm_id)
+            self._norm_terms[norm_id].append(position)
+            if id_key:
+                ids[id_key].append(position)
+        self._norm_ids = norm_ids
+        self._trigram_postings = dict(trigram_postings)
+        self._token_postings = dict(token_postings)
+        self._ids = dict(ids)
+        self._norm_token_counts = np.array(norm_token_counts, dtype=np.int64)
+        self._norm_lengths = np.array([len(norm) for norm in self._norms], dtype=np.int64)
+        self._max_norm_length = int(self._norm_lengths.max()) if self._norms else 0
+        self._char_counts = _char_count_matrix(self._norms)
+
+    def id_matches(self, id_key: str) -> list[int]:
+        return list(self._ids.get(id_key, ()))
+
+    def shortlist(self, query_norm: str, minimum: float) -> list[int]:
+        """Ascending term positions of every norm whose lexical score against query_norm can reach minimum."""
+        selected = self._ratio_matches(query_norm, minimum)
+        selected[self._token_matches(query_norm, minimum)] = True
+        selected[self._substring_matches(query_norm)] = True
+        positions: set[int] = set()
+        for norm_id in np.flatnonzero(selected):
+            positions.update(self._norm_terms[norm_id])
+        return sorted(positions)
+
+    def _ratio_matches(self, query_norm: str, minimum: float) -> np.ndarray:
+        """Norms whose SequenceMatcher ratio upper bounds both reach minimum."""
+        lengths = self._norm_lengths
+        total = lengths + len(query_norm)
+        selected = 2.0 * np.minimum(lengths, len(query_norm)) / total >= minimum
+        query_counts = np.minimum(_char_count_matrix([query_norm]), self._max_norm_length)
+        shared = np.minimum(self._char_counts[selected], query_counts.astype(self._char_counts.dtype)).sum(axis=1)
+        selected[selected] = 2.0 * shared / total[selected] >= minimum
+        return selected
+
+    def _token_matches(self, query_norm: str, minimum: float) -> np.ndarray:
+        """Norm ids whose token containment or Jaccard score alone reaches minimum."""
+        query_tokens = set(query_norm.split())
+        postings = [self._token_postings[token] for token in query_tokens if token in self._token_postings]
+        if not postings:
+            return np.zeros(0, dtype=np.int64)
+        shared = np.bincount(
+            np.concatenate([np.frombuffer(posting, dtype=np.intc) for posting in postings]),
+            minlength=len(self._norms),
+        )
+        token_counts = self._norm_token_counts
+        containment = shared / np.maximum(1, np.minimum(len(query_tokens), token_counts))
+        jaccard = shared / np.maximum(1, len(query_tokens) + token_counts - shared)
+        return np.flatnonzero((shared > 0) & ((containment * 0.96 >= minimum) | (jaccard * 0.9 >= minimum)))
+
+    def _substring_matches(self, query_norm: str) -> list[int]:
+        """Norm ids that contain query_norm or are contained in it."""
+        norms = self._norms
+        if len(query_norm) >= 3:
+            postings = [self._trigram_postings.get(trigram) for trigram in _trigrams(query_norm)]
+            candidates: Iterable[int] = () if any(p is None for p in postings) else min(postings, key=len)
+        else:
+            candidates = range(len(norms))
+        matches = [norm_id for norm_id in candidates if query_norm in norms[norm_id]]
+        norm_ids = self._norm_ids
+        for start in range(len(query_norm)):
+            for end in range(start + 1, min(len(query_norm), start + self._max_norm_length) + 1):
+                norm_id = norm_ids.get(query_norm[start:end])
+                if norm_id is not None:
+                    matches.append(norm_id)
+        return matches
+
+
+def _char_count_matrix(norms: list[str]) -> np.ndarray:
+    """Per-norm counts of each character, one row per norm.
+
+    Resolver norms are lowercase ASCII letters, digits and spaces; anything else lands
+    in one shared column, which can only overstate the overlap between two norms.
+    """
+    encoded = [norm.encode("ascii", "replace") for norm in norms]
+    lengths = np.array([len(value) for value in encoded], dtype=np.int64)
+    columns = _CHAR_COLUMNS[np.frombuffer(b"".join(encoded), dtype=np.uint8)]
+    rows = np.repeat(np.arange(len(norms), dtype=np.int64), lengths)
+    width = len(_NORM_ALPHABET) + 1
+    counts = np.bincount(rows * width + columns, minlength=len(norms) * width).reshape(len(norms), width)
+    return counts.astype(np.min_scalar_type(int(lengths.max(initial=0))))
+
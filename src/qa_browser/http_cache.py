@@ -0,0 +1,136 @@
+"""Conditional GET support for QA browser pages backed by build-time data.
+
+A validator identifies the data behind a response -- the Arango build run, the disease
+release files, the cached MySQL schema -- and becomes a weak ETag plus, when known, a
+Last-Modified date. Requests presenting a current validator get 304 Not Modified
+without running the route, and rendered bodies can be kept in a byte-bounded LRU keyed
+by URL and validator so repeat views skip the database as well.
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Callable, Iterable, Mapping, Optional
+
+from starlette.responses import Response
+
+
+@dataclass(frozen=True)
+class Validator:
+    etag: str
+    last_modified: Optional[datetime] = None
+
+
+def make_validator(parts: Iterable[Any], last_modified: Optional[datetime] = None) -> Validator:
+    """Weak ETag over repr(parts); the representation may differ byte-wise (templates, gzip)."""
+    digest = hashlib.sha256(repr(tuple(parts)).encode("utf-8")).hexdigest()[:24]
+    if last_modified is not None:
+        last_modified = last_modified.astimezone(timezone.utc).replace(microsecond=0)
+    return Validator(etag=f'W/"{digest}"', last_modified=last_modified)
+
+
+def _opaque_tag(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    wanted = _opaque_tag(etag)
+    return any(
+        candidate.strip() == "*" or _opaque_tag(candidate) == wanted
+        for candidate in if_none_match.split(",")
+    )
+
+
+def is_not_modified(headers: Mapping[str, str], validator: Validator) -> bool:
+    """RFC 9110 evaluation: If-None-Match wins; If-Modified-Since is only read without it."""
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, validator.etag)
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since and validator.last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return validator.last_modified <= since
+    return False
+
+
+def validator_headers(validator: Validator) -> dict[str, str]:
+    # no-cache: browsers keep the page but revalidate on every navigation
+    headers = {"ETag": validator.etag, "Cache-Control": "no-cache"}
+    if validator.last_modified is not None:
+        headers["Last-Modified"] = format_datetime(validator.last_modified, usegmt=True)
+    return headers
+
+
+def not_modified_response(validator: Validator, vary: Optional[str] = None) -> Response:
+    headers = validator_headers(validator)
+    if vary:
+        headers["Vary"] = vary
+    return Response(status_code=304, headers=headers)
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    headers: list[tuple[str, str]] = field(default_factory=list)
+
+    def to_response(self) -> Response:
+        response = Response(content=self.body, status_code=200)
+        response.raw_headers = [(k.encode("latin-1"), v.encode("latin-1")) for k, v in self.headers]
+        return response
+
+
+class ResponseCache:
+    """LRU of rendered 200 responses, evicting oldest entries past max_bytes of body."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Any, CachedResponse] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: Any, entry: CachedResponse) -> None:
+        size = len(entry.body)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous.body)
+            self._entries[key] = entry
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.body)
+
+    def discard_where(self, predicate: Callable[[Any], bool]) -> int:
+        """Drop the entries whose key satisfies predicate; returns how many were dropped."""
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                self._bytes -= len(self._entries.pop(key).body)
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,152 @@
+"""Column statistics for parquet files, computed with pyarrow over record batches.
+
+Matches the figures the parquet stats page used to get from pandas: numeric columns
+report min/max/mean/std (NaN skipped, sample std), every other column the number of
+distinct non-null values. Columns are read one at a time in record batches, and integer
+min/max come from the row-group statistics in the footer when every row group has them.
+"""
+from __future__ import annotations
+
+import math
+from typing import Any
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+_BATCH_SIZE = 65536
+
+
+def _is_numeric(arrow_type: pa.DataType) -> bool:
+    return pa.types.is_integer(arrow_type) or pa.types.is_floating(arrow_type)
+
+
+class _NumericAccumulator:
+    """Count, mean and M2 merged batch by batch (Chan et al.), so std needs no second pass."""
+
+    def __init__(self, is_float: bool) -> None:
+        self.is_float = is_float
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.minimum = None
+        self.maximum = None
+
+    def add(self, values: pa.Array, with_min_max: bool) -> None:
+        if self.is_float:
+            values = pc.drop_null(pc.if_else(pc.is_nan(values), None, values))
+        else:
+            values = pc.drop_null(values)
+        n = len(values)
+        if not n:
+            return
+        if with_min_max:
+            bounds = pc.min_max(values)
+            low, high = bounds["min"].as_py(), bounds["max"].as_py()
+            self.minimum = low if self.minimum is None else min(self.minimum, low)
+            self.maximum = high if self.maximum is None else max(self.maximum, high)
+        doubles = values.cast(pa.float64())
+        batch_mean = pc.mean(doubles).as_py()
+        batch_m2 = pc.variance(doubles, ddof=0).as_py() * n
+        total = self.count + n
+        delta = batch_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += batch_m2 + delta * delta * self.count * n / total
+        self.count = total
+
+    def std(self) -> float:
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else float("nan")
+
+
+def _footer_min_max(metadata: pq.FileMetaData, column_index: int) -> tuple[Any, Any] | None:
+    """Min/max over all row groups from footer statistics, or None if any row group lacks them."""
+    low = high = None
+    for row_group in range(metadata.num_row_groups):
+        statistics = metadata.row_group(row_group).column(column_index).statistics
+        if statistics is None or not statistics.has_min_max:
+            return None
+        low = statistics.min if low is None else min(low, statistics.min)
+        high = statistics.max if high is None else max(high, statistics.max)
+    return low, high
+
+
+def _index_name(schema: pa.Schema) -> tuple[str | None, list[str]]:
+    """pandas index name and the columns that store the index (not reported as data columns)."""
+    pandas_metadata = schema.pandas_metadata or {}
+    index_columns = pandas_metadata.get("index_columns") or []
+    if not index_columns:
+        return None, []
+    first = index_columns[0]
+    if isinstance(first, dict):
+        return first.get("name"), []
+    stored = [column for column in index_columns if isinstance(column, str)]
+    names = {column.get("field_name"): column.get("name") for column in pandas_metadata.get("columns") or []}
+    return names.get(first), stored
+
+
+def _head_column(parquet_file: pq.ParquetFile, field: pa.Field, rows: int) -> pa.Array:
+    batch = next(parquet_file.iter_batches(batch_size=rows, columns=[field.name]), None)
+    return batch.column(0) if batch is not None else pa.array([], type=field.type)
+
+
+def compute_parquet_stats(source: Any, head_rows: int = 5) -> dict[str, Any]:
+    """num_rows/num_columns/num_row_groups, index details, per-column stats and an HTML head."""
+    parquet_file = pq.ParquetFile(source)
+    metadata = parquet_file.metadata
+    schema = parquet_file.schema_arrow
+    index_name, index_columns = _index_name(schema)
+    leaf_index = {name: i for i, name in enumerate(parquet_file.schema.names)}
+
+    data_fields = [field for field in schema if field.name not in index_columns]
+    numeric: dict[str, _NumericAccumulator] = {}
+    footer_bounds: dict[str, tuple[Any, Any]] = {}
+    for field in data_fields:
+        if _is_numeric(field.type):
+            numeric[field.name] = _NumericAccumulator(pa.types.is_floating(field.type))
+            bounds = _footer_min_max(metadata, leaf_index[field.name]) if field.name in leaf_index else None
+            if bounds is not None and not pa.types.is_floating(field.type):
+                # float footers may carry NaN bounds from other writers; recompute those
+                footer_bounds[field.name] = bounds
+    columns = []
+    for field in data_fields:
+        # one column at a time: a batch still decodes a whole row group, so reading every
+        # column together would hold row_group_rows x num_columns values at once
+        info: dict[str, Any] = {"name": field.name, "dtype": str(field.type), "non_null": 0}
+        accumulator = numeric.get(field.name)
+        distinct: list[pa.Array] = []
+        for batch in parquet_file.iter_batches(batch_size=_BATCH_SIZE, columns=[field.name]):
+            column = batch.column(0)
+            if accumulator is not None:
+                accumulator.add(column, with_min_max=field.name not in footer_bounds)
+            else:
+                valid = pc.drop_null(column)
+                info["non_null"] += len(valid)
+                distinct.append(pc.unique(valid))
+
+        if accumulator is not None:
+            info["non_null"] = accumulator.count
+            low, high = footer_bounds.get(field.name, (accumulator.minimum, accumulator.maximum))
+            if accumulator.count:
+                info["min"] = f"{low:.4g}"
+                info["max"] = f"{high:.4g}"
+                info["mean"] = f"{accumulator.mean:.4g}"
+            else:
+                info["min"] = info["max"] = info["mean"] = "nan"
+            info["std"] = f"{accumulator.std():.4g}"
+        else:
+            info["unique"] = len(pc.unique(pa.chunked_array(distinct, type=field.type))) if distinct else 0
+        columns.append(info)
+
+    head = pa.Table.from_arrays(
+        [_head_column(parquet_file, field, head_rows) for field in schema],
+        schema=schema,
+    )
+    return {
+        "num_rows": metadata.num_rows,
+        "num_columns": metadata.num_columns,
+        "num_row_groups": metadata.num_row_groups,
+        "index_name": index_name,
+        "index_count": metadata.num_rows,
+        "columns": columns,
+        "head": head.to_pandas().to_html(classes="parquet-table", border=0),
+    }
@@ -0,0 +1,68 @@
+from pathlib import Path
+from typing import List
+
+from src.id_resolvers.disease_resolver import DiseaseIdResolver
+from src.registry.fetchers import ArtifactFile, DerivedArtifact, DerivedArtifactBuilder, ResolvedDependency
+
+
+TARGET_GRAPH_SOURCE = "target_graph"
+DISEASE_IDS_DATASET = "disease_ids"
+DISEASE_RESOLVER_INDEX_DATASET = "disease_resolver_index"
+
+
+def _require_dependency(
+    dependencies: List[ResolvedDependency],
+    *,
+    source: str,
+    dataset: str,
+) -> ResolvedDependency:
+    matches = [
+        dependency
+        for dependency in dependencies
+        if dependency.source == source and dependency.dataset == dataset
+    ]
+    if not matches:
+        raise LookupError(f"Missing derived artifact dependency {source}/{dataset}")
+    if len(matches) > 1:
+        raise ValueError(f"Multiple derived artifact dependencies match {source}/{dataset}")
+    return matches[0]
+
+
+class DiseaseResolverIndexBuilder(DerivedArtifactBuilder):
+    source = TARGET_GRAPH_SOURCE
+    dataset = DISEASE_RESOLVER_INDEX_DATASET
+
+    def build(
+        self,
+        *,
+        config: dict,
+        dependencies: List[ResolvedDependency],
+        dest: Path,
+        version: str,
+    ) -> DerivedArtifact:
+        dependency = _require_dependency(dependencies, source=TARGET_GRAPH_SOURCE, dataset=DISEASE_IDS_DATASET)
+        output_path = dest / (config.get("output") or {}).get("file_name", DiseaseIdResolver.index_file_name)
+        print(f"Building disease resolver index -> {output_path}", flush=True)
+        stats = DiseaseIdResolver.build_index_file(str(dependency.file(DiseaseIdResolver.source_file_name)), output_path)
+        print(
+            f"Wrote {stats['match_rows']:,} match rows and {stats['equivalent_id_rows']:,} equivalent id rows",
+            flush=True,
+        )
+        return DerivedArtifact(
+            source=self.source,
+            dataset=self.dataset,
+            version=version,
+            version_date=dependency.manifest.get("version_date") or dependency.version,
+            derived_from=[
+                {
+                    "snapshot_id": dependency.snapshot_id,
+                    "manifest_uri": dependency.manifest_uri,
+                }
+            ],
+            transform=config.get("transform") or {
+                "name": "disease_resolver_index",
+                "version": DiseaseIdResolver.cache_schema_version,
+            },
+            files=[ArtifactFile(output_path, "application/vnd.sqlite3")],
+            stats=stats,
+        )
@@ -0,0 +1,53 @@
+from typing import Dict, List, Optional
+
+# metadata_store document holding unfiltered facet counts, written next to collection_schemas
+FACET_COUNTS_KEY = "collection_facet_counts"
+# values kept per field in the stored counts; the QA browser shows the top 20
+STORED_FACET_TOP = 100
+
+
+def multi_facet_query(coll_name: str, filter_clause: str = "", variable: str = "doc",
+                      loop: Optional[str] = None) -> str:
+    """Counts per value for every field in @facet_fields in one pass over the collection.
+
+    A missing or null field counts as null and array values count once per distinct item,
+    as in the per-field facet query. Values are ordered by count, then value, and cut to
+    @facet_top per field on the server. loop replaces the FOR/FILTER head, e.g. to iterate
+    a search view instead of the collection.
+    """
+    if loop is None:
+        loop = f"""FOR {variable} IN `{coll_name}`
+                {f"FILTER {filter_clause}" if filter_clause else ""}"""
+    return f"""
+        LET groups = (
+            {loop}
+                FOR facet_field IN @facet_fields
+                    LET raw = {variable}[facet_field]
+                    LET values = raw == null ? [null] : (IS_ARRAY(raw) ? UNIQUE(raw) : [raw])
+                    FOR item IN values
+                        COLLECT field = facet_field, value = item WITH COUNT INTO count
+                        RETURN {{ field, value, count }}
+        )
+        FOR facet_field IN @facet_fields
+            RETURN {{
+                field: facet_field,
+                values: (
+                    FOR grp IN groups
+                        FILTER grp.field == facet_field
+                        SORT grp.count DESC, grp.value
+                        LIMIT @facet_top
+                        RETURN {{ value: grp.value, count: grp.count }}
+                )
+            }}
+    """
+
+
+def compute_facet_counts(db, coll_name: str, fields: List[str], top: int = STORED_FACET_TOP,
+                         filter_clause: str = "", bind_vars: Optional[dict] = None,
+                         loop: Optional[str] = None) -> Dict[str, List[dict]]:
+    """field -> [{value, count}, ...] for the documents matching filter_clause (or produced by loop)."""
+    if not fields:
+        return {}
+    query = multi_facet_query(coll_name, filter_clause, loop=loop)
+    rows = db.aql.execute(query, bind_vars={**(bind_vars or {}), "facet_fields": list(fields), "facet_top": top})
+    return {row["field"]: row["values"] for row in rows}
@@ -0,0 +1,60 @@
+import re
+from typing import Dict, List
+
+# one ArangoSearch view per database, linking the @search fields of every collection
+SEARCH_VIEW_NAME = "qa_browser_search"
+SEARCH_ANALYZER_NAME = "qa_browser_text"
+# lower-cased, accent-folded word tokens; no stemming, so prefixes of what users type still match
+SEARCH_ANALYZER_PROPERTIES = {"locale": "en", "case": "lower", "accent": False, "stemming": False, "stopwords": []}
+SEARCH_ANALYZER_FEATURES = ["frequency", "norm", "position"]
+
+_WORD_RE = re.compile(r"\w", re.UNICODE)
+
+
+def search_view_links(collection_fields: Dict[str, List[str]]) -> dict:
+    """View links indexing each collection's search fields with the text analyzer."""
+    return {
+        name: {
+            "includeAllFields": False,
+            "fields": {field: {"analyzers": [SEARCH_ANALYZER_NAME]} for field in sorted(fields)},
+        }
+        for name, fields in sorted(collection_fields.items())
+        if fields
+    }
+
+
+def ensure_search_view(db, collection_fields: Dict[str, List[str]]) -> List[str]:
+    """Create the analyzer and view if missing and (re)link the given collections; returns them."""
+    links = search_view_links(collection_fields)
+    if not links:
+        return []
+    # analyzer names come back prefixed with the database name
+    if not any(analyzer["name"].split("::")[-1] == SEARCH_ANALYZER_NAME for analyzer in db.analyzers()):
+        db.create_analyzer(SEARCH_ANALYZER_NAME, "text", SEARCH_ANALYZER_PROPERTIES, SEARCH_ANALYZER_FEATURES)
+    if any(view["name"] == SEARCH_VIEW_NAME for view in db.views()):
+        # partial update: links of collections not written by this run are kept
+        db.update_arangosearch_view(SEARCH_VIEW_NAME, {"links": links})
+    else:
+        db.create_arangosearch_view(SEARCH_VIEW_NAME, {"links": links})
+    return sorted(links)
+
+
+def has_search_tokens(search_term: str) -> bool:
+    """False for terms the text analyzer reduces to nothing (punctuation only)."""
+    return bool(search_term and _WORD_RE.search(search_term))
+
+
+def view_search_loop(view_name: str, search_fields: List[str], bind_vars: dict, variable: str = "doc") -> str:
+    """FOR ... SEARCH head over the documents of @search_collection where one search field
+    holds a token starting with every token of @search_term. Callers bind search_term and
+    search_collection; the loop variable can be ranked with BM25().
+    """
+    clauses = []
+    for idx, field in enumerate(search_fields):
+        bind_name = f"search_field_{idx}"
+        bind_vars[bind_name] = field
+        clauses.append(f"STARTS_WITH({variable}[@{bind_name}], search_tokens, LENGTH(search_tokens))")
+    return f"""LET search_tokens = TOKENS(@search_term, "{SEARCH_ANALYZER_NAME}")
+        FOR {variable} IN `{view_name}`
+            SEARCH ANALYZER({" OR ".join(clauses)}, "{SEARCH_ANALYZER_NAME}")
+            OPTIONS {{ collections: [@search_collection] }}"""
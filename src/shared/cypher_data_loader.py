@@ -1,5 +1,7 @@
+import threading
 import time
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 
 from neo4j import Driver, GraphDatabase, Session
@@ -11,10 +13,18 @@ from src.shared.record_merger import FieldConflictBehavior, RecordMerger
 class GraphDBDataLoader(ABC):
     base_path: str
     merger: RecordMerger
+    batch_size: int
+    writer_sessions: int
+    unique_ids: bool
 
-    def __init__(self, base_path: str = None, field_conflict_behavior: FieldConflictBehavior = FieldConflictBehavior.KeepFirst):
+    def __init__(self, base_path: str = None, field_conflict_behavior: FieldConflictBehavior = FieldConflictBehavior.KeepFirst,
+                 batch_size: int = 50050, writer_sessions: int = 1, unique_ids: bool = False):
         self.base_path = base_path
         self.merger = RecordMerger(field_conflict_behavior=field_conflict_behavior)
+        self.batch_size = batch_size
+        self.writer_sessions = max(1, writer_sessions)
+        self.unique_ids = unique_ids
+        self._prepared_labels = set()
 
 
     @abstractmethod
@@ -30,6 +40,54 @@ class GraphDBDataLoader(ABC):
     def add_index(self, label: str, field: str):
         pass
 
+    @abstractmethod
+    def add_unique_constraint(self, label: str, field: str):
+        pass
+
+    def prepare_label(self, label: str):
+        if label in self._prepared_labels:
+            return
+        if self.unique_ids:
+            self.add_unique_constraint(label, 'id')
+        else:
+            self.add_index(label, 'id')
+        self._prepared_labels.add(label)
+
+    def load_node_groups(self, groups: List[tuple], skip_merge = False):
+        """Load (records, labels) groups, running groups with different labels on separate sessions.
+
+        Indexes and constraints are created up front, since schema changes cannot run
+        alongside the concurrent write transactions.
+        """
+        groups_by_label = {}
+        for records, labels in groups:
+            labels = self.ensure_list(labels)
+            for label in labels:
+                self.prepare_label(label)
+            groups_by_label.setdefault(self.get_conjugate_label_str(labels), []).append((records, labels))
+
+        def load_label_groups(label_groups):
+            for records, labels in label_groups:
+                self.load_node_records(records, labels, skip_merge=skip_merge)
+
+        self._run_concurrently(load_label_groups, list(groups_by_label.values()))
+
+    def load_relationship_groups(self, groups: List[tuple], skip_merge = False):
+        # Relationship batches of different types still lock the same endpoint nodes, so they stay serial.
+        for records, start_labels, rel_labels, end_labels in groups:
+            self.load_relationship_records(records, start_labels, rel_labels, end_labels, skip_merge=skip_merge)
+
+    def _run_concurrently(self, func, work_items: List):
+        if self.writer_sessions <= 1 or len(work_items) <= 1:
+            for item in work_items:
+                func(item)
+            return
+        with ThreadPoolExecutor(max_workers=min(self.writer_sessions, len(work_items)),
+                                thread_name_prefix="graph-writer") as executor:
+            futures = [executor.submit(func, item) for item in work_items]
+            for future in futures:
+                future.result()
+
     def ensure_list(self, possible_list):
         if not isinstance(possible_list, list):
             return [possible_list]
@@ -156,7 +214,7 @@ class GraphDBDataLoader(ABC):
     def load_node_records(self, records: List[dict], labels: List[str], skip_merge = False):
         labels = self.ensure_list(labels)
         for label in labels:
-            self.add_index(label, 'id')
+            self.prepare_label(label)
         query = self.generate_node_insert_query(records, labels)
         print(records[0])
         print(query)
@@ -184,11 +242,22 @@ def batch(iterable, batch_size):
 
 class MemgraphDataLoader(GraphDBDataLoader):
 
-    memgraph: Memgraph
-
     def __init__(self, credentials: DBCredentials, **kwargs):
         GraphDBDataLoader.__init__(self, **kwargs)
-        self.memgraph = Memgraph(credentials.url, credentials.port, credentials.user, credentials.password)
+        self.credentials = credentials
+        self._local = threading.local()
+
+    def connect(self) -> Memgraph:
+        return Memgraph(self.credentials.url, self.credentials.port, self.credentials.user, self.credentials.password)
+
+    @property
+    def memgraph(self) -> Memgraph:
+        # gqlalchemy caches a single connection per Memgraph object, so each writer thread gets its own
+        connection = getattr(self._local, 'memgraph', None)
+        if connection is None:
+            connection = self.connect()
+            self._local.memgraph = connection
+        return connection
 
     def index_exists(self, label: str, field: str) -> bool:
         indexes = self.memgraph.execute_and_fetch("SHOW INDEX INFO;")
@@ -215,6 +284,21 @@ class MemgraphDataLoader(GraphDBDataLoader):
         if not self.index_exists(label, field):
             self.create_index(label, field)
 
+    def unique_constraint_exists(self, label: str, field: str) -> bool:
+        constraints = self.memgraph.execute_and_fetch("SHOW CONSTRAINT INFO;")
+        for record in constraints:
+            if (record['constraint type'] == 'unique' and label == record['label']
+                    and field in self.ensure_list(record['properties'])):
+                return True
+        return False
+
+    def add_unique_constraint(self, label: str, field: str):
+        # memgraph does not back uniqueness constraints with an index, and MERGE needs the index to be fast
+        self.add_index(label, field)
+        if not self.unique_constraint_exists(label, field):
+            print(f'creating unique constraint {label}: {field}')
+            self.memgraph.execute(f"CREATE CONSTRAINT ON (n:`{label}`) ASSERT n.`{field}` IS UNIQUE")
+
     def get_conjugate_label_str(self, labels):
         labels = self.ensure_list(labels)
         return "`:`".join(labels)
@@ -262,7 +346,7 @@ class MemgraphDataLoader(GraphDBDataLoader):
     def load_node_records(self, records: List[dict], labels: List[str], skip_merge = False):
         labels = self.ensure_list(labels)
         for label in labels:
-            self.add_index(label, 'id')
+            self.prepare_label(label)
 
         conjugate_label_str = self.get_conjugate_label_str(labels)
 
@@ -292,8 +376,8 @@ class MemgraphDataLoader(GraphDBDataLoader):
 
         self.load_to_graph(query, records)
 
-    def load_to_graph(self, query, records, batch_size=50050):
-        for record_batch in batch(records, batch_size):
+    def load_to_graph(self, query, records, batch_size=None):
+        for record_batch in batch(records, batch_size or self.batch_size):
             retries = 3
             while retries > 0:
                 try:
@@ -337,6 +421,14 @@ class MemgraphDataLoader(GraphDBDataLoader):
     def delete_constraints_and_stuff(self):
         print("deleting constraints and stuff")
 
+        constraints = list(self.memgraph.execute_and_fetch("SHOW CONSTRAINT INFO;"))
+        for record in constraints:
+            if record["constraint type"] != "unique":
+                continue
+            label = record["label"]
+            props = ", ".join(f"n.`{prop}`" for prop in self.ensure_list(record["properties"]))
+            self.memgraph.execute(f"DROP CONSTRAINT ON (n:`{label}`) ASSERT {props} IS UNIQUE")
+
         indexes = self.memgraph.execute_and_fetch("SHOW INDEX INFO;")
 
         # Step 2: Drop each index
@@ -344,6 +436,7 @@ class MemgraphDataLoader(GraphDBDataLoader):
             label = record["label"]
             prop = record["property"]
             self.memgraph.execute(f"DROP INDEX ON :`{label}`(`{prop}`)")
+        self._prepared_labels.clear()
 
 class Neo4jDataLoader(GraphDBDataLoader):
 
@@ -359,9 +452,16 @@ class Neo4jDataLoader(GraphDBDataLoader):
             if not self.index_exists(session, label, field):
                 self.create_index(session, label, field)
 
-    def load_to_graph(self, query, records, batch_size=50050):
+    def add_unique_constraint(self, label: str, field: str):
+        # the constraint's backing index serves MERGE lookups; a separate index on the same property would clash
+        constraint_name = self._get_index_name(label, field).replace('_index', '_unique')
+        with self.driver.session() as session:
+            session.run(f"CREATE CONSTRAINT {constraint_name} IF NOT EXISTS "
+                        f"FOR (n:`{label}`) REQUIRE n.{field} IS UNIQUE").consume()
+
+    def load_to_graph(self, query, records, batch_size=None):
         with self.driver.session() as session:
-            for record_batch in batch(records, batch_size):
+            for record_batch in batch(records, batch_size or self.batch_size):
                 retries = 3
                 while retries > 0:
                     try:
@@ -405,6 +505,7 @@ class Neo4jDataLoader(GraphDBDataLoader):
     def delete_constraints_and_stuff(self, session):
         print("deleting constraints and stuff")
         session.run("CALL apoc.schema.assert({}, {})")
+        self._prepared_labels.clear()
 
     def _get_index_name(self, label: str, field: str):
         index_name = (f"{label}_{field}_index".lower()
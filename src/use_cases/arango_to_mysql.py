@@ -67,8 +67,12 @@ class ArangoToMySqlConverter(ArangoAdapter):
         # enum_class_path -> (Table, enum_class) for LabeledIntEnum lookup tables
         self._enum_lookup_tables: dict = {}
 
-    def convert(self, batch_size: int = 10000):
-        """Run the full conversion from Arango to MySQL."""
+    def convert(self, batch_size: int = 10000, bulk_load: bool = False):
+        """Run the full conversion from Arango to MySQL.
+
+        With bulk_load, tables are created without secondary indexes and foreign keys,
+        which are added once all data has been copied.
+        """
         schemas = self._read_schemas()
         if not schemas:
             raise RuntimeError("No collection_schemas found in metadata_store")
@@ -96,7 +100,7 @@ class ArangoToMySqlConverter(ArangoAdapter):
             table = self._create_data_table(config)
             data_tables[config["table_name"]] = (table, config)
 
-        self.sa_metadata.create_all(engine)
+        self.mysql.create_tables(self.sa_metadata, defer_indexes=bulk_load)
         self._populate_enum_lookup_tables(engine)
 
         # Pass 2: copy documents and edges
@@ -110,6 +114,9 @@ class ArangoToMySqlConverter(ArangoAdapter):
         if data_tables:
             self._melt_parquet_data(engine, data_tables)
 
+        if bulk_load:
+            self.mysql.add_deferred_indexes(self.sa_metadata)
+
         print("Conversion complete.")
 
     def _read_schemas(self) -> dict:
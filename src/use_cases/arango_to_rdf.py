@@ -1,6 +1,10 @@
 import argparse
+import gzip
 import json
+import re
+import threading
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime
 from pathlib import Path
 from typing import Any, Iterable
@@ -19,6 +23,16 @@ RDFS_LABEL = "http://www.w3.org/2000/01/rdf-schema#label"
 SKOS_ALT_LABEL = "http://www.w3.org/2004/02/skos/core#altLabel"
 SKOS_EXACT_MATCH = "http://www.w3.org/2004/02/skos/core#exactMatch"
 
+STANDARD_PREFIXES = {
+    "rdf": "http://www.w3.org/1999/02/22-rdf-syntax-ns#",
+    "rdfs": "http://www.w3.org/2000/01/rdf-schema#",
+    "skos": "http://www.w3.org/2004/02/skos/core#",
+    "xsd": "http://www.w3.org/2001/XMLSchema#",
+    "obo": "http://purl.obolibrary.org/obo/",
+    "idorg": "https://identifiers.org/",
+}
+RDF_FORMAT_EXTENSIONS = {"nt": ".nt", "ttl": ".ttl"}
+
 IDENTIFIERS_ORG_PREFIX_MAP = {
     Prefix.CAS: "cas",
     Prefix.CHEMBL_COMPOUND: "chembl.compound",
@@ -80,10 +94,15 @@ OBO_PURL_PREFIXES = {
 
 
 class NTriplesWriter:
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, compress: bool | None = None):
         self.file_path = Path(file_path)
         self.file_path.parent.mkdir(parents=True, exist_ok=True)
-        self.handle = self.file_path.open("w", encoding="utf-8")
+        if compress is None:
+            compress = self.file_path.suffix == ".gz"
+        if compress:
+            self.handle = gzip.open(self.file_path, "wt", encoding="utf-8")
+        else:
+            self.handle = self.file_path.open("w", encoding="utf-8")
 
     def close(self):
         self.handle.close()
@@ -92,6 +111,87 @@ class NTriplesWriter:
         self.handle.write(f"<{subject}> <{predicate}> {obj} .\n")
 
 
+class TurtleWriter(NTriplesWriter):
+    """Streams Turtle, abbreviating IRIs with prefixes and grouping consecutive triples by subject.
+
+    Namespaces that are not known up front get a prefix the first time they are seen (up to
+    max_dynamic_prefixes), declared inline between statements so nothing has to be buffered.
+    """
+    _local_name_pattern = re.compile(
+        r"^(?:[A-Za-z0-9_:]|%[0-9A-Fa-f]{2})(?:(?:[A-Za-z0-9_\-.:]|%[0-9A-Fa-f]{2})*(?:[A-Za-z0-9_\-:]|%[0-9A-Fa-f]{2}))?$"
+    )
+
+    def __init__(self, file_path: str, prefixes: dict[str, str] | None = None, compress: bool | None = None,
+                 max_dynamic_prefixes: int = 1000):
+        super().__init__(file_path, compress=compress)
+        self.namespace_prefixes: dict[str, str] = {}
+        self.max_dynamic_prefixes = max_dynamic_prefixes
+        self._dynamic_prefix_count = 0
+        self._current_subject = None
+        for prefix, namespace in {**STANDARD_PREFIXES, **(prefixes or {})}.items():
+            self.namespace_prefixes[namespace] = prefix
+            self.handle.write(f"@prefix {prefix}: <{namespace}> .\n")
+        self.handle.write("\n")
+
+    def close(self):
+        if self._current_subject is not None:
+            self.handle.write(" .\n")
+            self._current_subject = None
+        super().close()
+
+    def write_triple(self, subject: str, predicate: str, obj: str):
+        new_prefixes = []
+        subject_term = self._compress_iri(subject, new_prefixes)
+        predicate_term = "a" if predicate == RDF_TYPE else self._compress_iri(predicate, new_prefixes)
+        object_term = self._compress_object(obj, new_prefixes)
+
+        if new_prefixes or subject != self._current_subject:
+            if self._current_subject is not None:
+                self.handle.write(" .\n")
+            for prefix, namespace in new_prefixes:
+                self.handle.write(f"@prefix {prefix}: <{namespace}> .\n")
+            self.handle.write(f"{subject_term} {predicate_term} {object_term}")
+            self._current_subject = subject
+        else:
+            self.handle.write(f" ;\n    {predicate_term} {object_term}")
+
+    def _compress_object(self, obj: str, new_prefixes: list) -> str:
+        if obj.startswith("<") and obj.endswith(">"):
+            return self._compress_iri(obj[1:-1], new_prefixes)
+        if obj.endswith(">") and "^^<" in obj:
+            literal, datatype = obj.rsplit("^^<", 1)
+            return f"{literal}^^{self._compress_iri(datatype[:-1], new_prefixes)}"
+        return obj
+
+    def _compress_iri(self, iri: str, new_prefixes: list) -> str:
+        split_at = max(iri.rfind("/"), iri.rfind("#")) + 1
+        namespace, local_name = iri[:split_at], iri[split_at:]
+        if not split_at or not self._local_name_pattern.match(local_name):
+            return f"<{iri}>"
+        prefix = self.namespace_prefixes.get(namespace)
+        if prefix is None:
+            if self._dynamic_prefix_count >= self.max_dynamic_prefixes:
+                return f"<{iri}>"
+            prefix = self._new_prefix_name(namespace)
+            self.namespace_prefixes[namespace] = prefix
+            self._dynamic_prefix_count += 1
+            new_prefixes.append((prefix, namespace))
+        return f"{prefix}:{local_name}"
+
+    def _new_prefix_name(self, namespace: str) -> str:
+        segment = namespace.rstrip("/#").rsplit("/", 1)[-1]
+        base = re.sub(r"[^A-Za-z0-9_]", "_", segment).strip("_") or "ns"
+        if not base[0].isalpha():
+            base = f"ns_{base}"
+        used = set(self.namespace_prefixes.values())
+        candidate = base
+        suffix = 2
+        while candidate in used:
+            candidate = f"{base}{suffix}"
+            suffix += 1
+        return candidate
+
+
 class ArangoToRdfConverter(ArangoAdapter):
     def __init__(
         self,
@@ -102,24 +202,65 @@ class ArangoToRdfConverter(ArangoAdapter):
         base_ontology_uri: str,
         edge_predicate_map: dict[str, str] | None = None,
         excluded_fields: set[str] | None = None,
+        rdf_format: str = "nt",
+        compress: bool | None = None,
+        shard_by_collection: bool = False,
+        parallel_workers: int = 1,
+        stream_batch_size: int = 10000,
     ):
         super().__init__(credentials=arango_credentials, database_name=arango_db_name)
+        if rdf_format not in RDF_FORMAT_EXTENSIONS:
+            raise ValueError(f"Unsupported RDF format {rdf_format}; expected one of {sorted(RDF_FORMAT_EXTENSIONS)}")
         self.output_file = output_file
         self.base_resource_uri = self._ensure_trailing_slash(base_resource_uri)
         self.base_ontology_uri = self._ensure_trailing_slash(base_ontology_uri)
-        self.writer = NTriplesWriter(output_file)
+        self.rdf_format = rdf_format
+        self.compress = compress
+        self.shard_by_collection = shard_by_collection
+        self.parallel_workers = max(1, parallel_workers)
+        self.stream_batch_size = stream_batch_size
+        self._local = threading.local()
+        self._progress_lock = threading.Lock()
+        # In sharded mode output_file is a directory and each collection gets its own writer
+        self.writer = None if shard_by_collection else self._open_writer(output_file)
         self.node_iri_cache: dict[str, str] = {}
         self.edge_predicate_map = edge_predicate_map or {}
         self.excluded_fields = excluded_fields or set()
         self._planned_node_total = 0
         self._planned_edge_total = 0
+        self._written_node_total = 0
+        self._written_edge_total = 0
 
     @staticmethod
     def _ensure_trailing_slash(uri: str) -> str:
         return uri if uri.endswith("/") else f"{uri}/"
 
+    @property
+    def writer(self) -> NTriplesWriter:
+        return getattr(self._local, "writer", None) or self._writer
+
+    @writer.setter
+    def writer(self, writer: NTriplesWriter):
+        self._writer = writer
+
+    def _open_writer(self, file_path) -> NTriplesWriter:
+        if self.rdf_format == "ttl":
+            return TurtleWriter(
+                file_path,
+                prefixes={"ifx": self.base_ontology_uri, "ifxr": self.base_resource_uri},
+                compress=self.compress,
+            )
+        return NTriplesWriter(file_path, compress=self.compress)
+
+    def _shard_path(self, collection: str) -> Path:
+        suffix = RDF_FORMAT_EXTENSIONS[self.rdf_format]
+        if self.compress:
+            suffix += ".gz"
+        return Path(self.output_file) / f"{collection}{suffix}"
+
     def close(self):
-        self.writer.close()
+        if self._writer is not None:
+            self._writer.close()
 
     def _read_schemas(self) -> dict:
         db = self.get_db()
@@ -138,6 +279,8 @@ class ArangoToRdfConverter(ArangoAdapter):
         seed_collection: str | None = None,
         seed_limit: int | None = None,
         max_hops: int = 1,
+        direction: str = "ANY",
+        traversal_edge_collections: set[str] | None = None,
     ):
         schemas = self._read_schemas()
         if not schemas:
@@ -161,6 +304,8 @@ class ArangoToRdfConverter(ArangoAdapter):
                 seed_collection=seed_collection,
                 seed_limit=seed_limit,
                 max_hops=max_hops,
+                direction=direction,
+                traversal_edge_collections=traversal_edge_collections,
             )
         else:
             self._planned_node_total = self._count_documents(node_collections)
@@ -170,9 +315,11 @@ class ArangoToRdfConverter(ArangoAdapter):
                 f"Planned full export: {self._planned_node_total:,} nodes + "
                 f"{self._planned_edge_total:,} edges = {planned_total:,} documents"
             )
-            nodes = self._load_all_nodes(node_collections)
-            edges = self._load_all_edges(edge_collections)
+            self.stream_graph(node_collections, edge_collections)
+            return
 
+        if self.shard_by_collection:
+            raise ValueError("Sharded output is only supported for full exports")
         self.write_graph(nodes, edges)
 
     def _resolve_collections(
@@ -206,26 +353,93 @@ class ArangoToRdfConverter(ArangoAdapter):
             total += count
         return total
 
-    def _load_all_nodes(self, node_collections: list[str]) -> dict[str, dict]:
-        all_nodes = {}
-        loaded_total = 0
-        for collection in node_collections:
-            rows = self.runQuery(f"FOR doc IN `{collection}` RETURN doc")
-            for row in rows:
-                all_nodes[row["_id"]] = row
-            loaded_total += len(rows)
-            self._print_progress("Loaded nodes", collection, len(rows), loaded_total, self._planned_node_total)
-        return all_nodes
-
-    def _load_all_edges(self, edge_collections: list[str]) -> list[dict]:
-        all_edges = []
-        loaded_total = 0
-        for collection in edge_collections:
-            rows = self.runQuery(f"FOR edge IN `{collection}` RETURN edge")
-            all_edges.extend(rows)
-            loaded_total += len(rows)
-            self._print_progress("Loaded edges", collection, len(rows), loaded_total, self._planned_edge_total)
-        return all_edges
+    def stream_graph(self, node_collections: list[str], edge_collections: list[str]):
+        """Export whole collections batch by batch, so memory stays bounded by stream_batch_size.
+
+        Edge endpoint IRIs are resolved server-side alongside each edge instead of from a
+        client-side cache of every exported node.
+        """
+        work_items = [(collection, False) for collection in node_collections]
+        work_items.extend((collection, True) for collection in edge_collections)
+
+        if not self.shard_by_collection:
+            for collection, is_edge in work_items:
+                self._stream_collection(collection, is_edge)
+            return
+
+        with ThreadPoolExecutor(max_workers=self.parallel_workers, thread_name_prefix="rdf-shard") as executor:
+            futures = [executor.submit(self._stream_collection_shard, *item) for item in work_items]
+            for future in futures:
+                future.result()
+
+    def _stream_collection_shard(self, collection: str, is_edge: bool):
+        writer = self._open_writer(self._shard_path(collection))
+        self._local.writer = writer
+        try:
+            self._stream_collection(collection, is_edge)
+        finally:
+            self._local.writer = None
+            writer.close()
+
+    def _stream_collection(self, collection: str, is_edge: bool):
+        if is_edge:
+            query = f"""
+                FOR edge IN `{collection}`
+                    RETURN {{edge: edge, from_id: DOCUMENT(edge._from).id, to_id: DOCUMENT(edge._to).id}}
+            """
+        else:
+            query = f"FOR doc IN `{collection}` RETURN doc"
+
+        for rows in self._stream_query_batches(query):
+            if is_edge:
+                edges = [row["edge"] for row in rows]
+                self._local.endpoint_iris = self._batch_endpoint_iris(rows)
+                try:
+                    self._write_edges(edges)
+                finally:
+                    self._local.endpoint_iris = None
+                with self._progress_lock:
+                    self._written_edge_total += len(edges)
+                    written_total = self._written_edge_total
+                self._print_progress("Wrote edges", collection, len(edges), written_total, self._planned_edge_total)
+            else:
+                nodes = {row["_id"]: row for row in rows}
+                self._write_nodes(nodes)
+                for handle in nodes:
+                    self.node_iri_cache.pop(handle, None)
+                with self._progress_lock:
+                    self._written_node_total += len(nodes)
+                    written_total = self._written_node_total
+                self._print_progress("Wrote nodes", collection, len(nodes), written_total, self._planned_node_total)
+
+    def _stream_query_batches(self, query: str):
+        cursor = self.get_db().aql.execute(
+            query,
+            stream=True,
+            batch_size=self.stream_batch_size,
+            ttl=3600,
+            max_runtime=0,
+        )
+        try:
+            rows = []
+            for row in cursor:
+                rows.append(row)
+                if len(rows) >= self.stream_batch_size:
+                    yield rows
+                    rows = []
+            if rows:
+                yield rows
+        finally:
+            cursor.close(ignore_missing=True)
+
+    def _batch_endpoint_iris(self, rows: list[dict]) -> dict[str, str]:
+        endpoint_iris = {}
+        for row in rows:
+            edge = row["edge"]
+            for handle, node_id in ((edge["_from"], row.get("from_id")), (edge["_to"], row.get("to_id"))):
+                collection, key = handle.split("/", 1)
+                endpoint_iris[handle] = self._resource_iri(collection, {"id": node_id, "_key": key})
+        return endpoint_iris
 
     def collect_seeded_subset(
         self,
@@ -235,52 +449,105 @@ class ArangoToRdfConverter(ArangoAdapter):
         seed_collection: str,
         seed_limit: int,
         max_hops: int,
+        direction: str = "ANY",
+        traversal_edge_collections: set[str] | None = None,
     ) -> tuple[dict[str, dict], list[dict]]:
-        selected_nodes: dict[str, dict] = {}
-        selected_edges: dict[str, dict] = {}
+        """Select seed nodes plus everything within max_hops of them, traversing on the server.
 
-        seed_nodes = self.runQuery(
-            f"FOR doc IN `{seed_collection}` SORT doc.id LIMIT {seed_limit} RETURN doc"
-        )
-        frontier = {row["_id"] for row in seed_nodes}
-        for row in seed_nodes:
-            selected_nodes[row["_id"]] = row
+        One AQL traversal returns each reachable node handle with its minimum depth; one query per
+        edge collection then returns the edges incident to expanded nodes (depth < max_hops) plus
+        any edges between selected nodes.
+        """
+        direction = direction.upper()
+        if direction not in {"ANY", "OUTBOUND", "INBOUND"}:
+            raise ValueError(f"Unsupported traversal direction {direction}")
 
-        allowed_node_collections = set(node_collections)
         closure_edge_collections = [
-            name for name in edge_collections if name in schemas and schemas[name].get("type") == "edge"
+            name for name in edge_collections
+            if name in schemas and schemas[name].get("type") == "edge"
+            and (traversal_edge_collections is None or name in traversal_edge_collections)
+        ]
+        depth_by_handle = self._traverse_from_seeds(
+            seed_collection=seed_collection,
+            seed_limit=seed_limit,
+            max_hops=max_hops if closure_edge_collections else 0,
+            direction=direction,
+            traversal_edge_collections=closure_edge_collections,
+            vertex_collections=node_collections,
+        )
+        selected_nodes = self._fetch_nodes_by_handle(depth_by_handle)
+        expanded_handles = [
+            handle for handle, depth in depth_by_handle.items()
+            if depth < max_hops and handle in selected_nodes
         ]
 
-        for _ in range(max_hops):
-            if not frontier:
-                break
-
-            new_frontier = set()
-            for edge_collection in closure_edge_collections:
-                edge_rows = self.runQuery(
-                    f"""
-                    FOR edge IN `{edge_collection}`
-                        FILTER edge._from IN @frontier OR edge._to IN @frontier
-                        RETURN edge
-                    """,
-                    bind_vars={"frontier": list(frontier)},
-                )
-                for edge in edge_rows:
-                    selected_edges[edge["_id"]] = edge
-                    for handle in (edge["_from"], edge["_to"]):
-                        coll_name = handle.split("/", 1)[0]
-                        if coll_name in allowed_node_collections and handle not in selected_nodes:
-                            new_frontier.add(handle)
-
-            loaded_nodes = self._fetch_nodes_by_handle(new_frontier)
-            for handle, node in loaded_nodes.items():
-                selected_nodes[handle] = node
-
-            frontier = set(loaded_nodes.keys())
-
-        self._add_internal_edges_between_selected_nodes(edge_collections, selected_nodes, selected_edges)
+        selected_edges: dict[str, dict] = {}
+        for edge_collection in edge_collections:
+            incident_handles = expanded_handles if edge_collection in closure_edge_collections else []
+            for edge in self._query_subset_edges(edge_collection, direction, incident_handles, list(selected_nodes)):
+                selected_edges[edge["_id"]] = edge
         return selected_nodes, list(selected_edges.values())
 
+    def _traverse_from_seeds(
+        self,
+        seed_collection: str,
+        seed_limit: int,
+        max_hops: int,
+        direction: str,
+        traversal_edge_collections: list[str],
+        vertex_collections: list[str],
+    ) -> dict[str, int]:
+        if max_hops < 1:
+            reached = "[]"
+        else:
+            edge_list = ", ".join(f"`{name}`" for name in traversal_edge_collections)
+            reached = f"""(
+                    FOR v, e, p IN 1..@max_hops {direction} seed {edge_list}
+                        OPTIONS {{order: "bfs", uniqueVertices: "global", vertexCollections: @vertex_collections}}
+                        RETURN {{handle: v._id, depth: LENGTH(p.edges)}}
+                )"""
+        bind_vars = {"seed_limit": seed_limit}
+        if max_hops >= 1:
+            bind_vars.update({"max_hops": max_hops, "vertex_collections": vertex_collections})
+
+        rows = self.runQuery(
+            f"""
+            FOR seed IN `{seed_collection}`
+                SORT seed.id
+                LIMIT @seed_limit
+                LET reached = {reached}
+                FOR hit IN APPEND([{{handle: seed._id, depth: 0}}], reached)
+                    COLLECT handle = hit.handle AGGREGATE depth = MIN(hit.depth)
+                    RETURN {{handle, depth}}
+            """,
+            bind_vars=bind_vars,
+        )
+        return {row["handle"]: row["depth"] for row in rows}
+
+    def _query_subset_edges(
+        self,
+        edge_collection: str,
+        direction: str,
+        incident_handles: list[str],
+        selected_handles: list[str],
+    ) -> list[dict]:
+        if not selected_handles:
+            return []
+        incident_filter = {
+            "ANY": "edge._from IN @incident OR edge._to IN @incident",
+            "OUTBOUND": "edge._from IN @incident",
+            "INBOUND": "edge._to IN @incident",
+        }[direction]
+        return self.runQuery(
+            f"""
+            FOR edge IN `{edge_collection}`
+                FILTER {incident_filter}
+                    OR (edge._from IN @selected AND edge._to IN @selected)
+                RETURN edge
+            """,
+            bind_vars={"incident": incident_handles, "selected": selected_handles},
+        )
+
     def write_graph(self, nodes: dict[str, dict], edges: list[dict]):
         self._write_nodes(nodes)
         self._write_edges(edges)
@@ -304,28 +571,6 @@ class ArangoToRdfConverter(ArangoAdapter):
                     loaded[doc["_id"]] = doc
         return loaded
 
-    def _add_internal_edges_between_selected_nodes(
-        self,
-        edge_collections: list[str],
-        selected_nodes: dict[str, dict],
-        selected_edges: dict[str, dict],
-    ):
-        node_handles = set(selected_nodes.keys())
-        if not node_handles:
-            return
-
-        for edge_collection in edge_collections:
-            rows = self.runQuery(
-                f"""
-                FOR edge IN `{edge_collection}`
-                    FILTER edge._from IN @handles AND edge._to IN @handles
-                    RETURN edge
-                """,
-                bind_vars={"handles": list(node_handles)},
-            )
-            for edge in rows:
-                selected_edges[edge["_id"]] = edge
-
     def _write_nodes(self, nodes: dict[str, dict]):
         total = len(nodes)
         for index, node in enumerate(nodes.values(), start=1):
@@ -401,6 +646,9 @@ class ArangoToRdfConverter(ArangoAdapter):
         return f"{self.base_resource_uri}{collection}/{quote(str(identifier), safe='')}"
 
     def _edge_endpoint_iri(self, handle: str) -> str:
+        endpoint_iris = getattr(self._local, "endpoint_iris", None)
+        if endpoint_iris and handle in endpoint_iris:
+            return endpoint_iris[handle]
         if handle in self.node_iri_cache:
             return self.node_iri_cache[handle]
         collection, key = handle.split("/", 1)
@@ -502,10 +750,23 @@ class ArangoToRdfConverter(ArangoAdapter):
 
 
 def parse_args():
-    parser = argparse.ArgumentParser(description="Export Arango graph content to RDF N-Triples.")
+    parser = argparse.ArgumentParser(description="Export Arango graph content to RDF N-Triples or Turtle.")
     parser.add_argument("--arango-credentials", required=True, help="YAML file with Arango credentials")
     parser.add_argument("--arango-db", required=True, help="Arango database name")
-    parser.add_argument("--output-file", required=True, help="Output .nt file")
+    parser.add_argument(
+        "--output-file",
+        required=True,
+        help="Output .nt/.ttl file (gzipped when it ends in .gz), or a directory with --shard-by-collection",
+    )
+    parser.add_argument("--format", choices=sorted(RDF_FORMAT_EXTENSIONS), default="nt", help="RDF serialization")
+    parser.add_argument("--gzip", action="store_true", help="Gzip output files")
+    parser.add_argument(
+        "--shard-by-collection",
+        action="store_true",
+        help="Write one file per collection into the --output-file directory",
+    )
+    parser.add_argument("--workers", type=int, default=1, help="Collections exported in parallel when sharding")
+    parser.add_argument("--batch-size", type=int, default=10000, help="Documents fetched per cursor batch")
     parser.add_argument(
         "--base-resource-uri",
         default="https://ifx.ncats.nih.gov/resource/",
@@ -531,6 +792,18 @@ def parse_args():
     parser.add_argument("--seed-collection", help="Anchor node collection for induced subgraph export")
     parser.add_argument("--seed-limit", type=int, help="Number of seed nodes to anchor on")
     parser.add_argument("--max-hops", type=int, default=2, help="How many expansion hops to traverse from seeds")
+    parser.add_argument(
+        "--direction",
+        choices=["ANY", "OUTBOUND", "INBOUND"],
+        default="ANY",
+        help="Edge direction followed when expanding from seeds",
+    )
+    parser.add_argument(
+        "--traversal-edge-collection",
+        action="append",
+        default=[],
+        help="Edge collection to expand through from seeds; may be repeated (default: all selected)",
+    )
     return parser.parse_args()
 
 
@@ -549,6 +822,11 @@ def main():
         output_file=args.output_file,
         base_resource_uri=args.base_resource_uri,
         base_ontology_uri=args.base_ontology_uri,
+        rdf_format=args.format,
+        compress=True if args.gzip else None,
+        shard_by_collection=args.shard_by_collection,
+        parallel_workers=args.workers,
+        stream_batch_size=args.batch_size,
     )
 
     try:
@@ -558,6 +836,8 @@ def main():
             seed_collection=args.seed_collection,
             seed_limit=args.seed_limit,
             max_hops=args.max_hops,
+            direction=args.direction,
+            traversal_edge_collections=set(args.traversal_edge_collection) or None,
         )
     finally:
         converter.close()
@@ -253,6 +253,28 @@ def test_arango_output_adapter_etl_metadata_includes_registry_datasets():
     }]
 
 
+def test_etl_records_resolver_cache_stats_in_arango_etl_metadata():
+    from src.core.etl import ETL
+    from src.interfaces.id_resolver import IdResolver
+
+    class CachedResolver(IdResolver):
+        def resolve_internal(self, input_nodes):
+            return {}
+
+    resolver = CachedResolver(types=["Gene"], cache_capacity=10)
+    resolver.resolve_cache["NCBIGene:1"] = []
+    resolver.resolve_cache.get("NCBIGene:1")
+    adapter = ArangoOutputAdapter.__new__(ArangoOutputAdapter)
+    adapter.reset_run_state = lambda run_id: None
+    adapter.do_pre_processing = lambda: None
+    etl = ETL(input_adapters=[], output_adapters=[adapter], resolver_map={"Gene": resolver})
+
+    etl.do_etl(do_post_processing=False)
+
+    stats = adapter.get_etl_metadata()["resolver_cache_stats"]["CachedResolver(Gene)"]
+    assert (stats["capacity"], stats["size"], stats["hits"]) == (10, 1, 1)
+
+
 def test_arango_output_adapter_merges_existing_resolver_metadata_for_post_processing():
     existing = resolver_fingerprints_by_type([{
         "label": "disease_ids",
@@ -459,3 +481,97 @@ def test_update_many_with_backoff_splits_on_document_update_error():
     adapter.update_many_with_backoff(collection, records, label="Protein", kind="node")
 
     assert [len(call["docs"]) for call in collection.update_calls] == [4, 2, 1, 1, 2, 1, 1]
+
+
+class FakeFacetAql:
+    def __init__(self):
+        self.calls = []
+
+    def execute(self, query, bind_vars=None):
+        self.calls.append(bind_vars)
+        return FakeCursor([
+            {"field": field, "values": [{"value": "x", "count": 3}, {"value": None, "count": 1}]}
+            for field in bind_vars["facet_fields"]
+        ])
+
+
+class FakeFacetDb:
+    def __init__(self):
+        self.aql = FakeFacetAql()
+
+    def has_collection(self, name):
+        return name != "Missing"
+
+
+def test_get_facet_counts_runs_one_multi_facet_query_per_collection():
+    adapter = build_adapter({}, FakeCollection())
+    db = FakeFacetDb()
+    adapter.get_db = lambda: db
+    adapter._collection_schemas = {
+        "Protein": {"facet_metadata": {"category_fields": ["tdl", "family"]}},
+        "Ligand": {"facet_metadata": {"category_fields": []}},
+        "Missing": {"facet_metadata": {"category_fields": ["kind"]}},
+    }
+
+    counts = adapter.get_facet_counts()
+
+    assert list(counts) == ["Protein"]
+    assert counts["Protein"]["fields"]["family"] == [{"value": "x", "count": 3}, {"value": None, "count": 1}]
+    assert [call["facet_fields"] for call in db.aql.calls] == [["tdl", "family"]]
+
+
+class FakeSearchDb:
+    def __init__(self, views=(), analyzers=()):
+        self._views = [{"name": name} for name in views]
+        self._analyzers = [{"name": name} for name in analyzers]
+        self.calls = []
+
+    def has_collection(self, name):
+        return name != "Missing"
+
+    def analyzers(self):
+        return self._analyzers
+
+    def create_analyzer(self, name, analyzer_type, properties=None, features=None):
+        self.calls.append(("create_analyzer", name, analyzer_type))
+
+    def views(self):
+        return self._views
+
+    def create_arangosearch_view(self, name, properties=None):
+        self.calls.append(("create_view", name, properties))
+
+    def update_arangosearch_view(self, name, properties):
+        self.calls.append(("update_view", name, properties))
+
+
+def test_create_search_view_links_search_fields_and_records_view_in_schema():
+    adapter = build_adapter({}, FakeCollection())
+    db = FakeSearchDb()
+    adapter.get_db = lambda: db
+    adapter._collection_schemas = {
+        "Protein": {"search_metadata": {"text_fields": ["symbol", "name"]}},
+        "Ligand": {"search_metadata": {"text_fields": []}},
+        "Missing": {"search_metadata": {"text_fields": ["name"]}},
+    }
+
+    adapter.create_search_view()
+
+    assert db.calls[0] == ("create_analyzer", "qa_browser_text", "text")
+    kind, view_name, properties = db.calls[1]
+    assert (kind, view_name) == ("create_view", "qa_browser_search")
+    assert list(properties["links"]) == ["Protein"]
+    assert list(properties["links"]["Protein"]["fields"]) == ["name", "symbol"]
+    assert adapter._collection_schemas["Protein"]["search_metadata"]["search_view"] == "qa_browser_search"
+    assert "search_view" not in adapter._collection_schemas["Ligand"]["search_metadata"]
+
+
+def test_create_search_view_updates_existing_view_links():
+    adapter = build_adapter({}, FakeCollection())
+    db = FakeSearchDb(views=["qa_browser_search"], analyzers=["pharos::qa_browser_text"])
+    adapter.get_db = lambda: db
+    adapter._collection_schemas = {"Protein": {"search_metadata": {"text_fields": ["name"]}}}
+
+    adapter.create_search_view()
+
+    assert [call[0] for call in db.calls] == ["update_view"]
@@ -0,0 +1,224 @@
+import gzip
+
+from src.shared.db_credentials import DBCredentials
+from src.use_cases.arango_to_rdf import ArangoToRdfConverter, NTriplesWriter, TurtleWriter, RDF_TYPE
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.closed = False
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def close(self, ignore_missing=False):
+        self.closed = True
+
+
+class FakeAql:
+    def __init__(self, collections):
+        self.collections = collections
+        self.calls = []
+
+    def execute(self, query, bind_vars=None, stream=False, batch_size=None, ttl=None, max_runtime=None):
+        self.calls.append({"query": query, "stream": stream, "batch_size": batch_size})
+        collection = query.split("`")[1]
+        docs = self.collections[collection]
+        if "RETURN LENGTH" in query:
+            return FakeCursor([len(docs)])
+        if "from_id" in query:
+            nodes = {doc["_id"]: doc for docs in self.collections.values() for doc in docs}
+            return FakeCursor([
+                {
+                    "edge": edge,
+                    "from_id": nodes.get(edge["_from"], {}).get("id"),
+                    "to_id": nodes.get(edge["_to"], {}).get("id"),
+                }
+                for edge in docs
+            ])
+        return FakeCursor(list(docs))
+
+
+class FakeDb:
+    def __init__(self, collections):
+        self.aql = FakeAql(collections)
+
+    def collection(self, name):
+        raise AssertionError(f"streaming export should not fetch endpoint documents from {name}")
+
+
+GRAPH = {
+    "Protein": [
+        {"_id": "Protein/p1", "_key": "p1", "_rev": "1", "id": "UniProtKB:P1", "name": "one"},
+        {"_id": "Protein/p2", "_key": "p2", "_rev": "1", "id": "UniProtKB:P2", "name": "two"},
+        {"_id": "Protein/p3", "_key": "p3", "_rev": "1", "id": "UniProtKB:P3"},
+    ],
+    "ProteinProteinEdge": [
+        {"_id": "ProteinProteinEdge/e1", "_key": "e1", "_from": "Protein/p1", "_to": "Protein/p2"},
+        {"_id": "ProteinProteinEdge/e2", "_key": "e2", "_from": "Protein/p2", "_to": "Protein/missing"},
+    ],
+}
+
+
+def _converter(tmp_path, **kwargs):
+    output = kwargs.pop("output_file", tmp_path / "graph.nt")
+    converter = ArangoToRdfConverter(
+        arango_credentials=DBCredentials(url="http://localhost:8529", user="u", password="p"),
+        arango_db_name="test",
+        output_file=str(output),
+        base_resource_uri="https://ifx.test/resource",
+        base_ontology_uri="https://ifx.test/ontology",
+        **kwargs,
+    )
+    converter.db = FakeDb(GRAPH)
+    return converter
+
+
+def test_stream_graph_writes_batches_and_resolves_edge_endpoints_server_side(tmp_path):
+    converter = _converter(tmp_path, stream_batch_size=2)
+
+    converter.stream_graph(["Protein"], ["ProteinProteinEdge"])
+    converter.close()
+
+    lines = (tmp_path / "graph.nt").read_text().splitlines()
+    assert (
+        "<https://ifx.test/resource/Protein/UniProtKB%3AP1> <https://ifx.test/ontology/ProteinProteinEdge> "
+        "<https://ifx.test/resource/Protein/UniProtKB%3AP2> ."
+    ) in lines
+    assert (
+        "<https://ifx.test/resource/Protein/UniProtKB%3AP2> <https://ifx.test/ontology/ProteinProteinEdge> "
+        "<https://ifx.test/resource/Protein/missing> ."
+    ) in lines
+    assert sum(1 for line in lines if f"<{RDF_TYPE}>" in line) == 3
+    assert all(call["stream"] and call["batch_size"] == 2 for call in converter.db.aql.calls)
+    assert converter.node_iri_cache == {}
+
+
+def test_stream_graph_writes_gzipped_shards_per_collection_in_parallel(tmp_path):
+    converter = _converter(
+        tmp_path,
+        output_file=tmp_path / "shards",
+        compress=True,
+        shard_by_collection=True,
+        parallel_workers=2,
+    )
+
+    converter.stream_graph(["Protein"], ["ProteinProteinEdge"])
+    converter.close()
+
+    with gzip.open(tmp_path / "shards" / "Protein.nt.gz", "rt", encoding="utf-8") as handle:
+        protein_lines = handle.read().splitlines()
+    with gzip.open(tmp_path / "shards" / "ProteinProteinEdge.nt.gz", "rt", encoding="utf-8") as handle:
+        edge_lines = handle.read().splitlines()
+    assert len([line for line in protein_lines if f"<{RDF_TYPE}>" in line]) == 3
+    assert len(edge_lines) == 2
+
+
+def test_ntriples_writer_gzips_when_path_ends_in_gz(tmp_path):
+    writer = NTriplesWriter(tmp_path / "out.nt.gz")
+    writer.write_triple("https://a/s", "https://a/p", "\"x\"")
+    writer.close()
+
+    with gzip.open(tmp_path / "out.nt.gz", "rt", encoding="utf-8") as handle:
+        assert handle.read() == "<https://a/s> <https://a/p> \"x\" .\n"
+
+
+def test_turtle_writer_compresses_prefixes_and_groups_subjects(tmp_path):
+    writer = TurtleWriter(tmp_path / "out.ttl", prefixes={"ifx": "https://ifx.test/ontology/"})
+    subject = "https://ifx.test/resource/Protein/UniProtKB%3AP1"
+    writer.write_triple(subject, RDF_TYPE, "<https://ifx.test/ontology/Protein>")
+    writer.write_triple(subject, "https://ifx.test/ontology/count",
+                        "\"3\"^^<http://www.w3.org/2001/XMLSchema#integer>")
+    writer.write_triple(subject, "https://ifx.test/ontology/odd", "<https://x.test/a b>")
+    writer.close()
+
+    text = (tmp_path / "out.ttl").read_text()
+    assert "@prefix ifx: <https://ifx.test/ontology/> .\n" in text
+    assert "@prefix Protein: <https://ifx.test/resource/Protein/> .\n" in text
+    assert (
+        "Protein:UniProtKB%3AP1 a ifx:Protein ;\n"
+        "    ifx:count \"3\"^^xsd:integer ;\n"
+        "    ifx:odd <https://x.test/a b> .\n"
+    ) in text
+    assert text.index("@prefix Protein:") < text.index("Protein:UniProtKB%3AP1 a")
+
+
+def test_collect_seeded_subset_uses_one_traversal_and_one_edge_query_per_collection(tmp_path):
+    converter = _converter(tmp_path)
+    queries = []
+
+    def run_query(query, bind_vars=None):
+        queries.append((query, bind_vars))
+        if "FOR v, e, p IN" in query:
+            return [
+                {"handle": "Protein/p1", "depth": 0},
+                {"handle": "Protein/p2", "depth": 1},
+                {"handle": "Protein/p3", "depth": 2},
+            ]
+        if "ProteinProteinEdge" in query:
+            return [{"_id": "ProteinProteinEdge/e1", "_from": "Protein/p1", "_to": "Protein/p2"}]
+        return [{"_id": "GeneProteinEdge/e9", "_from": "Gene/g1", "_to": "Protein/p3"}]
+
+    converter.runQuery = run_query
+    converter._fetch_nodes_by_handle = lambda handles: {handle: {"_id": handle} for handle in handles}
+    schemas = {
+        "Protein": {"type": "document"},
+        "ProteinProteinEdge": {"type": "edge"},
+        "GeneProteinEdge": {"type": "edge"},
+    }
+
+    nodes, edges = converter.collect_seeded_subset(
+        schemas=schemas,
+        node_collections=["Protein"],
+        edge_collections=["GeneProteinEdge", "ProteinProteinEdge"],
+        seed_collection="Protein",
+        seed_limit=1,
+        max_hops=2,
+        direction="outbound",
+        traversal_edge_collections={"ProteinProteinEdge"},
+    )
+
+    assert sorted(nodes) == ["Protein/p1", "Protein/p2", "Protein/p3"]
+    assert sorted(edge["_id"] for edge in edges) == ["GeneProteinEdge/e9", "ProteinProteinEdge/e1"]
+    assert len(queries) == 3
+
+    traversal_query, traversal_vars = queries[0]
+    assert "1..@max_hops OUTBOUND seed `ProteinProteinEdge`" in traversal_query
+    assert "`GeneProteinEdge`" not in traversal_query
+    assert traversal_vars == {"seed_limit": 1, "max_hops": 2, "vertex_collections": ["Protein"]}
+
+    edge_queries = {query.split("`")[1]: (query, bind_vars) for query, bind_vars in queries[1:]}
+    gene_query, gene_vars = edge_queries["GeneProteinEdge"]
+    assert gene_vars["incident"] == []
+    protein_query, protein_vars = edge_queries["ProteinProteinEdge"]
+    assert "FILTER edge._from IN @incident\n" in protein_query
+    assert sorted(protein_vars["incident"]) == ["Protein/p1", "Protein/p2"]
+    assert sorted(protein_vars["selected"]) == ["Protein/p1", "Protein/p2", "Protein/p3"]
+
+
+def test_collect_seeded_subset_without_hops_only_selects_seeds(tmp_path):
+    converter = _converter(tmp_path)
+    queries = []
+
+    def run_query(query, bind_vars=None):
+        queries.append(query)
+        if "LIMIT @seed_limit" in query:
+            return [{"handle": "Protein/p1", "depth": 0}]
+        return []
+
+    converter.runQuery = run_query
+    converter._fetch_nodes_by_handle = lambda handles: {handle: {"_id": handle} for handle in handles}
+
+    nodes, edges = converter.collect_seeded_subset(
+        schemas={"Protein": {"type": "document"}, "ProteinProteinEdge": {"type": "edge"}},
+        node_collections=["Protein"],
+        edge_collections=["ProteinProteinEdge"],
+        seed_collection="Protein",
+        seed_limit=1,
+        max_hops=0,
+    )
+
+    assert list(nodes) == ["Protein/p1"]
+    assert edges == []
+    assert "FOR v, e, p IN" not in queries[0]
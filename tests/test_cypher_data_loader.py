@@ -0,0 +1,131 @@
+import threading
+
+from src.output_adapters.cypher_output_adapter import Neo4jOutputAdapter
+from src.shared.cypher_data_loader import GraphDBDataLoader, MemgraphDataLoader, Neo4jDataLoader
+from src.shared.db_credentials import DBCredentials
+from src.models.test_models import TestEdge, TestNode
+
+
+class FakeResult:
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def consume(self):
+        return None
+
+
+class FakeNeo4jSession:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def run(self, query, **params):
+        with self.driver.lock:
+            self.driver.statements.append((query, params, threading.get_ident()))
+        return FakeResult()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_args):
+        return False
+
+
+class FakeNeo4jDriver:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.statements = []
+
+    def session(self):
+        return FakeNeo4jSession(self)
+
+
+def _neo4j_loader(**kwargs):
+    loader = Neo4jDataLoader.__new__(Neo4jDataLoader)
+    GraphDBDataLoader.__init__(loader, **kwargs)
+    loader.driver = FakeNeo4jDriver()
+    return loader
+
+
+def test_neo4j_loader_creates_unique_constraints_once_and_batches_unwind_statements():
+    loader = _neo4j_loader(batch_size=2, unique_ids=True)
+    records = [{"id": f"n{i}", "provenance": "test"} for i in range(5)]
+
+    loader.load_node_groups([(records, ["Gene"])])
+    loader.load_node_groups([(records[:1], ["Gene"])])
+
+    statements = [query for query, _params, _thread in loader.driver.statements]
+    constraint_statements = [query for query in statements if query.startswith("CREATE CONSTRAINT")]
+    assert constraint_statements == [
+        "CREATE CONSTRAINT gene_id_unique IF NOT EXISTS FOR (n:`Gene`) REQUIRE n.id IS UNIQUE"
+    ]
+    writes = [(query, params) for query, params, _thread in loader.driver.statements if "UNWIND" in query]
+    assert [len(params["records"]) for _query, params in writes] == [2, 2, 1, 1]
+    assert all("MERGE (graph_node:`Gene` {id: new_entry.id})" in query for query, _params in writes)
+
+
+def test_neo4j_loader_runs_different_labels_on_concurrent_sessions():
+    loader = _neo4j_loader(writer_sessions=3)
+    barrier = threading.Barrier(3, timeout=5)
+    original_load = loader.load_to_graph
+
+    def load_to_graph(query, records, batch_size=None):
+        barrier.wait()
+        original_load(query, records, batch_size)
+
+    loader.load_to_graph = load_to_graph
+
+    loader.load_node_groups([
+        ([{"id": "g1", "provenance": "test"}], ["Gene"]),
+        ([{"id": "p1", "provenance": "test"}], ["Protein"]),
+        ([{"id": "d1", "provenance": "test"}], ["Disease"]),
+    ])
+
+    write_threads = {thread for query, _params, thread in loader.driver.statements if "UNWIND" in query}
+    index_statements = [query for query, _params, _thread in loader.driver.statements if query.startswith("CREATE INDEX")]
+    assert len(write_threads) == 3
+    assert len(index_statements) == 3
+
+
+def test_graph_output_adapter_loads_nodes_before_relationships():
+    adapter = Neo4jOutputAdapter.__new__(Neo4jOutputAdapter)
+    calls = []
+
+    class RecordingLoader:
+        merger = None
+
+        def load_node_groups(self, groups, skip_merge=False):
+            calls.append(("nodes", [labels for _records, labels in groups]))
+
+        def load_relationship_groups(self, groups, skip_merge=False):
+            calls.append(("relationships", [rel_labels for _records, _start, rel_labels, _end in groups]))
+
+    adapter.loader = RecordingLoader()
+    start = TestNode(id="a")
+    end = TestNode(id="b")
+
+    adapter.store([TestEdge(start_node=start, end_node=end), start, end])
+
+    assert calls == [
+        ("nodes", [["TestNode"]]),
+        ("relationships", [["TestEdge"]]),
+    ]
+
+
+def test_memgraph_loader_uses_one_connection_per_thread():
+    loader = MemgraphDataLoader(DBCredentials(url="localhost", user="u", password="p", port=7687))
+    created = []
+    loader.connect = lambda: created.append(object()) or created[-1]
+
+    main_connection = loader.memgraph
+    assert loader.memgraph is main_connection
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(loader.memgraph))
+    thread.start()
+    thread.join()
+
+    assert len(created) == 2
+    assert other[0] is not main_connection
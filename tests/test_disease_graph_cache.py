@@ -0,0 +1,127 @@
+import csv
+import os
+
+import src.qa_browser.disease_id_graph as disease_id_graph
+from src.qa_browser.disease_graph_cache import CACHE_FILE_NAME
+from src.qa_browser.disease_id_graph import (
+    load_full_version_diff,
+    load_version_data,
+    page_version_diff,
+    resolve_name_candidates,
+    search_concepts,
+    truncate_version_diff,
+)
+
+
+def _write_tsv(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.DictWriter(fh, fieldnames=list(rows[0]), delimiter="\t")
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def _app_graph_dir(tmp_path, standard_name="Cystic fibrosis"):
+    _write_tsv(tmp_path / "disease_concepts.tsv", [
+        {"primary_xref": "MONDO:1", "ncats_disease_id": "IFXDisease:1", "standard_name": standard_name},
+        {"primary_xref": "MONDO:2", "ncats_disease_id": "IFXDisease:2", "standard_name": "Type 2 diabetes"},
+    ])
+    _write_tsv(tmp_path / "disease_xref_edges.tsv", [
+        {"primary_xref": "MONDO:1", "xref_id": "OMIM:219700", "xref_namespace": "OMIM", "xref_label": standard_name},
+    ])
+    return tmp_path
+
+
+def _load(data_dir, build_indexes=False):
+    disease_id_graph._version_graph_cache.clear()
+    if build_indexes:
+        return disease_id_graph._load_app_graph_data(data_dir, build_indexes=True)
+    return load_version_data(data_dir)
+
+
+def test_second_load_comes_from_cache_with_indexes(tmp_path, capsys):
+    data_dir = _app_graph_dir(tmp_path)
+    first = _load(data_dir, build_indexes=True)
+    assert (data_dir / CACHE_FILE_NAME).exists()
+    capsys.readouterr()
+
+    second = _load(data_dir, build_indexes=True)
+
+    assert "loaded binary cache" in capsys.readouterr().out
+    assert second.concepts_by_pxref == first.concepts_by_pxref
+    assert second.edges_by_pxref["MONDO:1"][0]["xref_id"] == "OMIM:219700"
+    assert second._search_index is not None and second._resolver_term_index is not None
+    assert search_concepts(second, q="omim:219700")["rows"][0]["primary_xref"] == "MONDO:1"
+    assert resolve_name_candidates(second, "cystic fibrosis")["candidates"][0]["primary_xref"] == "MONDO:1"
+
+
+def test_touching_a_tsv_keeps_the_cache_but_editing_it_does_not(tmp_path, capsys):
+    data_dir = _app_graph_dir(tmp_path)
+    _load(data_dir)
+    concepts = data_dir / "disease_concepts.tsv"
+    stat = concepts.stat()
+    os.utime(concepts, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    capsys.readouterr()
+
+    _load(data_dir)
+    assert "loaded binary cache" in capsys.readouterr().out
+
+    _app_graph_dir(tmp_path, standard_name="Cystic fibrosis 2")
+    data = _load(data_dir)
+    assert "loaded binary cache" not in capsys.readouterr().out
+    assert data.concepts_by_pxref["MONDO:1"]["standard_name"] == "Cystic fibrosis 2"
+
+
+def test_corrupt_cache_is_ignored_and_rewritten(tmp_path, capsys):
+    data_dir = _app_graph_dir(tmp_path)
+    _load(data_dir)
+    cache_path = data_dir / CACHE_FILE_NAME
+    raw = bytearray(cache_path.read_bytes())
+    raw[-5] ^= 0xFF
+    cache_path.write_bytes(bytes(raw))
+    capsys.readouterr()
+
+    data = _load(data_dir)
+
+    assert "corrupt disease graph cache" in capsys.readouterr().out
+    assert set(data.concepts_by_pxref) == {"MONDO:1", "MONDO:2"}
+    _load(data_dir)
+    assert "loaded binary cache" in capsys.readouterr().out
+
+
+def _release(path, version, n_concepts, tier):
+    path.mkdir()
+    (path / "manifest.json").write_text(f'{{"pipeline_version": "{version}"}}')
+    _write_tsv(path / "disease_concepts.tsv", [
+        {"primary_xref": f"MONDO:{i}", "standard_name": f"Disease {i}", "confidence_tier": tier}
+        for i in range(n_concepts)
+    ])
+    _write_tsv(path / "disease_xref_edges.tsv", [{"primary_xref": "MONDO:0", "xref_id": "OMIM:1"}])
+    return path
+
+
+def test_version_diff_is_computed_once_and_paged_from_disk(tmp_path, monkeypatch):
+    old = _release(tmp_path / "v1", "1.0.0", 700, "needs_review")
+    new = _release(tmp_path / "v2", "2.0.0", 1300, "multi_source_supported")
+    computed = []
+    compute = disease_id_graph.compute_full_version_diff
+    monkeypatch.setattr(
+        disease_id_graph, "compute_full_version_diff", lambda *args: computed.append(1) or compute(*args)
+    )
+
+    diff = load_full_version_diff(old, new, "1.0.0", "2.0.0")
+    again = load_full_version_diff(old, new, "1.0.0", "2.0.0")
+
+    assert computed == [1]
+    assert again == diff
+    assert diff["summary"]["concepts_added"] == 600 and diff["summary"]["tier_changes"] == 700
+    assert len(truncate_version_diff(diff)["tier_changes"]) == 500
+    second_page = page_version_diff(diff, "tier_changes", page=2, per_page=500)
+    assert second_page["total"] == 700 and second_page["total_pages"] == 2
+    assert [row["primary_xref"] for row in second_page["rows"]] == [
+        row["primary_xref"] for row in diff["tier_changes"][500:]
+    ]
+
+    _write_tsv(old / "disease_concepts.tsv", [{"primary_xref": "MONDO:0", "standard_name": "Disease 0"}])
+    changed = load_full_version_diff(old, new, "1.0.0", "2.0.0")
+    assert computed == [1, 1]
+    assert changed["summary"]["concepts_added"] == 1299
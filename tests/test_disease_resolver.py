@@ -1,7 +1,11 @@
+import pytest
+
 from src.id_resolvers.disease_resolver import DiseaseIdResolver
 from src.interfaces.id_resolver import NoMatchBehavior
 from src.models.disease import Disease
-from src.registry.fetchers import MaterializedDataset
+from src.core.data_registry import DataRegistry
+from src.registry.derived.target_graph import DiseaseResolverIndexBuilder
+from src.registry.fetchers import MaterializedDataset, ResolvedDependency
 
 
 def _dataset_for_file(path):
@@ -18,7 +22,24 @@ def _dataset_for_file(path):
     )
 
 
-def _resolver_snapshot(path):
+def _index_dataset(path):
+    return MaterializedDataset(
+        source="target_graph",
+        dataset="disease_resolver_index",
+        version="test",
+        version_date=None,
+        download_date=None,
+        snapshot_id="target_graph:disease_resolver_index:test",
+        manifest_uri="s3://ifx-registry/derived/target_graph/disease_resolver_index/test/manifest.yaml",
+        manifest={"files": [{"path": path.name}]},
+        local_dir=path.parent,
+    )
+
+
+def _resolver_snapshot(path, index_path=None):
+    resolver_inputs = {"data_source": _dataset_for_file(path)}
+    if index_path is not None:
+        resolver_inputs["index_data_source"] = _index_dataset(index_path)
     return MaterializedDataset(
         source="target_graph",
         dataset="disease_ids",
@@ -35,7 +56,7 @@ def _resolver_snapshot(path):
             },
         },
         local_dir=path.parent,
-        resolver_inputs={"data_source": _dataset_for_file(path)},
+        resolver_inputs=resolver_inputs,
     )
 
 
@@ -201,3 +222,137 @@ def test_disease_resolver_can_fan_out_ambiguous_xref_matches(tmp_path):
     resolved = resolver.parse_flat_node_list_from_map(entity_map)
 
     assert {node.id for node in resolved} == {"MONDO:0011308", "MONDO:0000002"}
+
+
+def _build_index(tmp_path, disease_ids):
+    dependency = ResolvedDependency(
+        source="target_graph",
+        dataset="disease_ids",
+        version="test",
+        snapshot_id="target_graph:disease_ids:test",
+        manifest_uri="s3://ifx-registry/sources/target_graph/disease_ids/test/manifest.yaml",
+        manifest={"version_date": "2026-01-01"},
+        local_dir=disease_ids.parent,
+    )
+    return DiseaseResolverIndexBuilder().build(
+        config={},
+        dependencies=[dependency],
+        dest=tmp_path / "index",
+        version="test",
+    )
+
+
+def test_disease_resolver_index_builder_writes_read_only_index(tmp_path):
+    disease_ids = tmp_path / "disease_ids.tsv"
+    _write_disease_ids(disease_ids)
+
+    artifact = _build_index(tmp_path, disease_ids)
+
+    index_path = artifact.files[0].path
+    assert index_path.name == DiseaseIdResolver.index_file_name
+    assert DiseaseIdResolver.read_index_schema_version(index_path) == DiseaseIdResolver.cache_schema_version
+    assert artifact.stats["match_rows"] > 0
+    assert artifact.derived_from == [{
+        "snapshot_id": "target_graph:disease_ids:test",
+        "manifest_uri": "s3://ifx-registry/sources/target_graph/disease_ids/test/manifest.yaml",
+    }]
+
+
+def test_disease_resolver_uses_prebuilt_index_without_local_cache(tmp_path):
+    disease_ids = tmp_path / "disease_ids.tsv"
+    _write_disease_ids(disease_ids)
+    index_path = _build_index(tmp_path, disease_ids).files[0].path
+    nodes = [Disease(id=node_id) for node_id in ["GARD:0000001", "OMIM:603358", "MEDGEN:999", "DOID:404"]]
+
+    local = DiseaseIdResolver(
+        resolver_snapshot=_resolver_snapshot(disease_ids),
+        types=["Disease"],
+        cache_path=str(tmp_path / "local.sqlite"),
+    )
+    cache = tmp_path / "prebuilt.sqlite"
+    prebuilt = DiseaseIdResolver(
+        resolver_snapshot=_resolver_snapshot(disease_ids, index_path),
+        types=["Disease"],
+        cache_path=str(cache),
+    )
+
+    assert prebuilt.snapshot_path == index_path
+    assert prebuilt.connection is None
+    assert not cache.exists()
+    assert prebuilt.resolve_internal(nodes) == local.resolve_internal(nodes)
+
+
+def test_disease_resolver_rejects_index_with_other_schema_version(tmp_path, monkeypatch):
+    disease_ids = tmp_path / "disease_ids.tsv"
+    _write_disease_ids(disease_ids)
+    index_path = _build_index(tmp_path, disease_ids).files[0].path
+    monkeypatch.setattr(DiseaseIdResolver, "cache_schema_version", "v3")
+
+    with pytest.raises(ValueError, match="expected 'v3'"):
+        DiseaseIdResolver(
+            resolver_snapshot=_resolver_snapshot(disease_ids, index_path),
+            types=["Disease"],
+            cache_path=str(tmp_path / "prebuilt.sqlite"),
+        )
+
+
+def test_disease_resolver_builds_locally_when_index_is_from_other_disease_ids(tmp_path):
+    old_release = tmp_path / "old" / "disease_ids.tsv"
+    old_release.parent.mkdir()
+    _write_disease_ids(old_release)
+    index_path = _build_index(tmp_path, old_release).files[0].path
+    disease_ids = tmp_path / "disease_ids.tsv"
+    _write_disease_ids(disease_ids)
+    with disease_ids.open("a") as handle:
+        handle.write("\t".join(["NCATS:2", "MONDO:0000002", "other", "", "", "", "", "", "", "False"]) + "\n")
+
+    cache = tmp_path / "local.sqlite"
+    resolver = DiseaseIdResolver(
+        resolver_snapshot=_resolver_snapshot(disease_ids, index_path),
+        types=["Disease"],
+        cache_path=str(cache),
+    )
+
+    assert resolver.snapshot_path != index_path
+    assert cache.exists()
+    assert resolver.resolve_internal([Disease(id="MONDO:0000002")])["MONDO:0000002"][0].match == "MONDO:0000002"
+
+
+def test_resolver_inputs_pin_derived_index_to_the_pinned_source_snapshot():
+    registry = DataRegistry()
+    snapshots = {
+        ("target_graph", "disease_ids"): [
+            {"version": "v1", "snapshot_id": "target_graph:disease_ids:v1", "manifest_uri": "s3://r/v1"},
+            {"version": "v2", "snapshot_id": "target_graph:disease_ids:v2", "manifest_uri": "s3://r/v2"},
+        ],
+    }
+    artifacts = [
+        {
+            "source": "target_graph",
+            "dataset": "disease_resolver_index",
+            "version": version,
+            "snapshot_id": f"target_graph:disease_resolver_index:{version}",
+            "manifest_uri": f"s3://r/index/{version}",
+            "derived_from": [{"snapshot_id": f"target_graph:disease_ids:{parent}"}],
+        }
+        for version, parent in [("i1", "v1"), ("i2", "v2"), ("i3", "v1")]
+    ]
+    registry._source_snapshots_for_dataset = lambda source, dataset: snapshots.get((source, dataset), [])
+    registry.list_derived_artifacts = lambda: artifacts
+    definition = {"inputs": {
+        "data_source": "target_graph:disease_ids",
+        "index_data_source": "target_graph:disease_resolver_index",
+    }}
+
+    resolved, metadata = registry._resolve_resolver_inputs(definition)
+
+    assert resolved == {
+        "data_source": "target_graph:disease_ids:v2",
+        "index_data_source": "target_graph:disease_resolver_index:i2",
+    }
+
+    artifacts.pop(1)
+    resolved, metadata = registry._resolve_resolver_inputs(definition)
+
+    assert resolved == {"data_source": "target_graph:disease_ids:v2"}
+    assert list(metadata) == ["data_source"]
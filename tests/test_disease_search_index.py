@@ -0,0 +1,185 @@
+import random
+
+from src.qa_browser.disease_id_graph import (
+    DiseaseGraphData,
+    export_search_tsv,
+    resolve_name_candidates,
+    search_concepts,
+)
+from src.qa_browser.disease_search_index import ConceptSearchIndex, TermNgramIndex
+
+
+def _graph_data(concepts, edges=()):
+    data = DiseaseGraphData()
+    for pxref, ncats_id, name in concepts:
+        data.concepts_by_pxref[pxref] = {
+            "primary_xref": pxref,
+            "ncats_disease_id": ncats_id,
+            "standard_name": name,
+        }
+    for pxref, xref_id in edges:
+        data.edges_by_pxref[pxref].append({"primary_xref": pxref, "xref_id": xref_id, "xref_namespace": "OMIM"})
+    return data
+
+
+def _linear_substring_search(data, q):
+    q_lower = q.strip().lower()
+    return [
+        pxref for pxref, concept in data.concepts_by_pxref.items()
+        if q_lower in pxref.lower() or q_lower in concept.get("standard_name", "").lower()
+    ]
+
+
+def test_substring_matches_keep_linear_scan_order():
+    rng = random.Random(3)
+    words = ["type", "diabetes", "mellitus", "syndrome", "cystic", "fibrosis", "rare", "juvenile", "onset"]
+    concepts = []
+    for i in range(400):
+        name = " ".join(rng.choice(words) for _ in range(rng.randint(1, 4))).title()
+        concepts.append((f"MONDO:{rng.randint(0, 10**7):07d}", f"IFXDisease:{i}", name))
+    data = _graph_data(concepts)
+
+    for q in ["diabetes", "Mellitus Synd", "abet", "MONDO:00", "s", "ty", "  Cystic  ", "nothing here"]:
+        ranked = [row["primary_xref"] for row in search_concepts(data, q=q, per_page=1000)["rows"]]
+        expected = _linear_substring_search(data, q)
+        assert ranked[:len(expected)] == expected
+
+
+def test_multi_token_prefix_query_requires_every_token():
+    data = _graph_data([
+        ("MONDO:1", "IFXDisease:1", "Type 2 diabetes mellitus"),
+        ("MONDO:2", "IFXDisease:2", "Diabetes insipidus"),
+        ("MONDO:3", "IFXDisease:3", "Type 1 diabetes mellitus"),
+        ("MONDO:4", "IFXDisease:4", "Mellitus-like prototype"),
+    ])
+
+    result = search_concepts(data, q="diab mell type")
+
+    assert [row["primary_xref"] for row in result["rows"]] == ["MONDO:1", "MONDO:3"]
+    assert result["total"] == 2
+
+
+def test_exact_id_query_finds_concept_by_ncats_id_and_xref():
+    data = _graph_data(
+        [("MONDO:1", "IFXDisease:1", "Cystic fibrosis"), ("MONDO:2", "IFXDisease:2", "Other disease")],
+        edges=[("MONDO:1", "OMIM:219700")],
+    )
+
+    assert [row["primary_xref"] for row in search_concepts(data, q="omim:219700")["rows"]] == ["MONDO:1"]
+    assert [row["primary_xref"] for row in search_concepts(data, q="IFXDisease:2")["rows"]] == ["MONDO:2"]
+
+
+def test_blank_query_returns_every_concept_and_export_uses_index():
+    data = _graph_data([
+        ("MONDO:1", "IFXDisease:1", "Cystic fibrosis"),
+        ("MONDO:2", "IFXDisease:2", "Fibrosis of lung"),
+    ])
+
+    assert search_concepts(data, q=" ")["total"] == 2
+    lines = export_search_tsv(data, q="fibro").strip().splitlines()
+    assert [line.split("\t")[0] for line in lines[1:]] == ["MONDO:1", "MONDO:2"]
+    assert data._search_index is not None
+
+
+def test_prefix_postings_only_walk_matching_tokens():
+    index = ConceptSearchIndex()
+    index.add("a", ["alpha beta"])
+    index.add("b", ["alphabet"])
+    index.add("c", ["gamma"])
+    index.finalize()
+
+    assert index.prefix_postings("alph") == {0, 1}
+    assert index.prefix_postings("gam") == {2}
+    assert index.prefix_postings("zeta") == set()
+    assert index.search("beta alpha") == ["a"]
+
+
+_NAME_WORDS = [
+    "alzheimer", "parkinson", "huntington", "diabetes", "mellitus", "insipidus", "cystic", "fibrosis",
+    "muscular", "dystrophy", "duchenne", "becker", "spinal", "atrophy", "cerebellar", "ataxia",
+    "retinitis", "pigmentosa", "keratoderma", "palmoplantar", "striate", "hypertrophic", "cardiomyopathy",
+    "familial", "juvenile", "congenital", "syndrome", "disease", "type", "neuropathy", "hereditary",
+    "epilepsy", "myoclonic", "leukodystrophy", "metachromatic", "anemia", "sickle", "thalassemia",
+    "hemophilia", "glycogen", "storage", "lysosomal", "mitochondrial", "encephalopathy", "deficiency",
+    "carcinoma", "adenocarcinoma", "lymphoma", "leukemia", "myeloid", "acute", "chronic", "sarcoma",
+]
+
+
+def _fuzzy_fixture(seed=7, concepts=250):
+    rng = random.Random(seed)
+    data = DiseaseGraphData()
+    names = []
+    for i in range(concepts):
+        name = " ".join(rng.sample(_NAME_WORDS, rng.randint(2, 4)))
+        if rng.random() < 0.3:
+            name += f" {rng.randint(1, 12)}"
+        pxref = f"MONDO:{i:07d}"
+        data.concepts_by_pxref[pxref] = {
+            "primary_xref": pxref,
+            "ncats_disease_id": f"IFXDisease:{i}",
+            "standard_name": name,
+            "synonyms": " ".join(reversed(name.split())),
+            "confidence_tier": rng.choice(["multi_source_supported", "needs_review", ""]),
+            "n_sources": str(rng.randint(1, 6)),
+        }
+        data.edges_by_pxref[pxref].append({
+            "xref_id": f"OMIM:{600000 + i}",
+            "xref_namespace": "OMIM",
+            "xref_label": name.upper(),
+            "match_type": rng.choice(["exact", "broad", "related"]),
+            "xref_confidence": "0.9",
+        })
+        names.append(name)
+    return data, names, rng
+
+
+def _typo(rng, text):
+    chars = list(text)
+    for _ in range(rng.randint(1, 3)):
+        i = rng.randrange(len(chars))
+        chars[i] = rng.choice("abcdefghijklmnopqrstuvwxyz")
+    return "".join(chars)
+
+
+def _candidates(result):
+    return [
+        (row["primary_xref"], row["resolver_score"], row["lexical_score"], row["matched_term"])
+        for row in result["candidates"]
+    ]
+
+
+def test_shortlisted_name_resolution_matches_exhaustive_top_k():
+    data, names, rng = _fuzzy_fixture()
+    queries = []
+    for name in rng.sample(names, 12):
+        words = name.split()
+        queries.append(name)
+        queries.append(_typo(rng, name))
+        queries.append(" ".join(rng.sample(words, max(1, len(words) - 1))))
+    queries += ["OMIM:600012", "IFXDisease:5", "completely unrelated text", "ataxia", "ty", "a"]
+
+    for query in queries:
+        # a limit past the strong matches also compares the low-scoring tail
+        fast = resolve_name_candidates(data, query, limit=50)
+        slow = resolve_name_candidates(data, query, limit=50, exhaustive=True)
+        assert _candidates(fast) == _candidates(slow), query
+
+
+def test_shortlist_keeps_every_norm_that_can_reach_the_minimum():
+    index = TermNgramIndex([
+        ("common disease", ""),
+        ("common syndrome", ""),
+        ("rare zyx disorder", ""),
+        ("zyx", ""),
+        ("unrelated", "omim:1"),
+    ])
+
+    # token containment: "zyx" is every token of norm 3 and one of three tokens of norm 2
+    assert index.shortlist("zyx", minimum=0.58) == [2, 3]
+    # character ratio: a one-letter typo shares no token or substring with the term
+    assert index.shortlist("comon disease", minimum=0.58) == [0, 1]
+    assert index.shortlist("comon disease", minimum=0.95) == [0]
+    # substrings in both directions, including short norms inside a longer query
+    assert index.shortlist("relate", minimum=0.9) == [4]
+    assert index.shortlist("the zyx gene", minimum=0.9) == [3]
+    assert index.id_matches("omim:1") == [4]
@@ -1,6 +1,6 @@
 from typing import List, Dict
 
-from src.interfaces.id_resolver import IdResolver, IdMatch, NoMatchBehavior, MultiMatchBehavior
+from src.interfaces.id_resolver import DEFAULT_RESOLVE_CACHE_CAPACITY, IdResolver, IdMatch, NoMatchBehavior, MultiMatchBehavior
 from src.models.gene import Gene, GeneticLocation
 from src.models.node import Node
 from src.models.protein import Protein
@@ -73,3 +73,143 @@ def test_cross_type_retype_rejects_incompatible_fields():
 
     assert 'ENSEMBL:ENSG1' not in merged_map[IdResolver.MatchKeys.matched]
     assert merged_map[IdResolver.MatchKeys.unmatched]['ENSEMBL:ENSG1'].id == 'ENSEMBL:ENSG1'
+
+
+class CountingResolver(IdResolver):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls = []
+
+    def resolve_internal(self, input_nodes: List[Node]) -> Dict[str, List[IdMatch]]:
+        self.calls.append([node.id for node in input_nodes])
+        return {node.id: [IdMatch(node.id, f"Match:{node.id}")] for node in input_nodes}
+
+
+def test_resolve_cache_is_bounded_by_default_and_unbounded_on_request():
+    assert CountingResolver(types=['Node']).get_cache_stats()['capacity'] == DEFAULT_RESOLVE_CACHE_CAPACITY
+
+    resolver = CountingResolver(types=['Node'], cache_capacity=None)
+    resolver._resolve_internal([Node(id='1'), Node(id='2')])
+    resolver._resolve_internal([Node(id='1'), Node(id='3')])
+
+    assert resolver.calls == [['1', '2'], ['3']]
+    stats = resolver.get_cache_stats()
+    assert stats['capacity'] is None
+    assert stats['size'] == 3
+    assert (stats['hits'], stats['misses'], stats['evictions']) == (1, 3, 0)
+    assert stats['hit_rate'] == 0.25
+
+
+def test_resolve_cache_evicts_least_recently_used():
+    resolver = CountingResolver(types=['Node'], cache_capacity=2)
+    resolver._resolve_internal([Node(id='1'), Node(id='2')])
+    resolver._resolve_internal([Node(id='1')])
+    resolver._resolve_internal([Node(id='3')])
+
+    assert '1' in resolver.resolve_cache
+    assert '2' not in resolver.resolve_cache
+    assert '3' in resolver.resolve_cache
+
+    id_map = resolver._resolve_internal([Node(id='2')])
+    assert id_map['2'][0].match == 'Match:2'
+    assert resolver.calls[-1] == ['2']
+    assert resolver.get_cache_stats()['evictions'] == 2
+
+
+def test_resolve_cache_capacity_zero_disables_caching():
+    resolver = CountingResolver(types=['Node'], cache_capacity=0)
+    resolver._resolve_internal([Node(id='1')])
+    resolver._resolve_internal([Node(id='1')])
+
+    assert resolver.calls == [['1'], ['1']]
+    assert len(resolver.resolve_cache) == 0
+
+
+def _behavior_fixture(no_match_behavior, multi_match_behavior):
+    resolver = TempResolver(types=['Node'], no_match_behavior=no_match_behavior,
+                            multi_match_behavior=multi_match_behavior)
+    entries = [Node(id='1', sources=['src']), Node(id='1'), Node(id='2'), Node(id='3')]
+    id_map = {
+        '1': [IdMatch('1', 'Match:1', equivalent_ids=['EC:1']),
+              IdMatch('1', 'Match:1a', equivalent_ids=['EC:1']),
+              IdMatch('1', 'Match:1a', equivalent_ids=['EC:2'])],
+        '2': [],
+        '3': [IdMatch('3', '3', equivalent_ids=['EC:3'])],
+    }
+    return resolver, entries, resolver.get_merged_map(entries, id_map)
+
+
+def test_merged_map_dedupes_repeated_ids_and_newborns():
+    _, entries, merged_map = _behavior_fixture(NoMatchBehavior.Allow, MultiMatchBehavior.All)
+
+    matched = merged_map[IdResolver.MatchKeys.matched]
+    assert list(matched) == ['1', '3']
+    assert matched['1'].sources == ['src']
+    assert matched['1'].old_id == '1'
+    assert not hasattr(matched['3'], 'old_id')
+    assert sorted(x.id_str() for x in matched['1'].xref) == ['EC:1', 'EC:2']
+    assert [n.id for n in merged_map[IdResolver.MatchKeys.newborns]['1']] == ['Match:1a']
+    assert list(merged_map[IdResolver.MatchKeys.unmatched]) == ['2']
+    assert merged_map[IdResolver.MatchKeys.unmatched]['2'].old_id == '2'
+
+
+def test_merged_map_copies_do_not_alias_inputs():
+    _, entries, merged_map = _behavior_fixture(NoMatchBehavior.Allow, MultiMatchBehavior.All)
+    matched = merged_map[IdResolver.MatchKeys.matched]['1']
+    newborn = merged_map[IdResolver.MatchKeys.newborns]['1'][0]
+
+    matched.sources.append('other')
+
+    assert entries[0].sources == ['src']
+    assert newborn.sources == ['src']
+    assert entries[0].id == '1'
+    assert not hasattr(entries[0], 'old_id')
+
+
+def test_merged_map_equivalent_ids_are_not_shared_between_merges():
+    _, _, first_map = _behavior_fixture(NoMatchBehavior.Allow, MultiMatchBehavior.All)
+    _, _, second_map = _behavior_fixture(NoMatchBehavior.Allow, MultiMatchBehavior.All)
+    first_xref = first_map[IdResolver.MatchKeys.matched]['3'].xref[0]
+    second_xref = second_map[IdResolver.MatchKeys.matched]['3'].xref[0]
+
+    first_xref.source = ['mutated']
+
+    assert first_xref is not second_xref
+    assert second_xref.source is None
+
+
+def test_flat_list_multi_match_and_no_match_behaviors():
+    expectations = [
+        (NoMatchBehavior.Allow, MultiMatchBehavior.All, ['Match:1', '3', 'Match:1a', '2']),
+        (NoMatchBehavior.Allow, MultiMatchBehavior.First, ['Match:1', '3', '2']),
+        (NoMatchBehavior.Skip, MultiMatchBehavior.All, ['Match:1', '3', 'Match:1a']),
+        (NoMatchBehavior.Skip, MultiMatchBehavior.First, ['Match:1', '3']),
+    ]
+    for no_match, multi_match, expected_ids in expectations:
+        resolver, _, merged_map = _behavior_fixture(no_match, multi_match)
+        flat = resolver.parse_flat_node_list_from_map(merged_map)
+        assert [node.id for node in flat] == expected_ids
+        assert [getattr(node, 'resolver_miss', False) for node in flat] == [i == '2' for i in expected_ids]
+
+
+def test_flat_list_error_behaviors_raise():
+    for no_match, multi_match in [(NoMatchBehavior.Error, MultiMatchBehavior.First),
+                                  (NoMatchBehavior.Skip, MultiMatchBehavior.Error)]:
+        resolver, _, merged_map = _behavior_fixture(no_match, multi_match)
+        try:
+            resolver.parse_flat_node_list_from_map(merged_map)
+        except Exception:
+            continue
+        raise AssertionError(f"expected {no_match}/{multi_match} to raise")
+
+
+def test_entity_map_behaviors():
+    resolver, _, merged_map = _behavior_fixture(NoMatchBehavior.Allow, MultiMatchBehavior.All)
+    match_map = resolver.parse_entity_map(merged_map)
+    assert {key: [n.id for n in nodes] for key, nodes in match_map.items()} == {
+        '1': ['Match:1', 'Match:1a'], '3': ['3'], '2': ['2']
+    }
+
+    resolver, _, merged_map = _behavior_fixture(NoMatchBehavior.Skip, MultiMatchBehavior.First)
+    match_map = resolver.parse_entity_map(merged_map)
+    assert {key: [n.id for n in nodes] for key, nodes in match_map.items()} == {'1': ['Match:1'], '3': ['3']}
@@ -633,3 +633,244 @@ def test_mysql_output_adapter_store_invokes_fk_diagnosis():
     table_class, rows = calls[0]
     assert table_class is AutoIncNode
     assert rows == [{"identifier": "pathway-1", "value": "demo"}]
+
+
+def _sqlite_backed_mysql_adapter():
+    from sqlalchemy import create_engine
+    from sqlalchemy.pool import StaticPool
+
+    adapter = MySQLOutputAdapter.__new__(MySQLOutputAdapter)
+    adapter._engine = create_engine("sqlite://", poolclass=StaticPool)
+    return adapter
+
+
+def _bulk_load_metadata():
+    from sqlalchemy import Column, ForeignKey, Index, Integer, MetaData, String, Table
+
+    metadata = MetaData()
+    Table(
+        "parent",
+        metadata,
+        Column("id", Integer, primary_key=True),
+        Column("name", String(64)),
+        Index("parent_name_idx", "name"),
+        Index("parent_name_uq", "name", unique=True),
+    )
+    Table(
+        "child",
+        metadata,
+        Column("id", Integer, primary_key=True),
+        Column("parent_id", Integer, ForeignKey("parent.id")),
+    )
+    return metadata
+
+
+def test_mysql_adapter_create_tables_defers_secondary_indexes_and_foreign_keys():
+    from sqlalchemy import inspect
+
+    adapter = _sqlite_backed_mysql_adapter()
+
+    adapter.create_tables(_bulk_load_metadata(), defer_indexes=True)
+
+    inspector = inspect(adapter.get_engine())
+    assert sorted(inspector.get_table_names()) == ["child", "parent"]
+    assert [index["name"] for index in inspector.get_indexes("parent")] == ["parent_name_uq"]
+    assert inspector.get_foreign_keys("child") == []
+
+
+def test_mysql_adapter_add_deferred_indexes_adds_missing_secondary_indexes():
+    from sqlalchemy import inspect
+
+    adapter = _sqlite_backed_mysql_adapter()
+    metadata = _bulk_load_metadata()
+    metadata.remove(metadata.tables["child"])
+    adapter.create_tables(metadata, defer_indexes=True)
+
+    adapter.add_deferred_indexes(metadata)
+    adapter.add_deferred_indexes(metadata)
+
+    index_names = sorted(index["name"] for index in inspect(adapter.get_engine()).get_indexes("parent"))
+    assert index_names == ["parent_name_idx", "parent_name_uq"]
+
+
+def test_mysql_adapter_describes_fk_violations_in_bulk():
+    from sqlalchemy import text
+
+    adapter = _sqlite_backed_mysql_adapter()
+    metadata = _bulk_load_metadata()
+    adapter.create_tables(metadata, defer_indexes=True)
+    with adapter.get_engine().begin() as conn:
+        conn.execute(text("INSERT INTO parent (id, name) VALUES (1, 'a')"))
+        conn.execute(text("INSERT INTO child (id, parent_id) VALUES (1, 1), (2, 7), (3, 7), (4, 9), (5, NULL)"))
+
+    fk = next(iter(metadata.tables["child"].foreign_key_constraints))
+    with adapter.get_engine().connect() as conn:
+        message = MySQLOutputAdapter._describe_fk_violations(conn, fk, sample_size=5)
+
+    assert message.startswith("child['parent_id'] -> parent: 3 orphaned rows")
+    assert "(7,)" in message
+    assert "(9,)" in message
+
+
+def test_mysql_output_adapter_finalize_schema_only_runs_in_bulk_load_mode():
+    credentials = DBCredentials(url="localhost", user="tester", password="secret", schema=None)
+    calls = []
+
+    adapter = MySQLOutputAdapter(credentials=credentials, database_name="pharos400", truncate_tables=False)
+    adapter.add_deferred_indexes = lambda metadata: calls.append(metadata)
+    adapter.do_post_processing()
+    assert calls == []
+
+    bulk_adapter = MySQLOutputAdapter(
+        credentials=credentials,
+        database_name="pharos400",
+        truncate_tables=False,
+        bulk_load=True,
+    )
+    bulk_adapter.output_converter = type("FakeConverter", (), {"sql_base": type("Base", (), {"metadata": "meta"})})()
+    bulk_adapter.add_deferred_indexes = lambda metadata: calls.append(metadata)
+    bulk_adapter.do_post_processing()
+    assert calls == ["meta"]
+
+
+def test_mysql_output_adapter_writes_chunks_concurrently_and_retries_per_chunk():
+    import threading
+
+    credentials = DBCredentials(url="localhost", user="tester", password="secret", schema=None)
+    adapter = MySQLOutputAdapter(
+        credentials=credentials,
+        database_name="pharos400",
+        truncate_tables=False,
+        insert_workers=3,
+    )
+    adapter.conversion_chunk_size = 100
+    adapter.insert_batch_size = 4
+    adapter.min_insert_batch_size = 1
+    adapter._current_adapter_stats = adapter._new_adapter_stats()
+
+    class FakeConverter:
+        def get_object_converters(self, _obj_cls):
+            return lambda obj: AutoIncNode(identifier=obj["id"], value="demo")
+
+    lock = threading.Lock()
+    overlapped = threading.Event()
+    controller = {"committed": [], "threads": set(), "failed_once": False}
+
+    class FakeSession:
+        def __init__(self):
+            self.rows = None
+
+        def execute(self, stmt, rows):
+            with lock:
+                controller["threads"].add(threading.get_ident())
+                if len(controller["threads"]) > 1:
+                    overlapped.set()
+            # hold the first writer until a second one is inside execute at the same time
+            overlapped.wait(timeout=5)
+            with lock:
+                if not controller["failed_once"] and len(rows) == 4 and rows[0]["identifier"] == "id-4":
+                    controller["failed_once"] = True
+                    raise OperationalError("stmt", rows, Exception(2006, "MySQL server has gone away"))
+            self.rows = rows
+
+        def commit(self):
+            with lock:
+                controller["committed"].extend(row["identifier"] for row in self.rows)
+
+        def rollback(self):
+            pass
+
+        def close(self):
+            pass
+
+    adapter.output_converter = FakeConverter()
+    adapter.get_session = FakeSession
+    adapter.sort_and_convert_objects = lambda _objects, keep_nested_objects=True: {
+        "AutoIncNode": ([{"id": f"id-{i}"} for i in range(20)], ["AutoIncNode"], False, None, None, object)
+    }
+
+    adapter.store(["unused"])
+
+    assert sorted(controller["committed"]) == sorted(f"id-{i}" for i in range(20))
+    assert controller["failed_once"] is True
+    assert adapter._current_adapter_stats["inserted_row_count"] == 20
+    assert len(controller["threads"]) > 1
+
+
+def test_mysql_output_adapter_keeps_ordered_inserts_for_upserts_and_self_references():
+    from sqlalchemy import Column, ForeignKey, Integer, MetaData, Table
+
+    self_ref = Table(
+        "tree",
+        MetaData(),
+        Column("id", Integer, primary_key=True),
+        Column("parent_id", Integer, ForeignKey("tree.id")),
+    )
+    SelfRef = type("SelfRef", (), {"__table__": self_ref})
+
+    assert MySQLOutputAdapter._requires_ordered_inserts(AutoIncNode, is_upsert=False) is False
+    assert MySQLOutputAdapter._requires_ordered_inserts(AutoIncNode, is_upsert=True) is True
+    assert MySQLOutputAdapter._requires_ordered_inserts(SelfRef, is_upsert=False) is True
+
+    credentials = DBCredentials(url="localhost", user="tester", password="secret", schema=None)
+    serial = MySQLOutputAdapter(credentials=credentials, database_name="pharos400", truncate_tables=False)
+    assert serial._get_chunk_writer(AutoIncNode, is_upsert=False) is None
+
+
+def test_mysql_output_adapter_replays_chunk_after_lock_conflict(monkeypatch):
+    import src.output_adapters.mysql_output_adapter as mysql_output_adapter
+
+    credentials = DBCredentials(url="localhost", user="tester", password="secret", schema=None)
+    adapter = MySQLOutputAdapter(credentials=credentials, database_name="pharos400", truncate_tables=False)
+    adapter.lock_conflict_retries = 2
+    sleeps = []
+    monkeypatch.setattr(mysql_output_adapter.time, "sleep", sleeps.append)
+    errors = [
+        OperationalError("stmt", [], Exception(1213, "Deadlock found when trying to get lock")),
+        OperationalError("stmt", [], Exception(1205, "Lock wait timeout exceeded")),
+    ]
+    executed = []
+
+    class FakeSession:
+        def execute(self, stmt, rows):
+            executed.append(rows)
+            if errors:
+                raise errors.pop(0)
+
+        def commit(self):
+            pass
+
+        def rollback(self):
+            pass
+
+        def close(self):
+            pass
+
+    adapter.get_session = FakeSession
+    stats = adapter._new_adapter_stats()
+    rows = [{"identifier": "one"}, {"identifier": "two"}]
+
+    adapter._execute_insert_chunk(object(), AutoIncNode, rows, stats)
+
+    assert executed == [rows, rows, rows]
+    assert sleeps == [0.5, 1.0]
+    assert stats["inserted_row_count"] == 2
+
+    errors.extend([OperationalError("stmt", [], Exception(1213, "Deadlock found when trying to get lock"))] * 3)
+    with pytest.raises(OperationalError):
+        adapter._execute_insert_chunk(object(), AutoIncNode, rows, stats)
+
+
+def test_mysql_output_adapter_sizes_engine_pool_to_insert_workers():
+    credentials = DBCredentials(url="localhost", user="tester", password="secret", schema=None)
+    adapter = MySQLOutputAdapter(
+        credentials=credentials,
+        database_name="pharos400",
+        truncate_tables=False,
+        insert_workers=12,
+    )
+
+    pool = adapter.get_engine().pool
+
+    assert pool.size() == 13
+    assert pool._max_overflow == 12
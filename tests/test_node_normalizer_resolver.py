@@ -1,3 +1,8 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
 import pytest
 import requests
 
@@ -182,3 +187,140 @@ def test_node_normalizer_returns_examples_for_registered_types():
         "CHEBI:15377",
         "PUBCHEM.COMPOUND:2244",
     ]
+
+
+class _StubNodeNormServer:
+    """Minimal local stand-in for the Node Normalizer HTTP API."""
+
+    def __init__(self, version="babel-1", delay_seconds=0.0):
+        self.version = version
+        self.delay_seconds = delay_seconds
+        self.posted_batches = []
+        self.request_times = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, payload, status=200):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path == "/status" and stub.version is not None:
+                    self._send_json({"status": "running", "babel_version": stub.version})
+                else:
+                    self._send_json({"detail": "not found"}, status=404)
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with lock:
+                    stub.posted_batches.append(sorted(payload["curies"]))
+                    stub.request_times.append(time.monotonic())
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                time.sleep(stub.delay_seconds)
+                with lock:
+                    stub.in_flight -= 1
+                self._send_json({curie: stub.normalize(curie) for curie in payload["curies"]})
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def normalize(self, curie):
+        if not curie.startswith("DOID:"):
+            return None
+        canonical = f"MONDO:{curie.split(':', 1)[1]}"
+        return {
+            "id": {"identifier": canonical, "label": "ignored"},
+            "equivalent_identifiers": [{"identifier": canonical}, {"identifier": curie}],
+            "type": ["biolink:Disease"],
+        }
+
+    def posted_curies(self):
+        return sorted(curie for batch in self.posted_batches for curie in batch)
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub_node_norm_server():
+    server = _StubNodeNormServer()
+    yield server
+    server.close()
+
+
+def _stub_resolver(server, **kwargs):
+    return TranslatorNodeNormResolver(
+        resolver_snapshot=_resolver_snapshot(),
+        types=["Disease"],
+        base_url=server.url,
+        max_retries=1,
+        **kwargs,
+    )
+
+
+def test_node_normalizer_runs_batches_concurrently(stub_node_norm_server):
+    stub_node_norm_server.delay_seconds = 0.1
+    resolver = _stub_resolver(stub_node_norm_server, batch_size=2, max_concurrent_requests=4)
+    ids = [f"DOID:{i}" for i in range(10)] + ["FOO:1"]
+
+    results = resolver.resolve_internal([Node(id=i) for i in ids])
+
+    assert len(stub_node_norm_server.posted_batches) == 6
+    assert 1 < stub_node_norm_server.max_in_flight <= 4
+    assert results["DOID:3"][0].match == "MONDO:3"
+    assert results["DOID:3"][0].equivalent_ids == ["MONDO:3", "DOID:3"]
+    assert results["FOO:1"] == []
+
+
+def test_node_normalizer_rate_limits_requests(stub_node_norm_server):
+    resolver = _stub_resolver(stub_node_norm_server, batch_size=1, max_concurrent_requests=4,
+                              requests_per_second=20)
+
+    resolver.resolve_internal([Node(id=f"DOID:{i}") for i in range(5)])
+
+    times = sorted(stub_node_norm_server.request_times)
+    assert len(times) == 5
+    assert times[-1] - times[0] >= 4 * 0.05 * 0.9
+
+
+def test_node_normalizer_disk_cache_only_queries_new_ids(stub_node_norm_server, tmp_path):
+    cache_path = str(tmp_path / "node_norm.sqlite")
+    first = _stub_resolver(stub_node_norm_server, cache_path=cache_path)
+    first.resolve_internal([Node(id="DOID:1"), Node(id="DOID:2"), Node(id="FOO:1")])
+    assert stub_node_norm_server.posted_curies() == ["DOID:1", "DOID:2", "FOO:1"]
+
+    stub_node_norm_server.posted_batches.clear()
+    second = _stub_resolver(stub_node_norm_server, cache_path=cache_path)
+    results = second.resolve_internal([Node(id="DOID:1"), Node(id="DOID:3"), Node(id="FOO:1")])
+    assert stub_node_norm_server.posted_curies() == ["DOID:3"]
+    assert results["DOID:1"][0].match == "MONDO:1"
+    assert results["FOO:1"] == []
+
+    stub_node_norm_server.posted_batches.clear()
+    stub_node_norm_server.version = "babel-2"
+    upgraded = _stub_resolver(stub_node_norm_server, cache_path=cache_path)
+    upgraded.resolve_internal([Node(id="DOID:1")])
+    assert stub_node_norm_server.posted_curies() == ["DOID:1"]
+
+
+def test_node_normalizer_bypasses_cache_without_service_version(stub_node_norm_server, tmp_path):
+    stub_node_norm_server.version = None
+    cache_path = str(tmp_path / "node_norm.sqlite")
+    for _ in range(2):
+        _stub_resolver(stub_node_norm_server, cache_path=cache_path).resolve_internal([Node(id="DOID:1")])
+
+    assert stub_node_norm_server.posted_curies() == ["DOID:1", "DOID:1"]
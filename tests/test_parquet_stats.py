@@ -0,0 +1,89 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import src.qa_browser.parquet_stats as parquet_stats
+from src.qa_browser import app as qa_app
+from src.qa_browser.parquet_stats import compute_parquet_stats
+
+
+def _parquet_bytes(df, **kwargs):
+    buffer = io.BytesIO()
+    df.to_parquet(buffer, **kwargs)
+    return buffer.getvalue()
+
+
+def _pandas_column_stats(df):
+    stats = []
+    for name in df.columns:
+        column = df[name]
+        info = {"name": name, "non_null": int(column.count())}
+        if column.dtype.kind in ("f", "i", "u"):
+            info.update({
+                "min": f"{column.min():.4g}",
+                "max": f"{column.max():.4g}",
+                "mean": f"{column.mean():.4g}",
+                "std": f"{column.std():.4g}",
+            })
+        else:
+            info["unique"] = int(column.nunique())
+        stats.append(info)
+    return stats
+
+
+def test_batched_stats_match_pandas_across_row_groups(monkeypatch):
+    monkeypatch.setattr(parquet_stats, "_BATCH_SIZE", 7)
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {
+            "expression": rng.normal(loc=5, scale=2, size=60),
+            "count": rng.integers(0, 100, size=60),
+            "group": rng.choice(["a", "b", "c", None], size=60),
+        },
+        index=pd.Index([f"gene{i}" for i in range(60)], name="gene"),
+    )
+    df.loc[df.index[4], "expression"] = np.nan
+
+    stats = compute_parquet_stats(io.BytesIO(_parquet_bytes(df, row_group_size=16)))
+
+    assert [{k: v for k, v in column.items() if k != "dtype"} for column in stats["columns"]] == _pandas_column_stats(df)
+    assert stats["num_rows"] == 60 and stats["num_row_groups"] == 4
+    assert stats["index_name"] == "gene" and stats["index_count"] == 60
+    assert "gene0" in stats["head"] and "gene5" not in stats["head"]
+
+
+def test_nan_values_are_skipped_like_pandas():
+    table = pa.table({"value": pa.array([1.0, float("nan"), 3.0, None])})
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer)
+    buffer.seek(0)
+
+    (column,) = compute_parquet_stats(buffer)["columns"]
+
+    assert column == {"name": "value", "dtype": "double", "non_null": 2,
+                      "min": "1", "max": "3", "mean": "2", "std": "1.414"}
+
+
+def test_stats_are_cached_per_file_etag(monkeypatch):
+    data = _parquet_bytes(pd.DataFrame({"x": [1, 2, 3]}))
+    etags = {"s3://bucket/a.parquet": "v1"}
+    downloads = []
+
+    def fake_buffer(file_ref):
+        downloads.append(file_ref)
+        return io.BytesIO(data), len(data), etags[file_ref]
+
+    monkeypatch.setattr(qa_app, "_parquet_stats_cache", {})
+    monkeypatch.setattr(qa_app, "_get_parquet_etag", lambda file_ref: etags[file_ref])
+    monkeypatch.setattr(qa_app, "_get_parquet_buffer", fake_buffer)
+
+    first = qa_app._load_parquet_stats("s3://bucket/a.parquet")
+    assert qa_app._load_parquet_stats("s3://bucket/a.parquet") is first
+    assert len(downloads) == 1
+
+    etags["s3://bucket/a.parquet"] = "v2"
+    qa_app._load_parquet_stats("s3://bucket/a.parquet")
+    assert len(downloads) == 2
@@ -0,0 +1,85 @@
+import asyncio
+import csv
+import gzip
+import io
+
+import pyarrow.parquet as pq
+
+from src.qa_browser import app as qa_app
+from src.qa_browser.app import _COLLECTION_EXPORT_ENCODERS, _stream_collection_export
+
+
+class FakeStreamCursor:
+    def __init__(self, docs):
+        self.docs = iter(docs)
+        self.pulled = 0
+        self.closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        doc = next(self.docs)
+        self.pulled += 1
+        return doc
+
+    def close(self, ignore_missing=False):
+        self.closed = True
+
+
+class FakeRequest:
+    def __init__(self, disconnect_after=None):
+        self.checks = 0
+        self.disconnect_after = disconnect_after
+
+    async def is_disconnected(self):
+        self.checks += 1
+        return self.disconnect_after is not None and self.checks > self.disconnect_after
+
+
+def _docs(count):
+    return [{"_key": str(i), "name": f"doc {i}", "tags": ["a", "b"] if i % 2 else None} for i in range(count)]
+
+
+def _export(export_format, docs, request=None):
+    cursor = FakeStreamCursor(docs)
+    encoder = _COLLECTION_EXPORT_ENCODERS[export_format](["_key", "name", "tags"])
+
+    async def collect():
+        return [chunk async for chunk in _stream_collection_export(request or FakeRequest(), cursor, encoder)]
+
+    return asyncio.run(collect()), cursor
+
+
+def test_csv_export_streams_one_chunk_per_batch(monkeypatch):
+    monkeypatch.setattr(qa_app, "_COLLECTION_EXPORT_BATCH_SIZE", 4)
+    chunks, cursor = _export("csv", _docs(10))
+
+    assert len(chunks) == 3
+    rows = list(csv.reader(io.StringIO(b"".join(chunks).decode("utf-8"))))
+    assert rows[0] == ["_key", "name", "tags"]
+    assert rows[2] == ["1", "doc 1", '["a", "b"]']
+    assert len(rows) == 11
+    assert cursor.closed
+
+
+def test_gzip_and_parquet_exports_hold_every_row(monkeypatch):
+    monkeypatch.setattr(qa_app, "_COLLECTION_EXPORT_BATCH_SIZE", 4)
+    plain, _ = _export("csv", _docs(10))
+    gzipped, _ = _export("csv.gz", _docs(10))
+    assert gzip.decompress(b"".join(gzipped)) == b"".join(plain)
+
+    chunks, _ = _export("parquet", _docs(10))
+    table = pq.read_table(io.BytesIO(b"".join(chunks)))
+    assert table.num_rows == 10
+    assert pq.ParquetFile(io.BytesIO(b"".join(chunks))).metadata.num_row_groups == 3
+    assert table.to_pylist()[0] == {"_key": "0", "name": "doc 0", "tags": None}
+
+
+def test_export_stops_pulling_and_closes_cursor_when_client_disconnects(monkeypatch):
+    monkeypatch.setattr(qa_app, "_COLLECTION_EXPORT_BATCH_SIZE", 4)
+    chunks, cursor = _export("csv", _docs(100), request=FakeRequest(disconnect_after=2))
+
+    assert cursor.pulled == 8
+    assert len(chunks) == 2
+    assert cursor.closed
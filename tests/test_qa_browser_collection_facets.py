@@ -0,0 +1,80 @@
+from src.qa_browser import app as qa_app
+from src.qa_browser.app import _build_collection_facet_panels
+
+
+class FakeCursor(list):
+    pass
+
+
+class FakeAql:
+    def __init__(self):
+        self.calls = []
+
+    def execute(self, query, bind_vars=None):
+        self.calls.append(bind_vars)
+        return FakeCursor([
+            {"field": field, "values": [{"value": f"{field}-a", "count": 5}, {"value": None, "count": 2}]}
+            for field in bind_vars["facet_fields"]
+        ])
+
+
+class FakeMetadataStore:
+    def __init__(self, doc):
+        self.doc = doc
+
+    def get(self, key):
+        return self.doc if key == "collection_facet_counts" else None
+
+
+class FakeDb:
+    def __init__(self, stored=None):
+        self.aql = FakeAql()
+        self.stored = stored
+
+    def has_collection(self, name):
+        return name == "metadata_store" and self.stored is not None
+
+    def collection(self, name):
+        return FakeMetadataStore(self.stored)
+
+
+def _panels(db, active_filters=None, search_term=""):
+    return _build_collection_facet_panels(
+        db=db,
+        db_name="pharos",
+        coll_name="Protein",
+        page_size=25,
+        category_fields=["family", "tdl", "organism"],
+        active_filters=active_filters or {},
+        search_fields=["name"],
+        search_term=search_term,
+    )
+
+
+def test_unfiltered_panels_use_counts_stored_at_build_time(monkeypatch):
+    monkeypatch.setattr(qa_app, "_facet_counts_cache", {})
+    db = FakeDb(stored={"collections": {"Protein": {"fields": {
+        "family": [{"value": "kinase", "count": 600}, {"value": None, "count": 4}],
+        "tdl": [{"value": "Tclin", "count": 700}],
+        "organism": [],
+    }}}})
+
+    panels = _panels(db)
+
+    assert db.aql.calls == []
+    family = next(panel for panel in panels if panel["field"] == "family")
+    assert [(value["label"], value["count"]) for value in family["values"]] == [("kinase", 600), ("missing", 4)]
+
+
+def test_filtered_panels_share_one_query_and_selected_fields_drop_their_own_filter(monkeypatch):
+    monkeypatch.setattr(qa_app, "_facet_counts_cache", {})
+    db = FakeDb()
+
+    panels = _panels(db, active_filters={"tdl": ["Tclin"]}, search_term="kinase")
+    _panels(db, active_filters={"tdl": ["Tclin"]}, search_term="kinase")
+
+    assert [call["facet_fields"] for call in db.aql.calls] == [["tdl"], ["family", "organism"]]
+    tdl_call, shared_call = db.aql.calls
+    assert "facet_values_0" not in tdl_call and tdl_call["search_term"] == "kinase"
+    assert shared_call["facet_values_0"] == ["Tclin"]
+    assert panels[0]["field"] == "tdl" and panels[0]["values"][0]["count"] == 5
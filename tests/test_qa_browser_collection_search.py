@@ -0,0 +1,51 @@
+from src.qa_browser import app as qa_app
+from src.qa_browser.app import _collection_loop, _collection_sort
+
+
+def test_search_with_view_iterates_view_and_ranks_by_bm25():
+    bind_vars = {}
+
+    loop, ranked = _collection_loop(
+        "Protein", {"tdl": ["Tclin"]}, ["name", "symbol"], "kinase inhib", bind_vars, search_view="qa_browser_search"
+    )
+
+    assert ranked
+    assert "FOR doc IN `qa_browser_search`" in loop and "`Protein`" not in loop
+    assert 'TOKENS(@search_term, "qa_browser_text")' in loop
+    assert "STARTS_WITH(doc[@search_field_1], search_tokens, LENGTH(search_tokens))" in loop
+    assert "FILTER" in loop and "@facet_values_0" in loop
+    assert bind_vars["search_term"] == "kinase inhib"
+    assert bind_vars["search_collection"] == "Protein"
+    assert [bind_vars["search_field_0"], bind_vars["search_field_1"]] == ["name", "symbol"]
+    assert _collection_sort(ranked) == "SORT BM25(doc) DESC, doc._key ASC"
+
+
+def test_search_falls_back_to_substring_scan_without_view_or_word_tokens():
+    for search_view, term in [(None, "kinase"), ("qa_browser_search", "--"), ("qa_browser_search", "")]:
+        bind_vars = {}
+        loop, ranked = _collection_loop("Protein", {}, ["name"], term, bind_vars, search_view=search_view)
+
+        assert not ranked
+        assert loop.startswith("FOR doc IN `Protein`")
+        assert ("CONTAINS(LOWER(TO_STRING(" in loop) == bool(term)
+        assert "search_collection" not in bind_vars
+
+
+class FakeMetadataStore:
+    def get(self, key):
+        return {"collections": {"Protein": {"search_metadata": {"text_fields": ["name"], "search_view": "qa_browser_search"}}}}
+
+
+class FakeDb:
+    def has_collection(self, name):
+        return True
+
+    def collection(self, name):
+        return FakeMetadataStore()
+
+
+def test_search_view_is_only_used_for_fields_recorded_by_the_build():
+    assert qa_app._get_collection_search_metadata(FakeDb(), "Protein") == {
+        "text_fields": ["name"],
+        "search_view": "qa_browser_search",
+    }
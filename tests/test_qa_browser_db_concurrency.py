@@ -0,0 +1,132 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.qa_browser import app as qa_app
+from src.qa_browser.db_concurrency import BackendBusy, BackendLimiter, ConsoleQueries, run_until_disconnect
+
+
+def test_backend_limiter_raises_busy_when_no_slot_frees_up():
+    limiter = BackendLimiter()
+
+    async def run():
+        async with limiter.slot("arango", 1, timeout=1):
+            with pytest.raises(BackendBusy) as excinfo:
+                async with limiter.slot("arango", 1, timeout=0.01):
+                    pass
+            # other backends have their own slots
+            async with limiter.slot("mysql:default", 1, timeout=0.01):
+                pass
+        return excinfo.value.backend
+
+    assert asyncio.run(run()) == "arango"
+
+
+def test_console_queries_cancel_marks_query_cancelled_once():
+    queries = ConsoleQueries()
+    killed = []
+    queries.register("q1", lambda: killed.append("q1"))
+
+    assert queries.cancel("q1") is True
+    assert queries.cancel("q1") is False
+    assert killed == ["q1"]
+    assert queries.unregister("q1") is True
+    assert queries.unregister("q1") is False
+
+
+def test_console_queries_cancel_survives_failing_kill():
+    queries = ConsoleQueries()
+
+    def kill():
+        raise RuntimeError("query already finished")
+
+    queries.register("q1", kill)
+    assert queries.cancel("q1") is True
+    queries.register("q2", lambda: None)
+    assert queries.unregister("q2") is False
+    assert queries.cancel("unknown") is False
+
+
+def test_request_backend_maps_database_paths(monkeypatch):
+    monkeypatch.setattr(qa_app, "_mysql_sources", {"default": {}})
+
+    assert qa_app._request_backend("/db/pounce/collection/Gene") == ("arango", qa_app._ARANGO_CONCURRENCY)
+    assert qa_app._request_backend("/mysql/default/pharos/table/target") == (
+        "mysql:default", qa_app._MYSQL_CONCURRENCY)
+    assert qa_app._request_backend("/mysql/pharos/sql")[0] == "mysql:"
+    assert qa_app._request_backend("/db/pounce/aql/cancel") is None
+    assert qa_app._request_backend("/mysql/default/pharos/sql/cancel") is None
+    assert qa_app._request_backend("/qa-browser") is None
+
+
+class _FakeRequest:
+    def __init__(self, disconnected):
+        self.disconnected = disconnected
+
+    async def is_disconnected(self):
+        return self.disconnected
+
+
+def test_run_until_disconnect_cancels_when_client_goes_away():
+    release = threading.Event()
+    cancelled = []
+
+    def query():
+        release.wait(5)
+        return "stopped" if cancelled else "finished"
+
+    def on_disconnect():
+        cancelled.append(True)
+        release.set()
+
+    result = asyncio.run(run_until_disconnect(_FakeRequest(True), query, on_disconnect, poll_seconds=0.01))
+
+    assert cancelled == [True]
+    assert result == "stopped"
+
+
+def test_run_until_disconnect_returns_result_for_connected_client():
+    cancelled = []
+    result = asyncio.run(
+        run_until_disconnect(_FakeRequest(False), lambda: [1, 2], lambda: cancelled.append(True), poll_seconds=0.01)
+    )
+
+    assert result == [1, 2]
+    assert cancelled == []
+
+
+class _FakeAql:
+    def __init__(self, running):
+        self.running = running
+        self.killed = []
+
+    def queries(self):
+        return self.running
+
+    def kill(self, query_id):
+        self.killed.append(query_id)
+
+
+class _FakeDb:
+    def __init__(self, running):
+        self.aql = _FakeAql(running)
+
+
+def test_kill_aql_console_query_only_kills_tagged_query(monkeypatch):
+    db = _FakeDb([
+        {"id": "11", "query": "/* qa-browser-console:abc */\nFOR d IN Gene RETURN d"},
+        {"id": "12", "query": "/* qa-browser-console:other */\nFOR d IN Gene RETURN d"},
+        {"id": "13", "query": "FOR d IN Protein RETURN d"},
+    ])
+    monkeypatch.setattr(qa_app, "get_db", lambda db_name: db)
+
+    qa_app._kill_aql_console_query("pounce", "abc")
+
+    assert db.aql.killed == ["11"]
+
+
+def test_console_query_id_replaces_unusable_ids():
+    assert qa_app._console_query_id("abc-123") == "abc-123"
+    assert qa_app._console_query_id("*/ RETURN 1 /*") != "*/ RETURN 1 /*"
+    assert len(qa_app._console_query_id("")) == 32
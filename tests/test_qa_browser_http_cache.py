@@ -0,0 +1,193 @@
+import asyncio
+import json
+import re
+from datetime import datetime, timezone
+
+from src.qa_browser import app as qa_app
+from src.qa_browser.http_cache import CachedResponse, ResponseCache, is_not_modified, make_validator
+
+
+def _get(path, headers=()):
+    async def run():
+        messages = []
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "root_path": "",
+            "query_string": b"",
+            "headers": [(name.lower().encode(), value.encode()) for name, value in headers],
+            "client": ("testclient", 50000),
+            "server": ("testserver", 80),
+        }
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            messages.append(message)
+
+        await qa_app.app(scope, receive, send)
+        return messages
+
+    messages = asyncio.run(run())
+    start = messages[0]
+    body = b"".join(message.get("body", b"") for message in messages[1:])
+    return start["status"], {k.decode(): v.decode() for k, v in start["headers"]}, body
+
+
+def _disease_release(tmp_path, monkeypatch, version="1.0.0"):
+    release = tmp_path / "disease_app_graph" / "v1.0.0"
+    release.mkdir(parents=True, exist_ok=True)
+    (release / "manifest.json").write_text(json.dumps({"pipeline_version": version}))
+    monkeypatch.setattr(qa_app, "_disease_graph_dir", str(release))
+    monkeypatch.setattr(qa_app, "DISEASE_APP_GRAPH_BUNDLED_DIR", tmp_path / "bundled")
+    monkeypatch.setattr(qa_app, "_http_validator_memo", {})
+    monkeypatch.setattr(qa_app, "_response_cache", ResponseCache(1024 * 1024))
+    return release
+
+
+def test_validator_matching_follows_if_none_match_before_if_modified_since():
+    validator = make_validator(["run-1"], datetime(2026, 5, 1, 12, 0, 30, 250000, tzinfo=timezone.utc))
+    opaque = validator.etag[2:]
+
+    assert is_not_modified({"if-none-match": f'"other", {opaque}'}, validator)
+    assert is_not_modified({"if-none-match": "*"}, validator)
+    assert not is_not_modified(
+        {"if-none-match": '"other"', "if-modified-since": "Fri, 01 May 2026 12:00:30 GMT"}, validator
+    )
+    assert is_not_modified({"if-modified-since": "Fri, 01 May 2026 12:00:30 GMT"}, validator)
+    assert not is_not_modified({"if-modified-since": "Fri, 01 May 2026 12:00:29 GMT"}, validator)
+    assert not is_not_modified({"if-modified-since": "yesterday"}, validator)
+
+
+def test_response_cache_evicts_least_recently_used_past_byte_budget():
+    cache = ResponseCache(max_bytes=10)
+    cache.put("a", CachedResponse(b"12345"))
+    cache.put("b", CachedResponse(b"12345"))
+    assert cache.get("a") is not None
+    cache.put("c", CachedResponse(b"123"))
+
+    assert cache.get("b") is None
+    assert cache.get("a").body == b"12345"
+    cache.put("huge", CachedResponse(b"x" * 11))
+    assert cache.get("huge") is None and len(cache) == 2
+
+
+def test_disease_api_revalidates_and_serves_repeat_views_without_the_route(tmp_path, monkeypatch):
+    release = _disease_release(tmp_path, monkeypatch)
+    calls = []
+    pair = qa_app._default_disease_version_pair
+    monkeypatch.setattr(qa_app, "_default_disease_version_pair", lambda versions: calls.append(1) or pair(versions))
+
+    status, headers, body = _get("/disease-id-qa/api/versions")
+    assert status == 200 and json.loads(body)["versions"][0]["version"] == "1.0.0"
+    etag = headers["etag"]
+    assert etag.startswith('W/"') and headers["cache-control"] == "no-cache"
+    assert "last-modified" in headers and "HX-Request" in headers["vary"]
+
+    status, headers, body = _get("/disease-id-qa/api/versions", [("If-None-Match", etag)])
+    assert (status, body, headers["etag"]) == (304, b"", etag)
+    status, _, cached_body = _get("/disease-id-qa/api/versions")
+    assert status == 200 and json.loads(cached_body)["versions"][0]["version"] == "1.0.0"
+    assert len(calls) == 1
+
+    (release / "manifest.json").write_text(json.dumps({"pipeline_version": "1.0.10"}))
+    qa_app._http_validator_memo.clear()
+    status, headers, body = _get("/disease-id-qa/api/versions", [("If-None-Match", etag)])
+    assert status == 200 and headers["etag"] != etag
+    assert json.loads(body)["versions"][0]["version"] == "1.0.10"
+    assert len(calls) == 2
+
+
+def test_htmx_fragment_and_full_page_get_different_etags(tmp_path, monkeypatch):
+    _disease_release(tmp_path, monkeypatch)
+
+    _, page_headers, _ = _get("/disease-id-qa/api/versions")
+    _, fragment_headers, _ = _get("/disease-id-qa/api/versions", [("HX-Request", "true")])
+
+    assert page_headers["etag"] != fragment_headers["etag"]
+
+
+class FakeAql:
+    def __init__(self, row):
+        self.row = row
+
+    def execute(self, query, bind_vars=None):
+        return iter([self.row])
+
+
+class FakeDb:
+    def __init__(self, row):
+        self.aql = FakeAql(row)
+
+    def has_collection(self, name):
+        return True
+
+
+def test_arango_build_token_is_withheld_while_a_build_is_running(monkeypatch):
+    finished = {"run_id": "r1", "last_updated": "2026-05-01T10:00:00+00:00", "run_date": "2026-05-01T10:30:00+00:00"}
+    running = {**finished, "last_updated": "2026-05-01T11:00:00+00:00"}
+
+    monkeypatch.setattr(qa_app, "get_db", lambda name: FakeDb(finished))
+    assert qa_app._arango_build_token("pharos") == ("r1", finished["last_updated"], finished["run_date"])
+    monkeypatch.setattr(qa_app, "get_db", lambda name: FakeDb(running))
+    assert qa_app._arango_build_token("pharos") is None
+    monkeypatch.setattr(qa_app, "get_db", lambda name: FakeDb({}))
+    assert qa_app._arango_build_token("pharos") is None
+
+
+def test_only_data_changing_posts_invalidate_and_only_their_scope(tmp_path, monkeypatch):
+    _disease_release(tmp_path, monkeypatch)
+    monkeypatch.setattr(qa_app, "_http_scope_generations", {})
+    calls = []
+    pair = qa_app._default_disease_version_pair
+    monkeypatch.setattr(qa_app, "_default_disease_version_pair", lambda versions: calls.append(1) or pair(versions))
+
+    assert qa_app._http_cache_invalidation("POST", "/db/pharos/aql") is None
+    assert qa_app._http_cache_invalidation("POST", "/api/v1/disease/bulk-resolve") is None
+    assert qa_app._http_cache_invalidation("GET", "/registry/update-status") is None
+    assert qa_app._http_cache_invalidation("POST", "/registry/update-status") == "registry"
+    assert qa_app._http_cache_invalidation("POST", "/mysql/default/pharos/refresh-schema") == "mysql_schema"
+
+    _, headers, _ = _get("/disease-id-qa/api/versions")
+    qa_app._response_cache.put(("registry", "/registry", "", "W/\"r\""), CachedResponse(b"registry page"))
+    qa_app._invalidate_http_validators("registry")
+
+    assert qa_app._response_cache.get(("registry", "/registry", "", "W/\"r\"")) is None
+    status, cached_headers, _ = _get("/disease-id-qa/api/versions")
+    assert status == 200 and cached_headers["etag"] == headers["etag"]
+    assert len(calls) == 1
+
+
+def test_page_rendered_without_a_prior_validator_is_not_cached(tmp_path, monkeypatch):
+    _disease_release(tmp_path, monkeypatch)
+    validators = [None, make_validator(["filled by the render"])]
+    monkeypatch.setattr(qa_app, "_http_validator_or_none", lambda request, name, params: validators.pop(0))
+
+    status, headers, _ = _get("/disease-id-qa/api/versions")
+
+    assert status == 200 and "etag" not in headers
+    assert len(qa_app._response_cache) == 0
+    assert len(validators) == 1
+
+
+def test_query_console_pages_are_never_cached(tmp_path, monkeypatch):
+    _disease_release(tmp_path, monkeypatch)
+    finished = {"run_id": "r1", "last_updated": "2026-05-01T10:00:00+00:00", "run_date": "2026-05-01T10:30:00+00:00"}
+    monkeypatch.setattr(qa_app, "get_db", lambda name: FakeDb(finished))
+
+    assert qa_app._http_cache_scope("/db/pharos") is not None
+    assert qa_app._http_cache_scope("/db/pharos/aql") is None
+    assert qa_app._http_cache_scope("/db/pharos/aql/cancel") is None
+
+    pages = [_get("/db/pharos/aql") for _ in range(2)]
+    query_ids = [re.search(rb'name="query_id" value="([0-9a-f]+)"', body).group(1) for _, _, body in pages]
+
+    assert all(status == 200 and "etag" not in headers for status, headers, _ in pages)
+    assert query_ids[0] != query_ids[1]
+    assert len(qa_app._response_cache) == 0
@@ -0,0 +1,92 @@
+import os
+
+from sqlalchemy import create_engine
+
+from src.id_resolvers.ramp_metabolite_resolver import RampMetaboliteIdResolver
+from src.input_adapters.sqlite_ramp.tables import Source
+from src.models.node import Node
+
+
+def _ramp_sqlite(tmp_path):
+    path = tmp_path / "ramp.sqlite"
+    engine = create_engine(f"sqlite:///{path}")
+    Source.__table__.create(engine)
+    rows = [
+        ("hmdb:HMDB0000001", "RAMP_C_1", "hmdb", "compound", "hmdb"),
+        ("chebi:15377", "RAMP_C_1", "chebi", "compound", "chebi"),
+        ("hmdb:HMDB0000001", "RAMP_C_1", "hmdb", "compound", "kegg"),
+        ("pubchem:962", "RAMP_C_2", "pubchem", "compound", "hmdb"),
+        ("ensembl:ENSG1", "RAMP_G_1", "ensembl", "gene", "hmdb"),
+    ]
+    with engine.begin() as conn:
+        conn.execute(Source.__table__.insert(), [
+            {"sourceId": s, "rampId": r, "IDtype": t, "geneOrCompound": g, "dataSource": d,
+             "priorityHMDBStatus": "", "pathwayCount": 0}
+            for s, r, t, g, d in rows
+        ])
+    engine.dispose()
+    return str(path)
+
+
+def _as_tuples(result):
+    return {
+        key: [(m.match, tuple(m.equivalent_ids), tuple(m.context)) for m in matches]
+        for key, matches in result.items()
+    }
+
+
+def test_resolves_source_ids_from_snapshot(tmp_path):
+    sqlite_file = _ramp_sqlite(tmp_path)
+    nodes = [Node(id=i) for i in ["HMDB:HMDB0000001", "CHEBI:15377", "RAMP_C_2", "ensembl:ENSG1", "unknown:1"]]
+
+    resolver = RampMetaboliteIdResolver(sqlite_file, snapshot_dir=str(tmp_path / "snapshots"), types=["Metabolite"])
+
+    assert _as_tuples(resolver.resolve_internal(nodes)) == {
+        "HMDB:HMDB0000001": [("RAMP_C_1", ("hmdb:HMDB0000001", "chebi:15377"), ("sourceId",))],
+        "CHEBI:15377": [("RAMP_C_1", ("hmdb:HMDB0000001", "chebi:15377"), ("sourceId",))],
+        "RAMP_C_2": [("RAMP_C_2", ("pubchem:962",), ("exact",))],
+        "ensembl:ENSG1": [],
+        "unknown:1": [],
+    }
+
+
+def test_lookups_are_served_from_lru_after_first_query(tmp_path, monkeypatch):
+    sqlite_file = _ramp_sqlite(tmp_path)
+    resolver = RampMetaboliteIdResolver(sqlite_file, snapshot_dir=str(tmp_path / "snapshots"),
+                                        lookup_cache_capacity=2, types=["Metabolite"])
+    queried = []
+    query_snapshot = resolver._query_snapshot
+
+    def counting_query(query, keys):
+        queried.append(list(keys))
+        return query_snapshot(query, keys)
+
+    monkeypatch.setattr(resolver, "_query_snapshot", counting_query)
+
+    first = resolver.resolve_internal([Node(id="chebi:15377"), Node(id="unknown:1")])
+    assert queried == [["chebi:15377", "unknown:1"], ["RAMP_C_1"]]
+
+    queried.clear()
+    assert resolver.resolve_internal([Node(id="chebi:15377"), Node(id="unknown:1")]) == first
+    assert queried == []
+
+    resolver.resolve_internal([Node(id="pubchem:962")])
+    assert queried == [["pubchem:962"], ["RAMP_C_2"]]
+    assert len(resolver.ramp_id_cache) == 2
+    assert resolver.get_cache_stats()["ramp_ids"]["evictions"] == 1
+
+
+def test_snapshot_is_reused_by_later_instances(tmp_path, monkeypatch):
+    sqlite_file = _ramp_sqlite(tmp_path)
+    snapshot_dir = str(tmp_path / "snapshots")
+    first = RampMetaboliteIdResolver(sqlite_file, snapshot_dir=snapshot_dir, types=["Metabolite"])
+    assert os.stat(first.snapshot_path).st_mode & 0o777 == 0o444
+
+    def fail_export(self, path):
+        raise AssertionError("snapshot should have been reused")
+
+    monkeypatch.setattr(RampMetaboliteIdResolver, "export_snapshot", fail_export)
+    second = RampMetaboliteIdResolver(sqlite_file, snapshot_dir=snapshot_dir, types=["Metabolite"])
+
+    assert second.snapshot_path == first.snapshot_path
+    assert second.resolve_internal([Node(id="pubchem:962")])["pubchem:962"][0].match == "RAMP_C_2"
@@ -0,0 +1,178 @@
+import sqlite3
+
+import pytest
+
+from src.id_resolvers.sqlite_cache_resolver import MatchingPair, SqliteCacheResolver
+from src.models.node import Node
+
+
+class _StreamingResolver(SqliteCacheResolver):
+    populate_chunk_size = 3
+
+    def __init__(self, cache_path, pairs, version="v1", **kwargs):
+        self.cache_path = str(cache_path)
+        self.pairs = pairs
+        self.version = version
+        self.populate_calls = 0
+        super().__init__(**kwargs)
+
+    def cache_location(self):
+        return self.cache_path
+
+    def get_version_info(self) -> str:
+        return self.version
+
+    def matching_ids(self):
+        self.populate_calls += 1
+        yield from self.pairs
+
+
+def _pairs():
+    return [
+        MatchingPair("IFXProtein:1", "IFXProtein:1", "exact"),
+        MatchingPair("IFXProtein:1", "UniProtKB:P1", "UniProtKB"),
+        MatchingPair("IFXProtein:1", "UniProtKB:P1", "UniProtKB"),
+        MatchingPair("IFXProtein:1", "Symbol:ABC1", "Symbol"),
+        MatchingPair("IFXProtein:2", "IFXProtein:2", "exact"),
+        MatchingPair("IFXProtein:2", "Symbol:ABC1", "Symbol"),
+        MatchingPair("IFXProtein:2", "Symbol:ABC1", "Symbol"),
+    ]
+
+
+def test_populate_streams_deduplicates_and_indexes(tmp_path):
+    resolver = _StreamingResolver(tmp_path / "resolver.sqlite", _pairs(), types=["Protein"])
+
+    rows = resolver.connection.execute("SELECT id, match, type FROM matches").fetchall()
+    indexes = {row[0] for row in resolver.connection.execute(
+        "SELECT name FROM sqlite_master WHERE type='index' AND tbl_name='matches'")}
+    version = resolver.connection.execute("SELECT version_key FROM file_metadata").fetchall()
+
+    assert sorted(rows) == sorted({(p.id, p.match, p.type) for p in _pairs()})
+    assert {"id_index", "match_index"} <= indexes
+    assert version == [("v1",)]
+    assert resolver.connection.execute("PRAGMA synchronous").fetchone()[0] == 1
+
+    matches = resolver.resolve_internal([Node(id="Symbol:ABC1"), Node(id="UniProtKB:P1")])
+    assert sorted(m.match for m in matches["Symbol:ABC1"]) == ["IFXProtein:1", "IFXProtein:2"]
+    assert sorted(matches["UniProtKB:P1"][0].equivalent_ids) == ["IFXProtein:1", "Symbol:ABC1", "UniProtKB:P1"]
+
+
+def test_populate_reuses_cache_until_version_changes(tmp_path):
+    cache_path = tmp_path / "resolver.sqlite"
+    first = _StreamingResolver(cache_path, _pairs(), types=["Protein"])
+    second = _StreamingResolver(cache_path, _pairs(), types=["Protein"])
+    third = _StreamingResolver(cache_path, _pairs()[:1], version="v2", types=["Protein"])
+
+    assert first.populate_calls == 1
+    assert second.populate_calls == 0
+    assert third.populate_calls == 1
+    assert third.connection.execute("SELECT COUNT(*) FROM matches").fetchone()[0] == 1
+
+
+def test_interrupted_populate_leaves_cache_marked_stale(tmp_path):
+    def failing_pairs():
+        yield from _pairs()
+        raise RuntimeError("source read failed")
+
+    cache_path = tmp_path / "resolver.sqlite"
+    with pytest.raises(RuntimeError):
+        _StreamingResolver(cache_path, failing_pairs(), types=["Protein"])
+
+    with sqlite3.connect(cache_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM matches").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM file_metadata").fetchone()[0] == 0
+
+    resolver = _StreamingResolver(cache_path, _pairs(), types=["Protein"])
+    assert resolver.populate_calls == 1
+
+
+def _sorted_matches(result):
+    return {
+        input_id: sorted((m.match, m.context[0], tuple(sorted(m.equivalent_ids))) for m in matches)
+        for input_id, matches in result.items()
+    }
+
+
+def test_lookup_strategies_return_identical_matches(tmp_path):
+    nodes = [Node(id=i) for i in ["Symbol:ABC1", "UniProtKB:P1", "IFXProtein:2", "Missing:1"]]
+    temp_table = _StreamingResolver(tmp_path / "resolver.sqlite", _pairs(), types=["Protein"])
+    in_list = _StreamingResolver(tmp_path / "resolver.sqlite", _pairs(), types=["Protein"], lookup_strategy="in_list")
+    in_list.max_lookup_vars = 2
+
+    expected = _sorted_matches(in_list.resolve_internal(nodes))
+
+    assert temp_table.lookup_strategy == "temp_table"
+    assert _sorted_matches(temp_table.resolve_internal(nodes)) == expected
+    assert set(expected) == {"Symbol:ABC1", "UniProtKB:P1", "IFXProtein:2"}
+    assert temp_table.resolve_internal([]) == {}
+    assert temp_table.read_connection().execute("SELECT COUNT(*) FROM temp.lookup_keys").fetchone()[0] == 0
+
+
+def test_unknown_lookup_strategy_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="lookup_strategy"):
+        _StreamingResolver(tmp_path / "resolver.sqlite", _pairs(), types=["Protein"], lookup_strategy="bogus")
+
+
+def test_concurrent_readers_share_cache_directory(tmp_path):
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    pairs = [MatchingPair(f"IFXProtein:{i}", f"Symbol:S{i}", "Symbol") for i in range(500)]
+    pairs += [MatchingPair(f"IFXProtein:{i}", f"IFXProtein:{i}", "exact") for i in range(500)]
+    resolvers = [
+        _StreamingResolver(tmp_path / "resolver.sqlite", pairs, types=["Protein"], lookup_strategy=strategy)
+        for strategy in ("temp_table", "in_list")
+    ]
+    assert [r.populate_calls for r in resolvers] == [1, 0]
+
+    connections = set()
+    connections_lock = threading.Lock()
+
+    def resolve(worker):
+        resolver = resolvers[worker % len(resolvers)]
+        with connections_lock:
+            connections.add(id(resolver.read_connection()))
+        results = []
+        for round_number in range(20):
+            ids = [f"Symbol:S{(worker * 37 + round_number * 11 + j) % 550}" for j in range(50)]
+            matched = resolver.resolve_nodes([Node(id=i) for i in ids])
+            results.append(sorted((old_id, node.id) for old_id, node in
+                                  matched[resolver.MatchKeys.matched].items()))
+        return results
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        concurrent_results = list(executor.map(resolve, range(16)))
+
+    for resolver in resolvers:
+        resolver.resolve_cache.clear()
+    serial_results = [resolve(worker) for worker in range(16)]
+
+    assert concurrent_results == serial_results
+    assert len(connections) >= 2
+    for worker_results in concurrent_results:
+        for round_results in worker_results:
+            for old_id, new_id in round_results:
+                assert new_id == f"IFXProtein:{old_id.split(':S')[1]}"
+
+
+def test_snapshot_is_exported_once_and_opened_read_only(tmp_path):
+    snapshot_dir = str(tmp_path / "snapshots")
+    builder = _StreamingResolver(tmp_path / "build.sqlite", _pairs(), types=["Protein"], snapshot_dir=snapshot_dir)
+    reader = _StreamingResolver(tmp_path / "other.sqlite", _pairs(), types=["Protein"], snapshot_dir=snapshot_dir)
+
+    assert builder.populate_calls == 1
+    assert reader.populate_calls == 0
+    assert reader.connection is None
+    assert not (tmp_path / "other.sqlite").exists()
+    assert reader.snapshot_path == builder.snapshot_path
+
+    nodes = [Node(id="Symbol:ABC1"), Node(id="UniProtKB:P1")]
+    assert _sorted_matches(reader.resolve_internal(nodes)) == _sorted_matches(builder.resolve_internal(nodes))
+    assert {"prefix": "Symbol", "count": 1} in reader.get_prefix_counts()
+    with pytest.raises(sqlite3.OperationalError):
+        reader.read_connection().execute("DELETE FROM matches")
+
+    changed = _StreamingResolver(tmp_path / "build.sqlite", _pairs(), version="v2", types=["Protein"],
+                                 snapshot_dir=snapshot_dir)
+    assert changed.snapshot_path != builder.snapshot_path
+    assert changed.populate_calls == 1
@@ -2,6 +2,7 @@ from concurrent.futures import ThreadPoolExecutor
 
 from src.constants import Prefix
 from src.id_resolvers.sqlite_cache_resolver import MatchingPair, SqliteCacheResolver
+from src.id_resolvers.target_match_index import TargetMatchIndex
 from src.id_resolvers.target_graph_resolver import TCRDTargetResolver
 from src.models.node import EquivalentId
 
@@ -187,3 +188,250 @@ def test_tcrd_target_resolver_drops_isoforms_without_canonical_target():
     assert MatchingPair("IFXProtein:CANONICAL", "UniProtKB:P99998-2", "UniProtKB") not in matches
     assert MatchingPair("IFXProtein:CANONICAL", "ENSEMBL:ENST000002", "ENSEMBL") not in matches
     assert MatchingPair("IFXProtein:CANONICAL", "NCBIGene:200", "NCBIGene") not in matches
+
+
+class _LegacyTCRDTargetResolver(TCRDTargetResolver):
+    """The dict-of-sets matching_ids TCRDTargetResolver used before the compact index, kept as a reference."""
+
+    def matching_ids(self):
+        transcript_ids, transcript_id_idx, transcript_gene_map = self.get_transcript_ids()
+
+        gene_ids, gene_ids_idx = self.get_gene_ids()
+        protein_ids, protein_transcript_map, protein_gene_map = self.get_protein_ids(
+            self.reviewed_only, self.collapse_to_canonical
+        )
+
+        missing_transcripts = set()
+        missing_genes = set()
+        missing_t_genes = set()
+
+        for protein_ifx_id in protein_ids.keys():
+            if protein_ifx_id in protein_transcript_map and len(protein_transcript_map[protein_ifx_id]) > 0:
+                for match in protein_transcript_map[protein_ifx_id]:
+                    if match not in transcript_id_idx:
+                        missing_transcripts.add(match)
+                    else:
+                        transcript_ifx_ids = transcript_id_idx[match]
+                        for transcript_ifx_id in transcript_ifx_ids:
+                            if transcript_ifx_id in transcript_gene_map:
+                                for gene_alias in transcript_gene_map[transcript_ifx_id]:
+                                    if gene_alias not in gene_ids_idx:
+                                        missing_t_genes.add(gene_alias)
+                                    else:
+                                        gene_ifx_ids = gene_ids_idx[gene_alias]
+                                        for gene_ifx_id in gene_ifx_ids:
+                                            equivalent_ids = gene_ids[gene_ifx_id]
+                                            for gene_alias in equivalent_ids:
+                                                protein_ids[protein_ifx_id].add(MatchingPair(id=protein_ifx_id, match=gene_alias.match, type=gene_alias.type))
+
+                            equivalent_ids = transcript_ids[transcript_ifx_id]
+                            for transcript_alias in equivalent_ids:
+                                protein_ids[protein_ifx_id].add(MatchingPair(id=protein_ifx_id, match=transcript_alias.match, type=transcript_alias.type))
+
+            if protein_ifx_id in protein_gene_map and len(protein_gene_map[protein_ifx_id]) > 0:
+                for match in protein_gene_map[protein_ifx_id]:
+                    if match not in gene_ids_idx:
+                        missing_genes.add(match)
+                    else:
+                        gene_ifx_ids = gene_ids_idx[match]
+                        for gene_ifx_id in gene_ifx_ids:
+                            equivalent_ids = gene_ids[gene_ifx_id]
+                            for gene_alias in equivalent_ids:
+                                protein_ids[protein_ifx_id].add(MatchingPair(id=protein_ifx_id, match=gene_alias.match, type=gene_alias.type))
+
+
+
+
+        for p in protein_ids.keys():
+            for match in protein_ids[p]:
+                yield match
+
+    def get_gene_ids(self):
+        gene_map = {}
+        gene_id_idx = {}
+
+        for line in self.gene_parser.all_rows():
+            gene_id = self.gene_parser.get_id(line)
+
+            equiv_ids = self.gene_parser.get_equivalent_ids(line)
+            ids = [MatchingPair(id=gene_id, match=gene_id, type='exact')]
+            for equiv_ids in equiv_ids:
+                equiv_id_str = equiv_ids.id_str()
+                ids.append(MatchingPair(id=gene_id, match=equiv_id_str, type=equiv_ids.type.value))
+                if equiv_id_str not in gene_id_idx:
+                    gene_id_idx[equiv_id_str] = set()
+                gene_id_idx[equiv_id_str].add(gene_id)
+            gene_map[gene_id] = set(ids)
+
+        return gene_map, gene_id_idx
+
+    def get_protein_ids(self, reviewed_only: bool, collapse_to_canonical: bool):
+        protein_ids = {}
+        protein_transcript_map = {}
+        protein_gene_map = {}
+        protein_rows = []
+        canonical_protein_ids = set()
+
+        for parser in self.protein_parsers:
+            for line in parser.all_rows():
+                if reviewed_only and not parser.get_uniprot_reviewed(line):
+                    continue
+                protein_id = parser.get_id(line)
+                is_canonical = parser.get_is_canonical(line) is True
+                if is_canonical or not collapse_to_canonical:
+                    canonical_protein_ids.add(protein_id)
+                protein_rows.append((parser, line, protein_id, is_canonical))
+
+        for parser, line, protein_id, is_canonical in protein_rows:
+            target_protein_id = protein_id
+            if collapse_to_canonical and not is_canonical:
+                canonical_protein_id = parser.get_isoform_id(line)
+                if canonical_protein_id not in canonical_protein_ids:
+                    continue
+                target_protein_id = canonical_protein_id
+
+            if target_protein_id not in protein_transcript_map:
+                protein_transcript_map[target_protein_id] = set()
+            if target_protein_id not in protein_gene_map:
+                protein_gene_map[target_protein_id] = set()
+
+            if target_protein_id not in protein_ids:
+                protein_ids[target_protein_id] = set()
+
+            match_type = 'exact' if target_protein_id == protein_id else 'isoform'
+            protein_ids[target_protein_id].add(
+                MatchingPair(id=target_protein_id, match=protein_id, type=match_type)
+            )
+
+            for equiv_id in parser.get_equivalent_ids(line):
+                protein_ids[target_protein_id].add(
+                    MatchingPair(id=target_protein_id, match=equiv_id.id_str(), type=equiv_id.type.value)
+                )
+
+            transcript_ids = parser.get_transcript_ids(line)
+            gene_id = parser.get_gene_id(line)
+
+            for transcript_id in transcript_ids:
+                transcript_id_to_use = EquivalentId(id=transcript_id, type=Prefix.ENSEMBL).id_str()
+                protein_transcript_map[target_protein_id].add(transcript_id_to_use)
+
+            if gene_id is not None:
+                gene_id_to_use = EquivalentId(id=gene_id, type=Prefix.NCBIGene).id_str()
+                protein_gene_map[target_protein_id].add(gene_id_to_use)
+
+        return protein_ids, protein_transcript_map, protein_gene_map
+
+    def get_transcript_ids(self):
+        transcript_gene_map = {}
+        transcript_id_idx = {}
+        transcript_ids = {}
+        for line in self.transcript_parser.all_rows():
+            transcript_id = self.transcript_parser.get_id(line)
+            if transcript_id not in transcript_gene_map:
+                transcript_gene_map[transcript_id] = set()
+
+            ensg_id = self.transcript_parser.get_associated_ensg_id(line)
+            ncbi_id = self.transcript_parser.get_associated_ncbi_id(line)
+
+            if ensg_id is not None and len(ensg_id) > 0:
+                gene_id = EquivalentId(id=ensg_id, type=Prefix.ENSEMBL).id_str()
+                transcript_gene_map[transcript_id].add(gene_id)
+
+            if ncbi_id is not None and len(ncbi_id) > 0:
+                gene_id = EquivalentId(id=ncbi_id, type=Prefix.NCBIGene).id_str()
+                transcript_gene_map[transcript_id].add(gene_id)
+
+            equiv_ids = self.transcript_parser.get_equivalent_ids(line)
+            ids = [MatchingPair(id=transcript_id, match=transcript_id, type='exact')]
+            for equiv_ids in equiv_ids:
+                transcript_id_str = equiv_ids.id_str()
+                ids.append(MatchingPair(id=transcript_id, match=transcript_id_str, type=equiv_ids.type.value))
+                if transcript_id_str not in transcript_id_idx:
+                    transcript_id_idx[transcript_id_str] = set()
+                transcript_id_idx[transcript_id_str].add(transcript_id)
+
+            transcript_ids[transcript_id] = set(ids)
+        return transcript_ids, transcript_id_idx, transcript_gene_map
+
+
+class _DuplicateGeneParser(_GeneParser):
+    rows = _GeneParser.rows + [
+        {"id": "IFXGene:1", "ncbi": "101", "symbol": "GENE1B"},
+        {"id": "IFXGene:3", "ncbi": "300", "symbol": "GENE3"},
+    ]
+
+
+class _TranscriptWithEnsgParser(_TranscriptParser):
+    rows = _TranscriptParser.rows + [
+        {"id": "IFXTranscript:3", "ensembl": "ENST000003", "ncbi": "999", "ensg": "ENSG000003"},
+        {"id": "IFXTranscript:1", "ensembl": "ENST000001B", "ncbi": "300"},
+    ]
+
+    @staticmethod
+    def get_associated_ensg_id(row):
+        return row.get("ensg")
+
+
+_FIXTURE_PROTEINS = [
+    {"id": "IFXProtein:A", "is_canonical": True, "uniprot_id": "P00001", "symbol": "A",
+     "transcripts": ["ENST000001", "ENST000003", "ENST404"], "gene_id": "100"},
+    {"id": "IFXProtein:A-2", "is_canonical": False, "canonical_ifx_id": "IFXProtein:A", "uniprot_id": "P00001-2",
+     "transcripts": ["ENST000002"], "gene_id": "200"},
+    {"id": "IFXProtein:B", "is_canonical": True, "uniprot_id": "P00002", "reviewed": False,
+     "transcripts": ["ENST000001B"], "gene_id": "404"},
+    {"id": "IFXProtein:C", "is_canonical": False, "canonical_ifx_id": "IFXProtein:MISSING", "uniprot_id": "P00003-2"},
+    {"id": "IFXProtein:A", "is_canonical": True, "symbol": "A_ALT", "gene_id": "101"},
+]
+
+
+def _fixture_resolver(cls, reviewed_only, collapse_to_canonical, match_index_dir=None):
+    resolver = _resolver_with_rows(_FIXTURE_PROTEINS)
+    resolver.__class__ = cls
+    resolver.gene_parser = _DuplicateGeneParser()
+    resolver.transcript_parser = _TranscriptWithEnsgParser()
+    resolver.reviewed_only = reviewed_only
+    resolver.collapse_to_canonical = collapse_to_canonical
+    resolver.match_index_dir = match_index_dir
+    resolver.get_version_info = lambda: f"fixture\t{reviewed_only}\t{collapse_to_canonical}"
+    return resolver
+
+
+def test_compact_match_index_matches_legacy_resolution():
+    for reviewed_only in (False, True):
+        for collapse_to_canonical in (False, True):
+            legacy = list(_fixture_resolver(_LegacyTCRDTargetResolver, reviewed_only, collapse_to_canonical).matching_ids())
+            compact = list(_fixture_resolver(TCRDTargetResolver, reviewed_only, collapse_to_canonical).matching_ids())
+
+            assert len(compact) == len(set(compact))
+            assert set(compact) == set(legacy)
+            assert len(compact) > 10
+
+
+def test_compact_match_index_is_persisted_per_version(tmp_path, monkeypatch):
+    resolver = _fixture_resolver(TCRDTargetResolver, False, True, match_index_dir=str(tmp_path))
+    expected = set(resolver.matching_ids())
+    index_files = list(tmp_path.glob("*.match_index.pkl"))
+    assert len(index_files) == 1
+
+    def fail_build(self):
+        raise AssertionError("match index should have been loaded from disk")
+
+    monkeypatch.setattr(TCRDTargetResolver, "build_match_index", fail_build)
+    reloaded = _fixture_resolver(TCRDTargetResolver, False, True, match_index_dir=str(tmp_path))
+    assert set(reloaded.matching_ids()) == expected
+    assert isinstance(TargetMatchIndex.load(index_files[0]), TargetMatchIndex)
+
+    monkeypatch.undo()
+    other_config = _fixture_resolver(TCRDTargetResolver, True, True, match_index_dir=str(tmp_path))
+    list(other_config.matching_ids())
+    assert index_files[0].exists()
+    assert len(list(tmp_path.glob("*.match_index.pkl"))) == 2
+
+    new_version = _fixture_resolver(TCRDTargetResolver, False, True, match_index_dir=str(tmp_path))
+    new_version.get_version_info = lambda: "fixture-v2\tFalse\tTrue"
+    list(new_version.matching_ids())
+    assert not index_files[0].exists()
+    assert {p.name for p in tmp_path.glob("*.match_index.pkl")} == {
+        other_config.match_index_path().name,
+        new_version.match_index_path().name,
+    }